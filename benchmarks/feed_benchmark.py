@@ -0,0 +1,182 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+"""
+End to end feed benchmark against a local SyntheticExchangeServer running in another process.
+Reports sustained callback events per second, p50/p99 callback and end to end latencies and memory growth
+for trades, L2 book and candles.
+
+Usage: python benchmarks/feed_benchmark.py [--scenarios trades l2_book candles] [--duration 10] [--rate 5000]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.callback import TradeCallback, BookCallback, CandleCallback, KlineCallback
+from octobot_websockets.constants import Feeds, KlineEmissionPolicies
+from octobot_websockets.feeds.markets_cache import cache_markets
+
+from synthetic_exchange import create_markets, run_server
+from synthetic_feed import SyntheticFeed
+
+HOST = "127.0.0.1"
+WARMUP_DURATION = 1
+SERVER_START_TIMEOUT = 10
+# end to end latencies are measured from the event timestamp, which is the candle start time for klines
+# and the local reception time for books
+SCENARIOS = {
+    "trades": {"channels": [Feeds.TRADES], "callback_feed": Feeds.TRADES, "has_end_to_end_latency": True},
+    "l2_book": {"channels": [Feeds.L2_BOOK], "callback_feed": Feeds.L2_BOOK, "has_end_to_end_latency": False},
+    "candles": {"channels": [Feeds.TRADES, Feeds.CANDLE, Feeds.KLINE], "callback_feed": Feeds.KLINE,
+                "time_frames": [TimeFrames.ONE_MINUTE, TimeFrames.FIVE_MINUTES, TimeFrames.ONE_HOUR],
+                "has_end_to_end_latency": False},
+}
+
+
+def get_memory_usage():
+    """
+    :return: the process resident memory in bytes, 0 when unavailable
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+async def run_scenario(name, duration, pairs_count, markets_cache_dir):
+    scenario = SCENARIOS[name]
+    events = {feed_type: 0 for feed_type in Feeds}
+
+    def create_callback(callback_class, feed_type):
+        async def callback(feed, **kwargs):
+            events[feed_type] += 1
+        return callback_class(callback)
+
+    feed = SyntheticFeed(pairs=list(create_markets(pairs_count)),
+                         channels=scenario["channels"],
+                         callbacks={Feeds.TRADES: create_callback(TradeCallback, Feeds.TRADES),
+                                    Feeds.L2_BOOK: create_callback(BookCallback, Feeds.L2_BOOK),
+                                    Feeds.CANDLE: create_callback(CandleCallback, Feeds.CANDLE),
+                                    Feeds.KLINE: create_callback(KlineCallback, Feeds.KLINE)},
+                         time_frames=scenario.get("time_frames"),
+                         book_interval=0,
+                         kline_emission_policy=KlineEmissionPolicies.EVERY_TRADE,
+                         markets_cache_dir=markets_cache_dir,
+                         enable_stats=True,
+                         create_loop=False)
+    feed.start()
+    await asyncio.sleep(WARMUP_DURATION)
+    feed.stats.reset()
+    start_events = events[scenario["callback_feed"]]
+    start_memory = get_memory_usage()
+    start = time.monotonic()
+    await asyncio.sleep(duration)
+    elapsed = time.monotonic() - start
+    stats = feed.get_stats()
+    feed.should_stop = True
+    feed.close()
+    # let the cancelled connection task close the feed async ccxt client
+    await asyncio.gather(feed.websocket_task, return_exceptions=True)
+
+    callback_key = scenario["callback_feed"].value
+    callback_latencies = stats["callback_latencies"].get(callback_key, {})
+    end_to_end_latencies = [histogram for (feed_type, _), histogram in stats["exchange_latencies"].items()
+                            if feed_type == callback_key and scenario["has_end_to_end_latency"]]
+    return {
+        "scenario": name,
+        "events_per_second": (events[scenario["callback_feed"]] - start_events) / elapsed,
+        "messages_per_second": sum(throughput["messages"]
+                                   for throughput in stats["throughputs"].values()) / elapsed,
+        "callback_p50_ms": callback_latencies.get("p50", 0),
+        "callback_p99_ms": callback_latencies.get("p99", 0),
+        "end_to_end_p50_ms": max((histogram["p50"] for histogram in end_to_end_latencies), default=0),
+        "end_to_end_p99_ms": max((histogram["p99"] for histogram in end_to_end_latencies), default=0),
+        "memory_growth_bytes": get_memory_usage() - start_memory,
+    }
+
+
+def wait_for_server(port):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Synthetic exchange server did not start on port {port}")
+
+
+def run_benchmarks(scenarios, duration, rate, pairs_count, book_depth, port):
+    markets_cache_dir = tempfile.mkdtemp()
+    cache_markets(SyntheticFeed.get_name(), create_markets(pairs_count), markets_cache_dir)
+    SyntheticFeed.ADDRESS = f"ws://{HOST}:{port}"
+    results = []
+    for scenario in scenarios:
+        server = multiprocessing.get_context("spawn").Process(target=run_server,
+                                                              args=(HOST, port, rate, book_depth),
+                                                              daemon=True)
+        server.start()
+        try:
+            wait_for_server(port)
+            results.append(asyncio.run(run_scenario(scenario, duration, pairs_count, markets_cache_dir)))
+        finally:
+            server.terminate()
+            server.join()
+    return results
+
+
+def print_results(results):
+    columns = ["scenario", "events_per_second", "messages_per_second", "callback_p50_ms", "callback_p99_ms",
+               "end_to_end_p50_ms", "end_to_end_p99_ms", "memory_growth_bytes"]
+    print(" | ".join(columns))
+    for result in results:
+        print(" | ".join(str(round(result[column], 3)) if isinstance(result[column], float)
+                         else str(result[column]) for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OctoBot-Websockets end to end feed benchmark")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=10, help="measure duration of each scenario in seconds")
+    parser.add_argument("--rate", type=int, default=5000, help="server messages per second, 0 for unthrottled")
+    parser.add_argument("--pairs", type=int, default=10)
+    parser.add_argument("--book-depth", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="json file to store the results in")
+    args = parser.parse_args()
+    results = run_benchmarks(args.scenarios, args.duration, args.rate, args.pairs, args.book_depth, args.port)
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
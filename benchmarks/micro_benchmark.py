@@ -0,0 +1,226 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+"""
+Micro benchmarks of the data structures and callbacks hot paths, run against the pure python and the
+compiled (python setup.py build_ext --inplace) builds of the package.
+Results are stored as json per version to compare them release over release.
+
+Usage: python benchmarks/micro_benchmark.py [--builds pure compiled] [--compare previous_results.json]
+"""
+import argparse
+import importlib.machinery
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_DIR = os.path.join(ROOT_DIR, "octobot_websockets")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PURE_BUILD = "pure"
+COMPILED_BUILD = "compiled"
+BOOK_DEPTHS = (10, 100, 1000)
+REPEAT = 5
+
+
+def use_pure_python_build():
+    """
+    Import octobot_websockets modules from their python sources even when compiled extensions are built
+    """
+    def pure_path_hook(path):
+        if not os.path.abspath(path).startswith(PACKAGE_DIR):
+            raise ImportError
+        return importlib.machinery.FileFinder(path, (importlib.machinery.SourceFileLoader,
+                                                     importlib.machinery.SOURCE_SUFFIXES))
+    sys.path_hooks.insert(0, pure_path_hook)
+    sys.path_importer_cache.clear()
+
+
+def is_compiled_build():
+    import octobot_websockets.data.book
+    return not octobot_websockets.data.book.__file__.endswith(".py")
+
+
+def run_coroutine(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        pass
+
+
+def get_benchmarks():
+    """
+    :return: a dict of benchmark name: (function to time, operations per call)
+    """
+    from octobot_commons.enums import TimeFrames
+
+    from octobot_websockets import callback
+    from octobot_websockets.constants import BID, ASK, ADD, DEL, UPD
+    from octobot_websockets.data.book import Book
+    from octobot_websockets.data.candle import Candle
+    from octobot_websockets.data.ticker import Ticker
+
+    benchmarks = {}
+    for depth in BOOK_DEPTHS:
+        book = Book()
+        bids = [[10000 - index, 1 + index % 3] for index in range(depth)]
+        asks = [[10001 + index, 1 + index % 3] for index in range(depth)]
+        benchmarks[f"book_handle_book_update_depth_{depth}"] = \
+            (lambda book=book, bids=bids, asks=asks: book.handle_book_update(bids, asks), 1)
+
+        delta_book = Book()
+        delta_book.handle_book_update(bids, asks)
+        # the removed levels are added back so that every call applies the same changes
+        delta = {side: {DEL: [levels[index][0] for index in range(0, depth, 5)],
+                        ADD: [(levels[index][0], 2) for index in range(0, depth, 5)],
+                        UPD: [(levels[index][0], 1 + index % 2) for index in range(1, depth, 5)]}
+                 for side, levels in ((BID, bids), (ASK, asks))}
+        benchmarks[f"book_handle_book_delta_depth_{depth}"] = \
+            (lambda book=delta_book, delta=delta: book.handle_book_delta(delta), 1)
+
+    candle = Candle(100, 0)
+    prices = [100 + index % 7 for index in range(1000)]
+
+    def update_candle():
+        for price in prices:
+            candle.handle_candle_update(price, 1)
+    benchmarks["candle_handle_candle_update"] = (update_candle, len(prices))
+
+    ticker = Ticker()
+    quotes = [(100 + index % 5, 101 + index % 5) for index in range(1000)]
+
+    def update_ticker():
+        for bid, ask in quotes:
+            ticker.handle_quote(bid, ask)
+    benchmarks["ticker_handle_quote"] = (update_ticker, len(quotes))
+
+    async def user_callback(feed, **kwargs):
+        pass
+
+    callbacks_kwargs = {
+        callback.TradeCallback: dict(feed="feed", symbol="BTC/USDT", side="buy", amount=1, price=1, timestamp=1),
+        callback.TickerCallback: dict(feed="feed", symbol="BTC/USDT", bid=1, ask=1, last=1, timestamp=1),
+        callback.CandleCallback: dict(feed="feed", symbol="BTC/USDT", timestamp=1, time_frame=TimeFrames.ONE_MINUTE,
+                                      close=1, volume=1, high=1, low=1, opn=1),
+        callback.KlineCallback: dict(feed="feed", symbol="BTC/USDT", timestamp=1, time_frame=TimeFrames.ONE_MINUTE,
+                                     close=1, volume=1, high=1, low=1, opn=1),
+        callback.BookCallback: dict(feed="feed", symbol="BTC/USDT", asks=[], bids=[], timestamp=1),
+        callback.OrdersCallback: dict(feed="feed", symbol="BTC/USDT", price=1, quantity=1, order_id=1,
+                                      is_canceled=False, is_filled=False),
+        callback.PositionCallback: dict(feed="feed", symbol="BTC/USDT", entry_price=1, cost=1, quantity=1,
+                                        pnl_percent=1, mark_price=1, liquidation_price=1, timestamp=1),
+        callback.UpdatedBookCallback: dict(feed="feed", symbol="BTC/USDT", delta={}),
+    }
+    events_classes = {
+        callback.TradeCallback: callback.TradeEvent,
+        callback.TickerCallback: callback.TickerEvent,
+        callback.CandleCallback: callback.CandleEvent,
+        callback.KlineCallback: callback.CandleEvent,
+        callback.BookCallback: callback.BookEvent,
+        callback.OrdersCallback: callback.OrderEvent,
+        callback.PositionCallback: callback.PositionEvent,
+    }
+    for callback_class, kwargs in callbacks_kwargs.items():
+        instance = callback_class(user_callback)
+        benchmarks[f"{callback_class.__name__}_call"] = \
+            (lambda instance=instance, kwargs=kwargs: run_coroutine(instance(**kwargs)), 1)
+        if callback_class in events_classes:
+            event = events_classes[callback_class](**kwargs)
+            benchmarks[f"{callback_class.__name__}_handle_event"] = \
+                (lambda instance=instance, event=event: run_coroutine(instance.handle_event(event)), 1)
+    return benchmarks
+
+
+def run_benchmarks():
+    """
+    :return: the best time in nanoseconds per operation of each benchmark
+    """
+    results = {}
+    for name, (function, operations) in get_benchmarks().items():
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        results[name] = min(timer.repeat(REPEAT, number)) / number / operations * 1e9
+    return results
+
+
+def run_build(build):
+    """
+    Run the benchmarks of build in a new interpreter to import its modules from scratch
+    """
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-build", build],
+                            check=True, stdout=subprocess.PIPE, cwd=ROOT_DIR).stdout
+    return json.loads(output)
+
+
+def print_results(results, previous_results=None):
+    builds = list(results["builds"])
+    header = ["benchmark (ns/op)"] + builds
+    if PURE_BUILD in builds and COMPILED_BUILD in builds:
+        header.append("speedup")
+    if previous_results is not None:
+        header += [f"{build} vs {previous_results['version']}" for build in builds]
+    print(" | ".join(header))
+    for name in results["builds"][builds[0]]:
+        row = [name] + [f"{results['builds'][build][name]:.1f}" for build in builds]
+        if PURE_BUILD in builds and COMPILED_BUILD in builds:
+            row.append(f"x{results['builds'][PURE_BUILD][name] / results['builds'][COMPILED_BUILD][name]:.2f}")
+        if previous_results is not None:
+            for build in builds:
+                previous = previous_results["builds"].get(build, {}).get(name)
+                row.append(f"x{previous / results['builds'][build][name]:.2f}" if previous else "-")
+        print(" | ".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OctoBot-Websockets micro benchmarks")
+    parser.add_argument("--builds", nargs="+", choices=[PURE_BUILD, COMPILED_BUILD],
+                        default=[PURE_BUILD, COMPILED_BUILD])
+    parser.add_argument("--output", help="results json file, stored in benchmarks/results by default")
+    parser.add_argument("--compare", help="previous results json file to compare with")
+    parser.add_argument("--run-build", choices=[PURE_BUILD, COMPILED_BUILD], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT_DIR)
+    if args.run_build:
+        if args.run_build == PURE_BUILD:
+            use_pure_python_build()
+        elif not is_compiled_build():
+            sys.exit("Compiled build not found, run python setup.py build_ext --inplace first")
+        print(json.dumps(run_benchmarks()))
+        return
+
+    from octobot_websockets.constants import VERSION
+    results = {
+        "version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "builds": {build: run_build(build) for build in args.builds}
+    }
+    previous_results = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous_results = json.load(previous_file)
+    print_results(results, previous_results)
+    output = args.output or os.path.join(RESULTS_DIR, f"micro_benchmark_{VERSION}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+"""
+Local stand-in exchange: a websocket server speaking a synthetic json protocol at a controlled rate.
+
+Clients subscribe with {"op": "subscribe", "channels": [...], "pairs": [...]}, the server then streams:
+- trade: {"c": "trade", "s": pair, "p": price, "q": amount, "side": side, "t": timestamp}
+- book: a {"c": "book", "type": "snapshot", ...} message per pair followed by
+  {"c": "book", "type": "delta", "s": pair, "seq": sequence, "bids": [[price, size]], "asks": [...], "t": timestamp}
+  deltas, a size of 0 removing the level
+"""
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+TRADE_CHANNEL = "trade"
+BOOK_CHANNEL = "book"
+BASE_PRICE = 10000
+TICK_SIZE = 0.5
+SEND_INTERVAL = 0.01
+
+
+def create_markets(pairs_count):
+    """
+    :return: ccxt like markets of pairs_count synthetic symbols
+    """
+    return {f"S{index}/USD": {"id": f"S{index}USD", "symbol": f"S{index}/USD", "base": f"S{index}",
+                              "quote": "USD", "type": "spot", "spot": True, "active": True}
+            for index in range(pairs_count)}
+
+
+class SyntheticExchangeServer:
+    """
+    :param port: the listening port, 0 to use a free one
+    :param rate: messages per second sent on each connection, 0 to send as fast as possible
+    :param book_depth: levels on each side of book snapshots
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, rate=1000, book_depth=100, seed=0):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.book_depth = book_depth
+        self.random = random.Random(seed)
+        self.server = None
+        self.sent_messages = 0
+        # received subscriptions, in order
+        self.subscriptions = []
+        # when set, connections stay open without receiving messages
+        self.is_paused = False
+
+    def get_address(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle_connection, self.host, self.port)
+        # kept when restarted
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def _handle_connection(self, websocket, path=None):
+        subscription = json.loads(await websocket.recv())
+        self.subscriptions.append(subscription)
+        sequences = {pair: 1 for pair in subscription["pairs"]}
+        if BOOK_CHANNEL in subscription["channels"]:
+            for pair in subscription["pairs"]:
+                await websocket.send(json.dumps(self._create_book_snapshot(pair)))
+        factories = [factory for channel, factory in ((TRADE_CHANNEL, self._create_trade),
+                                                      (BOOK_CHANNEL, self._create_book_delta))
+                     if channel in subscription["channels"]]
+        messages_per_send = max(1, int(self.rate * SEND_INTERVAL)) if self.rate else 100
+        try:
+            while True:
+                if self.is_paused:
+                    await asyncio.sleep(SEND_INTERVAL)
+                    continue
+                start = time.monotonic()
+                for _ in range(messages_per_send):
+                    pair = self.random.choice(subscription["pairs"])
+                    await websocket.send(json.dumps(self.random.choice(factories)(pair, sequences)))
+                    self.sent_messages += 1
+                if self.rate:
+                    await asyncio.sleep(max(0, SEND_INTERVAL - (time.monotonic() - start)))
+                else:
+                    await asyncio.sleep(0)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _create_trade(self, pair, sequences):
+        return {"c": TRADE_CHANNEL, "s": pair, "p": self._get_price(), "q": round(self.random.random(), 4),
+                "side": self.random.choice(("buy", "sell")), "t": time.time()}
+
+    def _create_book_snapshot(self, pair):
+        return {"c": BOOK_CHANNEL, "type": "snapshot", "s": pair, "seq": 1, "t": time.time(),
+                "bids": [[BASE_PRICE - index * TICK_SIZE, 1] for index in range(1, self.book_depth + 1)],
+                "asks": [[BASE_PRICE + index * TICK_SIZE, 1] for index in range(1, self.book_depth + 1)]}
+
+    def _create_book_delta(self, pair, sequences):
+        sequences[pair] += 1
+        level = [self._get_price(), self.random.choice((0, round(self.random.random() * 10, 4)))]
+        is_bid = level[0] < BASE_PRICE
+        return {"c": BOOK_CHANNEL, "type": "delta", "s": pair, "seq": sequences[pair], "t": time.time(),
+                "bids": [level] if is_bid else [], "asks": [] if is_bid else [level]}
+
+    def _get_price(self):
+        return BASE_PRICE + TICK_SIZE * self.random.randint(-self.book_depth, self.book_depth)
+
+
+def run_server(host, port, rate, book_depth):
+    """
+    Run a SyntheticExchangeServer until the process is terminated, to be used as a process target
+    """
+    async def serve():
+        async with SyntheticExchangeServer(host, port, rate, book_depth):
+            await asyncio.Future()
+    asyncio.run(serve())
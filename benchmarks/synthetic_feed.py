@@ -0,0 +1,125 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import json
+
+import ccxt.async_support
+
+from octobot_websockets.callback import TradeEvent
+from octobot_websockets.constants import Feeds, BID, ASK, UPD, DEL
+from octobot_websockets.constructors.book_constructor import BookConstructor
+from octobot_websockets.constructors.candle_aggregator import CandleAggregator
+from octobot_websockets.decoder import extract_json_string
+from octobot_websockets.feeds.feed import Feed
+
+from synthetic_exchange import TRADE_CHANNEL, BOOK_CHANNEL
+
+
+class SyntheticFeed(Feed):
+    """
+    Feed of the SyntheticExchangeServer protocol, candles are built from trades
+    """
+    ADDRESS = "ws://127.0.0.1:8765"
+    DECODE_MESSAGES = True
+
+    def __init__(self, **kwargs):
+        self.book_constructors = {}
+        self.candle_aggregators = {}
+        super().__init__(**kwargs)
+
+    @classmethod
+    def get_name(cls):
+        # any ccxt exchange, markets are provided through the markets cache
+        return "binance"
+
+    @classmethod
+    def get_address(cls):
+        return cls.ADDRESS
+
+    @classmethod
+    def get_ccxt_async_client(cls):
+        return ccxt.async_support.binance
+
+    @classmethod
+    def get_trades_feed(cls):
+        return TRADE_CHANNEL
+
+    @classmethod
+    def get_candle_feed(cls):
+        return TRADE_CHANNEL
+
+    @classmethod
+    def get_kline_feed(cls):
+        return TRADE_CHANNEL
+
+    @classmethod
+    def get_L2_book_feed(cls):
+        return BOOK_CHANNEL
+
+    @classmethod
+    def get_L3_book_feed(cls):
+        return Feeds.UNSUPPORTED.value
+
+    get_ticker_feed = get_funding_feed = get_portfolio_feed = get_orders_feed = get_position_feed = get_L3_book_feed
+
+    async def subscribe(self):
+        for pair in self.pairs:
+            symbol = self.get_pair_from_exchange(pair)
+            if BOOK_CHANNEL in self.channels:
+                self.book_constructors[pair] = BookConstructor(self, symbol)
+            if self.time_frames:
+                self.candle_aggregators[pair] = CandleAggregator(self, symbol, self.time_frames)
+        await self.websocket.send(json.dumps({"op": "subscribe",
+                                              "channels": list(set(self.channels)),
+                                              "pairs": self.pairs}))
+
+    def get_message_route(self, message):
+        return extract_json_string(message, "c"), extract_json_string(message, "s")
+
+    async def on_message(self, message):
+        if message["c"] == TRADE_CHANNEL:
+            await self._handle_trade(message)
+        elif message["c"] == BOOK_CHANNEL:
+            await self._handle_book(message)
+
+    async def _handle_trade(self, message):
+        pair = message["s"]
+        await self.callbacks[Feeds.TRADES].handle_event(TradeEvent(feed=self.get_name(),
+                                                                   symbol=self.get_pair_from_exchange(pair),
+                                                                   side=message["side"],
+                                                                   amount=message["q"],
+                                                                   price=message["p"],
+                                                                   timestamp=message["t"]))
+        if pair in self.candle_aggregators:
+            await self.candle_aggregators[pair].handle_recent_trade(message["p"], message["q"], message["t"])
+
+    async def _handle_book(self, message):
+        constructor = self.book_constructors[message["s"]]
+        if message["type"] == "snapshot":
+            await constructor.handle_book_snapshot(message["bids"], message["asks"], message["seq"])
+        else:
+            await constructor.handle_book_delta({BID: self._get_side_delta(message["bids"]),
+                                                 ASK: self._get_side_delta(message["asks"])},
+                                                message["seq"])
+
+    @staticmethod
+    def _get_side_delta(levels):
+        return {UPD: [level for level in levels if level[1]],
+                DEL: [level[0] for level in levels if not level[1]]}
+
+    def close(self):
+        for aggregator in self.candle_aggregators.values():
+            aggregator.stop()
+        super().close()
@@ -15,9 +15,80 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 
+cdef class TradeEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef public str side
+    cdef public object amount
+    cdef public object price
+    cdef public object timestamp
+
+    cpdef dict to_kwargs(self)
+
+cdef class TickerEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef public object bid
+    cdef public object ask
+    cdef public object last
+    cdef public object timestamp
+
+    cpdef dict to_kwargs(self)
+
+cdef class CandleEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef public object timestamp
+    cdef public object time_frame
+    cdef public object close
+    cdef public object volume
+    cdef public object high
+    cdef public object low
+    cdef public object opn
+
+    cpdef dict to_kwargs(self)
+
+cdef class BookEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef list _asks
+    cdef list _bids
+    cdef public object timestamp
+    cdef public object book
+
+    cpdef dict to_kwargs(self)
+    cpdef detach(self)
+
+cdef class OrderEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef public object price
+    cdef public object quantity
+    cdef public object order_id
+    cdef public object is_canceled
+    cdef public object is_filled
+
+    cpdef dict to_kwargs(self)
+
+cdef class PositionEvent:
+    cdef public str feed
+    cdef public str symbol
+    cdef public object entry_price
+    cdef public object cost
+    cdef public object quantity
+    cdef public object pnl_percent
+    cdef public object mark_price
+    cdef public object liquidation_price
+    cdef public object timestamp
+
+    cpdef dict to_kwargs(self)
+
 cdef class Callback(object):
     cdef object callback
 
+cdef class EventCallback(Callback):
+    pass
+
 cdef class TradeCallback(Callback):
     pass
 
@@ -47,3 +118,22 @@ cdef class FundingCallback(Callback):
 
 cdef class PortfolioCallback(Callback):
     pass
+
+cdef class CompletedAwaitable:
+    pass
+
+cdef class BatchCallback(Callback):
+    cdef public int batch_size
+    cdef public double batch_interval
+    cdef public bint columnar
+    cdef public int max_pending_batches
+    cdef object logger
+    cdef list events
+    cdef object pending_batches
+    cdef object flush_handle
+    cdef object delivery_task
+
+    cpdef flush(self)
+    cdef object _add_event(self, object event)
+    cdef str _get_feed(self, object event)
+    cdef dict _get_columns(self, list events)
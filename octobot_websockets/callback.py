@@ -1,4 +1,4 @@
-# cython: language_level=3
+# cython: language_level=3, annotation_typing=False
 #  Drakkar-Software OctoBot-Websockets
 #  Copyright (c) Drakkar-Software, All rights reserved.
 #
@@ -14,7 +14,139 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
+from collections import deque
+
 from octobot_commons.enums import TimeFrames
+from octobot_commons.logging.logging_util import get_logger
+
+
+class TradeEvent:
+    def __init__(self, feed, symbol, side, amount, price, timestamp):
+        self.feed = feed
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.price = price
+        self.timestamp = timestamp
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, side=self.side, amount=self.amount, price=self.price,
+                    timestamp=self.timestamp)
+
+
+class TickerEvent:
+    def __init__(self, feed, symbol, bid, ask, last, timestamp):
+        self.feed = feed
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+        self.timestamp = timestamp
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, bid=self.bid, ask=self.ask, last=self.last,
+                    timestamp=self.timestamp)
+
+
+class CandleEvent:
+    """
+    For CANDLE and KLINE events
+    """
+
+    def __init__(self, feed, symbol, timestamp, time_frame, close, volume, high, low, opn):
+        self.feed = feed
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.time_frame = time_frame
+        self.close = close
+        self.volume = volume
+        self.high = high
+        self.low = low
+        self.opn = opn
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, timestamp=self.timestamp, time_frame=self.time_frame,
+                    close=self.close, volume=self.volume, high=self.high, low=self.low, opn=self.opn)
+
+
+class BookEvent:
+    """
+    :param book: the Book the event is emitted from, its get_top_bids and get_top_asks views are read
+    without copy but are only valid until the next book update.
+    asks and bids are then only built as [price, size] lists when first read, callbacks delivering
+    events later detach them first
+    """
+
+    def __init__(self, feed, symbol, asks, bids, timestamp, book=None):
+        self.feed = feed
+        self.symbol = symbol
+        self._asks = asks
+        self._bids = bids
+        self.timestamp = timestamp
+        self.book = book
+
+    @property
+    def asks(self):
+        if self._asks is None and self.book is not None:
+            self._asks = self.book.asks
+        return self._asks
+
+    @property
+    def bids(self):
+        if self._bids is None and self.book is not None:
+            self._bids = self.book.bids
+        return self._bids
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, asks=self.asks, bids=self.bids, timestamp=self.timestamp)
+
+    def detach(self):
+        """
+        Build asks and bids and release the book so that the event stays valid after the next book update
+        """
+        if self.book is not None:
+            self._asks = self.book.asks
+            self._bids = self.book.bids
+            self.book = None
+
+    def __reduce__(self):
+        # the book is not sent along, its levels are
+        return BookEvent, (self.feed, self.symbol, self.asks, self.bids, self.timestamp)
+
+
+class OrderEvent:
+    def __init__(self, feed, symbol, price, quantity, order_id, is_canceled, is_filled):
+        self.feed = feed
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.order_id = order_id
+        self.is_canceled = is_canceled
+        self.is_filled = is_filled
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, price=self.price, quantity=self.quantity,
+                    order_id=self.order_id, is_canceled=self.is_canceled, is_filled=self.is_filled)
+
+
+class PositionEvent:
+    def __init__(self, feed, symbol, entry_price, cost, quantity, pnl_percent, mark_price, liquidation_price,
+                 timestamp):
+        self.feed = feed
+        self.symbol = symbol
+        self.entry_price = entry_price
+        self.cost = cost
+        self.quantity = quantity
+        self.pnl_percent = pnl_percent
+        self.mark_price = mark_price
+        self.liquidation_price = liquidation_price
+        self.timestamp = timestamp
+
+    def to_kwargs(self):
+        return dict(feed=self.feed, symbol=self.symbol, entry_price=self.entry_price, cost=self.cost,
+                    quantity=self.quantity, pnl_percent=self.pnl_percent, mark_price=self.mark_price,
+                    liquidation_price=self.liquidation_price, timestamp=self.timestamp)
 
 
 class Callback(object):
@@ -24,6 +156,35 @@ class Callback(object):
     async def __call__(self, *args, **kwargs):
         raise NotImplemented
 
+    async def handle_event(self, event):
+        """
+        Handle an event record created once by the feed, to be overwritten to read the event fields
+        without packing them as kwargs
+        """
+        await self(**event.to_kwargs())
+
+
+async def dispatch_event(callback, event):
+    """
+    Call callback with event, either a kwargs dict or an event record
+    """
+    if isinstance(event, dict):
+        await callback(**event)
+    else:
+        await callback.handle_event(event)
+
+
+class EventCallback(Callback):
+    """
+    Passes the event records to callback(event) as is
+    """
+
+    async def __call__(self, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} only handles event records")
+
+    async def handle_event(self, event):
+        await self.callback(event)
+
 
 class TradeCallback(Callback):
     async def __call__(self, *,
@@ -35,6 +196,10 @@ class TradeCallback(Callback):
                        timestamp: int):
         await self.callback(feed, pair=symbol, timestamp=timestamp, side=side, amount=amount, price=price)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, timestamp=event.timestamp, side=event.side,
+                            amount=event.amount, price=event.price)
+
 
 class TickerCallback(Callback):
     async def __call__(self, *,
@@ -46,6 +211,10 @@ class TickerCallback(Callback):
                        timestamp: int):
         await self.callback(feed, pair=symbol, bid=bid, ask=ask, last=last, timestamp=timestamp)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, bid=event.bid, ask=event.ask, last=event.last,
+                            timestamp=event.timestamp)
+
 
 class CandleCallback(Callback):
     async def __call__(self, *,
@@ -61,6 +230,10 @@ class CandleCallback(Callback):
         await self.callback(feed, pair=symbol, timestamp=timestamp, time_frame=time_frame,
                             close=close, volume=volume, high=high, low=low, opn=opn)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, timestamp=event.timestamp, time_frame=event.time_frame,
+                            close=event.close, volume=event.volume, high=event.high, low=event.low, opn=event.opn)
+
 
 class KlineCallback(Callback):
     async def __call__(self, *,
@@ -76,6 +249,10 @@ class KlineCallback(Callback):
         await self.callback(feed, pair=symbol, timestamp=timestamp, time_frame=time_frame,
                             close=close, volume=volume, high=high, low=low, opn=opn)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, timestamp=event.timestamp, time_frame=event.time_frame,
+                            close=event.close, volume=event.volume, high=event.high, low=event.low, opn=event.opn)
+
 
 class BookCallback(Callback):
     """
@@ -90,6 +267,9 @@ class BookCallback(Callback):
                        timestamp: int):
         await self.callback(feed, pair=symbol, asks=asks, bids=bids, timestamp=timestamp)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, asks=event.asks, bids=event.bids, timestamp=event.timestamp)
+
 
 class OrdersCallback(Callback):
     """
@@ -107,6 +287,10 @@ class OrdersCallback(Callback):
         await self.callback(feed, pair=symbol, price=price, quantity=quantity,
                             order_id=order_id, is_canceled=is_canceled, is_filled=is_filled)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed, pair=event.symbol, price=event.price, quantity=event.quantity,
+                            order_id=event.order_id, is_canceled=event.is_canceled, is_filled=event.is_filled)
+
 
 class PositionCallback(Callback):
     """
@@ -133,6 +317,17 @@ class PositionCallback(Callback):
                             liquidation_price=liquidation_price,
                             timestamp=timestamp)
 
+    async def handle_event(self, event):
+        await self.callback(event.feed,
+                            pair=event.symbol,
+                            entry_price=event.entry_price,
+                            cost=event.cost,
+                            quantity=event.quantity,
+                            pnl_percent=event.pnl_percent,
+                            mark_price=event.mark_price,
+                            liquidation_price=event.liquidation_price,
+                            timestamp=event.timestamp)
+
 
 class UpdatedBookCallback(Callback):
     """
@@ -172,3 +367,93 @@ class FundingCallback(Callback):
 
 class PortfolioCallback(Callback):
     pass
+
+
+class CompletedAwaitable:
+    """
+    Awaitable returning immediately, awaiting it doesn't create any coroutine
+    """
+
+    def __await__(self):
+        return iter(())
+
+
+COMPLETED = CompletedAwaitable()
+
+
+class BatchCallback(Callback):
+    """
+    Delivers the events accumulated during a loop iteration in a single callback(feed, batch) call,
+    batch being the list of events (kwargs dict or event records) or, when columnar, a dict of
+    kwarg name: list of values.
+    :param batch_size: delivers a batch as soon as it reaches batch_size events when > 0
+    :param batch_interval: accumulates events for up to batch_interval milliseconds instead of a loop iteration
+    :param max_pending_batches: when more batches are waiting for callback, events are only accepted once they
+    are delivered, which blocks the feed until callback catches up. 0 for unbounded
+    """
+
+    def __init__(self, callback, batch_size: int = 0, batch_interval: float = 0, columnar: bool = False,
+                 max_pending_batches: int = 100):
+        super().__init__(callback)
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.columnar = columnar
+        self.max_pending_batches = max_pending_batches
+        self.logger = get_logger(self.__class__.__name__)
+        self.events = []
+        self.pending_batches = deque()
+        self.flush_handle = None
+        self.delivery_task = None
+
+    def __call__(self, **kwargs):
+        return self._add_event(kwargs)
+
+    def _add_event(self, event):
+        # not a coroutine function: events are accumulated without creating a coroutine per event
+        if not self.events:
+            loop = asyncio.get_event_loop()
+            self.flush_handle = loop.call_later(self.batch_interval / 1000, self.flush) \
+                if self.batch_interval > 0 else loop.call_soon(self.flush)
+        self.events.append(event)
+        if 0 < self.batch_size <= len(self.events):
+            self.flush()
+        if 0 < self.max_pending_batches <= len(self.pending_batches):
+            return asyncio.shield(self.delivery_task)
+        return COMPLETED
+
+    def handle_event(self, event):
+        if isinstance(event, BookEvent):
+            event.detach()
+        return self._add_event(event)
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.events:
+            return
+        self.pending_batches.append(self.events)
+        self.events = []
+        if self.delivery_task is None or self.delivery_task.done():
+            self.delivery_task = asyncio.create_task(self._deliver())
+
+    async def _deliver(self):
+        while self.pending_batches:
+            events = self.pending_batches.popleft()
+            try:
+                await self.callback(self._get_feed(events[0]), self._get_columns(events) if self.columnar else events)
+            except Exception as e:
+                self.logger.error(f"Error when delivering a batch of {len(events)} events : {e}")
+
+    def _get_feed(self, event):
+        return event["feed"] if isinstance(event, dict) else event.feed
+
+    def _get_columns(self, events):
+        """
+        :return: a column of each key of the events, None for the events without this key
+        """
+        events = [event if isinstance(event, dict) else event.to_kwargs() for event in events]
+        keys = {}
+        for event in events:
+            keys.update(event)
+        return {key: [event.get(key) for event in events] for key in keys}
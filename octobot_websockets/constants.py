@@ -13,6 +13,8 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import os
+import tempfile
 from enum import Enum
 
 PROJECT_NAME = "OctoBot-Websockets"
@@ -27,8 +29,15 @@ BIDS = 'bids'
 ASKS = 'asks'
 UND = 'undefined'
 
+ADD = 'add'
+DEL = 'delete'
+UPD = 'update'
+
 CONFIG_EXCHANGE_WEB_SOCKET = "web-socket"
 
+MARKETS_CACHE_DIR = os.path.join(tempfile.gettempdir(), "octobot_websockets_markets")
+MARKETS_CACHE_TTL = 12 * 3600
+
 
 class Feeds(Enum):
     L2_BOOK = 'l2_book'
@@ -45,3 +54,15 @@ class Feeds(Enum):
     POSITION = 'position'
     TRADE = 'trade'
     UNSUPPORTED = 'unsupported'
+
+
+class KlineEmissionPolicies(Enum):
+    EVERY_TRADE = 'every_trade'
+    PRICE_CHANGE = 'price_change'
+    INTERVAL = 'interval'
+
+
+class DispatchOverflowPolicies(Enum):
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    CONFLATE = 'conflate'
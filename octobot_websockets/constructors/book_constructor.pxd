@@ -0,0 +1,35 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.constructors.update_throttler cimport UpdateThrottler
+from octobot_websockets.data.book cimport Book
+from octobot_websockets.feeds.feed cimport Feed
+
+cdef class BookConstructor:
+    cdef Feed feed
+    cdef public Book book
+    cdef str symbol
+
+    cdef public bint is_resyncing
+    cdef list pending_deltas
+    cdef public object resync_task
+    cdef tuple top_of_book
+    cdef UpdateThrottler throttler
+
+    cpdef stop(self)
+
+    cdef _start_resync(self)
+    cdef bint _apply_snapshot(self, dict snapshot)
@@ -0,0 +1,138 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+from octobot_websockets.callback import BookEvent
+from octobot_websockets.constants import Feeds, BIDS, ASKS
+from octobot_websockets.constructors.update_throttler import UpdateThrottler
+from octobot_websockets.data.book import Book
+from octobot_websockets.feeds.feed import Feed
+
+
+class BookConstructor:
+    """
+    Maintains a symbol L2 book from deltas, a sequence gap or a checksum mismatch triggers a resync:
+    incoming deltas are buffered while a snapshot is fetched through the feed async ccxt client,
+    they are then replayed on top of the snapshot without dropping the websocket connection.
+    Book updates are conflated to at most one L2_BOOK callback per feed book_update_interval.
+    """
+    RESYNC_RETRY_DELAY = 1
+
+    def __init__(self, feed: Feed, symbol: str):
+        self.feed = feed
+        self.symbol = symbol
+        self.book = Book()
+        self.is_resyncing = False
+        self.pending_deltas = []
+        self.resync_task = None
+        self.top_of_book = None
+        self.throttler = UpdateThrottler(self.feed.book_update_interval / 1000, self._emit_book)
+
+    def stop(self):
+        self.throttler.close()
+        if self.resync_task is not None:
+            self.resync_task.cancel()
+
+    async def handle_book_snapshot(self, bids: list, asks: list, sequence: int = 0):
+        self.book.handle_book_update(bids, asks, sequence)
+        await self._handle_refresh(force=True)
+
+    async def handle_book_delta(self, delta: dict, sequence: int = 0, first_sequence: int = 0, checksum=None):
+        """
+        :param delta: the delta in the UpdatedBookCallback format
+        :param sequence: the sequence number of the delta (or of its last update), 0 when not provided by the exchange
+        :param first_sequence: the sequence number of the first update of the delta when it contains several ones
+        :param checksum: the exchange book checksum after the delta, None when not provided by the exchange
+        """
+        if self.is_resyncing:
+            self.pending_deltas.append((delta, sequence, first_sequence))
+            return
+        if sequence and self.book.sequence:
+            if sequence <= self.book.sequence:
+                # already included in the current book
+                return
+            if (first_sequence or sequence) > self.book.sequence + 1:
+                self.feed.logger.warning(f"{self.symbol} book sequence gap: expected {self.book.sequence + 1}, "
+                                         f"got {first_sequence or sequence}, resynchronizing")
+                self.pending_deltas.append((delta, sequence, first_sequence))
+                self._start_resync()
+                return
+        self.book.handle_book_delta(delta, sequence)
+        if checksum is not None and checksum != self.feed.get_book_checksum(self.book):
+            self.feed.logger.warning(f"{self.symbol} book checksum mismatch, resynchronizing")
+            self._start_resync()
+            return
+        await self._handle_refresh()
+
+    def _start_resync(self):
+        self.is_resyncing = True
+        self.resync_task = asyncio.create_task(self._resync())
+
+    async def _resync(self):
+        while not self.feed.should_stop:
+            try:
+                snapshot = await self.feed.async_ccxt_client.fetch_order_book(self.symbol)
+            except Exception as e:
+                self.feed.logger.error(f"Failed to fetch {self.symbol} book snapshot ({e}), retrying...")
+                await asyncio.sleep(self.RESYNC_RETRY_DELAY)
+                continue
+            if self._apply_snapshot(snapshot):
+                self.is_resyncing = False
+                await self._handle_refresh(force=True)
+                return
+            self.feed.logger.warning(f"{self.symbol} book snapshot is older than buffered deltas, retrying...")
+            await asyncio.sleep(self.RESYNC_RETRY_DELAY)
+
+    def _apply_snapshot(self, snapshot):
+        """
+        :return: False when buffered deltas can't be chained to the snapshot
+        """
+        nonce = snapshot.get("nonce") or 0
+        pending_deltas, self.pending_deltas = self.pending_deltas, []
+        if not nonce:
+            # buffered deltas can't be ordered against a snapshot without nonce and replaying them could
+            # restore stale levels: they are dropped and the next deltas are chained to the last buffered one
+            for delta, sequence, first_sequence in pending_deltas:
+                nonce = max(nonce, sequence)
+            self.book.handle_book_update(snapshot[BIDS], snapshot[ASKS], nonce)
+            return True
+        self.book.handle_book_update(snapshot[BIDS], snapshot[ASKS], nonce)
+        for delta, sequence, first_sequence in pending_deltas:
+            if sequence and self.book.sequence:
+                if sequence <= self.book.sequence:
+                    continue
+                if (first_sequence or sequence) > self.book.sequence + 1:
+                    self.pending_deltas = pending_deltas
+                    return False
+            self.book.handle_book_delta(delta, sequence)
+        return True
+
+    async def _handle_refresh(self, force=False):
+        top_of_book = (self.book.bid_side.get_best_price(), self.book.bid_side.get_best_size(),
+                       self.book.ask_side.get_best_price(), self.book.ask_side.get_best_size())
+        if self.feed.book_emit_on_top_change and top_of_book != self.top_of_book:
+            force = True
+        self.top_of_book = top_of_book
+        await self.throttler.on_update(force=force)
+
+    async def _emit_book(self):
+        await self.feed.callbacks[Feeds.L2_BOOK].handle_event(BookEvent(feed=self.feed.get_name(),
+                                                                        symbol=self.symbol,
+                                                                        asks=None,
+                                                                        bids=None,
+                                                                        timestamp=self.book.timestamp,
+                                                                        book=self.book))
@@ -0,0 +1,39 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.constructors.candle_emitter cimport CandleEmitter
+from octobot_websockets.feeds.feed cimport Feed
+from octobot_websockets.data.candle cimport Candle
+
+cdef class CandleAggregator:
+    cdef int base_time_frame_seconds
+    cdef double last_close_timestamp
+    cdef public str symbol
+
+    cdef Feed feed
+    cdef Candle base_candle
+    cdef CandleEmitter emitter
+
+    cdef object base_time_frame
+    cdef list time_frames
+    cdef list rolled_up_time_frames
+    cdef dict time_frames_seconds
+    cdef dict candles
+    cdef dict last_candles
+    cdef dict histories
+
+    cpdef stop(self)
+    cpdef hold_candles(self, double outage_start)
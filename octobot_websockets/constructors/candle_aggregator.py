@@ -0,0 +1,261 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from time import time
+
+from octobot_commons.constants import MINUTE_TO_SECONDS
+from octobot_commons.enums import TimeFramesMinutes, TimeFrames
+
+from octobot_websockets.callback import CandleEvent
+from octobot_websockets.constants import Feeds
+
+from octobot_websockets.constructors.candle_emitter import CandleEmitter
+from octobot_websockets.data.candle import Candle
+from octobot_websockets.feeds.feed import Feed
+
+
+class CandleAggregator:
+    """
+    Builds a symbol candles from trades bucketed by exchange timestamp: only the smallest time frame
+    is built from trades, higher time frames are rolled up from its closed candles.
+    Candles are closed when a trade of a following bucket is received or, for quiet markets,
+    by the feed candle scheduler shortly after their time frame boundary.
+    During a connection outage, the scheduler can't close the candles of the periods after the outage start
+    until they are backfilled from the exchange.
+    """
+
+    def __init__(self, feed: Feed, symbol: str, time_frames: list):
+        self.feed = feed
+        self.symbol = symbol
+        self.time_frames_seconds = {time_frame: TimeFramesMinutes[time_frame] * MINUTE_TO_SECONDS
+                                    for time_frame in time_frames}
+        self.time_frames = sorted(time_frames, key=self.time_frames_seconds.get)
+        self.base_time_frame = self.time_frames[0]
+        self.base_time_frame_seconds = self.time_frames_seconds[self.base_time_frame]
+        self.rolled_up_time_frames = []
+        for time_frame in self.time_frames[1:]:
+            if self.time_frames_seconds[time_frame] % self.base_time_frame_seconds:
+                self.feed.logger.error(f"Can't build {time_frame.value} candles from "
+                                       f"{self.base_time_frame.value} candles, ignoring {time_frame.value}")
+            else:
+                self.rolled_up_time_frames.append(time_frame)
+        self.base_candle = None
+        self.last_close_timestamp = 0
+        self.candles = {time_frame: None for time_frame in self.rolled_up_time_frames}
+        # last closed candle of each time frame, to correct it after an outage
+        self.last_candles = {}
+        self.histories = {time_frame: self.feed.get_candle_history(self.symbol, time_frame)
+                          for time_frame in [self.base_time_frame] + self.rolled_up_time_frames}
+        self.feed.candle_scheduler.register(self.base_time_frame_seconds, self)
+        self.emitter = CandleEmitter(self.feed, self._push_klines)
+
+    def stop(self):
+        self.feed.candle_scheduler.unregister(self.base_time_frame_seconds, self)
+        self.emitter.stop()
+
+    async def handle_recent_trade(self, price: float, vol: float, timestamp: float):
+        """
+        :param timestamp: the exchange trade timestamp in seconds
+        """
+        if self.emitter.is_buffering_trades():
+            self.emitter.buffer_trade(price, vol, timestamp)
+            return
+        await self._handle_trade(price, vol, timestamp)
+
+    async def _handle_trade(self, price: float, vol: float, timestamp: float):
+        bucket_start = timestamp - timestamp % self.base_time_frame_seconds
+        if bucket_start < self.last_close_timestamp or self.emitter.is_backfilled(timestamp):
+            # trade of an already closed or backfilled candle
+            return
+        if self.base_candle is not None and bucket_start > self.base_candle.start_timestamp:
+            await self.close_candles(bucket_start)
+
+        if self.base_candle is None:
+            self.base_candle = Candle(price, bucket_start)
+        self.base_candle.handle_candle_update(price, vol)
+        await self.emitter.on_candle_update(self.base_candle.close)
+
+    async def _push_klines(self):
+        if self.base_candle is None:
+            return
+        await self._push_kline(self.base_time_frame,
+                               self.base_candle.start_timestamp,
+                               self.base_candle.opn,
+                               self.base_candle.high,
+                               self.base_candle.low,
+                               self.base_candle.close,
+                               self.base_candle.vol)
+        for time_frame in self.rolled_up_time_frames:
+            candle = self.candles[time_frame]
+            if candle is None:
+                start_timestamp = self.base_candle.start_timestamp - \
+                    self.base_candle.start_timestamp % self.time_frames_seconds[time_frame]
+                await self._push_kline(time_frame,
+                                       start_timestamp,
+                                       self.base_candle.opn,
+                                       self.base_candle.high,
+                                       self.base_candle.low,
+                                       self.base_candle.close,
+                                       self.base_candle.vol)
+            else:
+                await self._push_kline(time_frame,
+                                       candle.start_timestamp,
+                                       candle.opn,
+                                       max(candle.high, self.base_candle.high),
+                                       min(candle.low, self.base_candle.low),
+                                       self.base_candle.close,
+                                       candle.vol + self.base_candle.vol)
+
+    def hold_candles(self, outage_start):
+        """
+        Stop closing the candles of the periods ending after outage_start until they are backfilled
+        """
+        self.emitter.hold_candles(outage_start)
+
+    async def fetch_backfill(self, since: float) -> list:
+        """
+        :return: the base time frame candles since the one in progress at since
+        """
+        return await self.emitter.fetch_backfill(self.symbol, self.base_time_frame, self.base_time_frame_seconds,
+                                                 since)
+
+    async def handle_backfill(self, candles: list, since: float):
+        """
+        Emit and roll up the base candles that were not closed yet, correct the ones closed after since,
+        recover the in progress candle and apply the trades received since the outage
+        :param candles: ccxt OHLCV base time frame candles
+        """
+        self.emitter.release_candles()
+        now = time()
+        for timestamp, opn, high, low, close, vol in candles:
+            start_timestamp = timestamp / 1000
+            if start_timestamp < self.last_close_timestamp:
+                last_base_candle = self.last_candles.get(self.base_time_frame)
+                if start_timestamp + self.base_time_frame_seconds > since and last_base_candle is not None \
+                        and last_base_candle.start_timestamp == start_timestamp:
+                    # closed with the trades received before the outage
+                    await self._correct_last_base_candle(opn, high, low, close, vol)
+                continue
+            await self.close_candles(start_timestamp)
+            self.base_candle = Candle(opn, start_timestamp)
+            self.base_candle.set_values(opn, high, low, close, vol)
+            if start_timestamp + self.base_time_frame_seconds <= now:
+                await self._close_base_candle()
+            else:
+                self.emitter.set_backfilled()
+        # periods without backfilled candles
+        await self.close_candles(now)
+        trade = self.emitter.pop_pending_trade()
+        while trade is not None:
+            await self._handle_trade(*trade)
+            trade = self.emitter.pop_pending_trade()
+
+    async def _correct_last_base_candle(self, opn: float, high: float, low: float, close: float, vol: float):
+        """
+        Replace the values of the last closed base candle and update the higher time frames candles
+        it was rolled up into, the ones already closed are emitted again
+        """
+        base_candle = self.last_candles[self.base_time_frame]
+        vol_change = vol - base_candle.vol
+        base_candle.set_values(opn, high, low, close, vol)
+        await self._push_candle(self.base_time_frame, base_candle)
+        for time_frame in self.rolled_up_time_frames:
+            time_frame_seconds = self.time_frames_seconds[time_frame]
+            start_timestamp = base_candle.start_timestamp - base_candle.start_timestamp % time_frame_seconds
+            candle = self.candles[time_frame]
+            is_closed = candle is None or candle.start_timestamp != start_timestamp
+            if is_closed:
+                candle = self.last_candles.get(time_frame)
+                if candle is None or candle.start_timestamp != start_timestamp:
+                    continue
+            candle.set_values(opn if candle.start_timestamp == base_candle.start_timestamp else candle.opn,
+                              max(candle.high, high),
+                              min(candle.low, low),
+                              close,
+                              candle.vol + vol_change)
+            if is_closed:
+                await self._push_candle(time_frame, candle)
+
+    async def close_candles(self, timestamp: float):
+        """
+        Close the candles that ended before timestamp, the base candle being rolled up into higher time frames
+        """
+        timestamp = self.emitter.get_close_timestamp(timestamp)
+        if self.base_candle is not None and \
+                self.base_candle.start_timestamp + self.base_time_frame_seconds <= timestamp:
+            await self._close_base_candle()
+        for time_frame in self.rolled_up_time_frames:
+            candle = self.candles[time_frame]
+            if candle is not None and candle.start_timestamp + self.time_frames_seconds[time_frame] <= timestamp:
+                candle.on_close(candle.start_timestamp + self.time_frames_seconds[time_frame])
+                self.candles[time_frame] = None
+                await self._push_candle(time_frame, candle)
+
+    async def _close_base_candle(self):
+        base_candle = self.base_candle
+        self.base_candle = None
+        self.emitter.on_candle_close()
+        base_close_timestamp = base_candle.start_timestamp + self.base_time_frame_seconds
+        self.last_close_timestamp = base_close_timestamp
+        base_candle.on_close(base_close_timestamp)
+        await self._push_candle(self.base_time_frame, base_candle)
+
+        for time_frame in self.rolled_up_time_frames:
+            time_frame_seconds = self.time_frames_seconds[time_frame]
+            start_timestamp = base_candle.start_timestamp - base_candle.start_timestamp % time_frame_seconds
+            candle = self.candles[time_frame]
+            if candle is not None and candle.start_timestamp != start_timestamp:
+                # no trade during the end of the previous candle
+                candle.on_close(candle.start_timestamp + time_frame_seconds)
+                self.candles[time_frame] = None
+                await self._push_candle(time_frame, candle)
+                candle = None
+            if candle is None:
+                candle = Candle(base_candle.opn, start_timestamp)
+            candle.merge_candle(base_candle)
+            if base_close_timestamp >= start_timestamp + time_frame_seconds:
+                candle.on_close(start_timestamp + time_frame_seconds)
+                self.candles[time_frame] = None
+                await self._push_candle(time_frame, candle)
+            else:
+                self.candles[time_frame] = candle
+
+    async def _push_candle(self, time_frame: TimeFrames, candle: Candle):
+        self.last_candles[time_frame] = candle
+        history = self.histories[time_frame]
+        if history is not None:
+            history.add_candle(candle)
+        await self.feed.callbacks[Feeds.CANDLE].handle_event(CandleEvent(feed=self.feed.get_name(),
+                                                                         symbol=self.symbol,
+                                                                         timestamp=candle.close_timestamp,
+                                                                         time_frame=time_frame,
+                                                                         close=candle.close,
+                                                                         volume=candle.vol,
+                                                                         high=candle.high,
+                                                                         low=candle.low,
+                                                                         opn=candle.opn))
+
+    async def _push_kline(self, time_frame: TimeFrames, timestamp: float,
+                          opn: float, high: float, low: float, close: float, vol: float):
+        await self.feed.callbacks[Feeds.KLINE].handle_event(CandleEvent(feed=self.feed.get_name(),
+                                                                        symbol=self.symbol,
+                                                                        timestamp=timestamp,
+                                                                        time_frame=time_frame,
+                                                                        close=close,
+                                                                        volume=vol,
+                                                                        high=high,
+                                                                        low=low,
+                                                                        opn=opn))
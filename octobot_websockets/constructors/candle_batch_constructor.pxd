@@ -0,0 +1,25 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+cpdef dict build_candles(double[:] timestamps, double[:] prices, double[:] volumes, list time_frames)
+
+cdef tuple _create_columns()
+cdef tuple _build_base_candles(double[:] timestamps, double[:] prices, double[:] volumes,
+                               double time_frame_seconds)
+cdef tuple _roll_up_candles(tuple base_candles, double time_frame_seconds)
+cdef void _append_candle(tuple columns, double timestamp,
+                         double opn, double high, double low, double close, double vol)
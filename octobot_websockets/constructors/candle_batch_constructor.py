@@ -0,0 +1,124 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import array
+
+from octobot_commons.constants import MINUTE_TO_SECONDS
+from octobot_commons.enums import TimeFramesMinutes
+
+
+def build_candles(timestamps, prices, volumes, time_frames):
+    """
+    Build candles from trades in a single pass instead of one streaming update per trade:
+    trades are grouped by smallest time frame bucket and higher time frames are rolled up from these candles,
+    with the same open, high, low, close and volume values as the streaming CandleAggregator.
+    :param timestamps: float64 buffer (array.array('d'), numpy array...) of trades timestamps in seconds,
+    trades have to be sorted by timestamp
+    :param prices: float64 buffer of trades prices
+    :param volumes: float64 buffer of trades volumes
+    :param time_frames: the TimeFrames to build
+    :return: a dict of TimeFrames: (timestamps, opens, highs, lows, closes, volumes) array.array('d') columns,
+    timestamps being candles start timestamps
+    """
+    if not time_frames:
+        raise ValueError("No time frame to build candles for")
+    time_frames_seconds = {time_frame: TimeFramesMinutes[time_frame] * MINUTE_TO_SECONDS
+                           for time_frame in time_frames}
+    sorted_time_frames = sorted(time_frames, key=time_frames_seconds.get)
+    base_time_frame_seconds = time_frames_seconds[sorted_time_frames[0]]
+    base_candles = _build_base_candles(timestamps, prices, volumes, base_time_frame_seconds)
+    candles = {sorted_time_frames[0]: base_candles}
+    for time_frame in sorted_time_frames[1:]:
+        if time_frames_seconds[time_frame] % base_time_frame_seconds:
+            raise ValueError(f"Can't build {time_frame.value} candles from {sorted_time_frames[0].value} candles")
+        candles[time_frame] = _roll_up_candles(base_candles, time_frames_seconds[time_frame])
+    return candles
+
+
+def _create_columns():
+    return array.array('d'), array.array('d'), array.array('d'), array.array('d'), array.array('d'), \
+        array.array('d')
+
+
+def _build_base_candles(timestamps, prices, volumes, time_frame_seconds):
+    columns = _create_columns()
+    candle_timestamps, opens, highs, lows, closes, candle_volumes = columns
+    index: int
+    bucket_start: float
+    current_bucket_start: float = -1
+    opn: float = 0
+    high: float = 0
+    low: float = 0
+    close: float = 0
+    vol: float = 0
+    for index in range(len(timestamps)):
+        bucket_start = timestamps[index] - timestamps[index] % time_frame_seconds
+        if bucket_start != current_bucket_start:
+            if current_bucket_start != -1:
+                _append_candle(columns, current_bucket_start, opn, high, low, close, vol)
+            current_bucket_start = bucket_start
+            opn = high = low = prices[index]
+            vol = 0
+        if high < prices[index]:
+            high = prices[index]
+        if low > prices[index]:
+            low = prices[index]
+        close = prices[index]
+        vol += volumes[index]
+    if current_bucket_start != -1:
+        _append_candle(columns, current_bucket_start, opn, high, low, close, vol)
+    return columns
+
+
+def _roll_up_candles(base_candles, time_frame_seconds):
+    columns = _create_columns()
+    base_timestamps, base_opens, base_highs, base_lows, base_closes, base_volumes = base_candles
+    index: int
+    bucket_start: float
+    current_bucket_start: float = -1
+    opn: float = 0
+    high: float = 0
+    low: float = 0
+    close: float = 0
+    vol: float = 0
+    for index in range(len(base_timestamps)):
+        bucket_start = base_timestamps[index] - base_timestamps[index] % time_frame_seconds
+        if bucket_start != current_bucket_start:
+            if current_bucket_start != -1:
+                _append_candle(columns, current_bucket_start, opn, high, low, close, vol)
+            current_bucket_start = bucket_start
+            opn = base_opens[index]
+            high = base_highs[index]
+            low = base_lows[index]
+            vol = 0
+        if high < base_highs[index]:
+            high = base_highs[index]
+        if low > base_lows[index]:
+            low = base_lows[index]
+        close = base_closes[index]
+        vol += base_volumes[index]
+    if current_bucket_start != -1:
+        _append_candle(columns, current_bucket_start, opn, high, low, close, vol)
+    return columns
+
+
+def _append_candle(columns, timestamp, opn, high, low, close, vol):
+    columns[0].append(timestamp)
+    columns[1].append(opn)
+    columns[2].append(high)
+    columns[3].append(low)
+    columns[4].append(close)
+    columns[5].append(vol)
@@ -14,17 +14,24 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+from octobot_websockets.callback cimport CandleEvent
+from octobot_websockets.constructors.candle_emitter cimport CandleEmitter
 from octobot_websockets.feeds.feed cimport Feed
 from octobot_websockets.data.candle cimport Candle
+from octobot_websockets.data.candle_history cimport CandleHistory
 
 cdef class CandleConstructor:
-    cdef double time_frame_delta
-    cdef double time_frame_seconds
-    cdef bint should_stop
-    cdef str symbol
+    cdef int time_frame_seconds
+    cdef double last_close_timestamp
+    cdef public str symbol
 
     cdef Feed feed
     cdef Candle candle
+    cdef CandleHistory history
+    cdef CandleEmitter emitter
 
     cdef object time_frame
-    cdef object candle_task
+
+    cpdef stop(self)
+    cpdef hold_candles(self, double outage_start)
+    cdef CandleEvent _create_event(self, double timestamp)
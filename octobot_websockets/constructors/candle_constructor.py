@@ -14,21 +14,21 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-import asyncio
 from time import time
 
 from octobot_commons.constants import MINUTE_TO_SECONDS
 from octobot_commons.enums import TimeFramesMinutes, TimeFrames
 
+from octobot_websockets.callback import CandleEvent
 from octobot_websockets.constants import Feeds
 
+from octobot_websockets.constructors.candle_emitter import CandleEmitter
 from octobot_websockets.data.candle import Candle
 from octobot_websockets.feeds.feed import Feed
 
 
 class CandleConstructor:
     def __init__(self, feed: Feed, symbol: str, time_frame: TimeFrames, started_candle: list):
-        self.should_stop = False
         self.feed = feed
         self.symbol = symbol
         self.candle = None
@@ -40,38 +40,103 @@ class CandleConstructor:
         self.candle.opn, self.candle.high, self.candle.low, self.candle.close, self.candle.vol = started_candle
 
         self.time_frame_seconds = TimeFramesMinutes[self.time_frame] * MINUTE_TO_SECONDS
-        self.time_frame_delta = self.time_frame_seconds - (time() - started_candle[0])
-        self.candle_task = asyncio.create_task(self.release_candle())
+        self.feed.candle_scheduler.register(self.time_frame_seconds, self)
 
-    async def handle_recent_trade(self, price: float, vol: float):
+        self.history = self.feed.get_candle_history(self.symbol, self.time_frame)
+        self.last_close_timestamp = 0
+        self.emitter = CandleEmitter(self.feed, self._push_kline)
+
+    def stop(self):
+        self.feed.candle_scheduler.unregister(self.time_frame_seconds, self)
+        self.emitter.stop()
+
+    async def handle_recent_trade(self, price: float, vol: float, timestamp: float = 0):
+        """
+        :param timestamp: the exchange trade timestamp in seconds, when provided trades included
+        in a backfilled candle are ignored
+        """
+        if self.emitter.is_buffering_trades():
+            self.emitter.buffer_trade(price, vol, timestamp)
+            return
+        await self._handle_trade(price, vol, timestamp)
+
+    async def _handle_trade(self, price: float, vol: float, timestamp: float):
+        if timestamp and self.emitter.is_backfilled(timestamp):
+            return
         if self.candle is None:
-            self.candle = Candle(price)
+            now = time()
+            self.candle = Candle(price, now - now % self.time_frame_seconds)
 
         self.candle.handle_candle_update(price, vol)
+        await self.emitter.on_candle_update(self.candle.close)
+
+    async def _push_kline(self):
+        if self.candle is None:
+            return
+        # klines are timestamped with their candle start
+        await self.feed.callbacks[Feeds.KLINE].handle_event(self._create_event(self.candle.start_timestamp))
+
+    def _create_event(self, timestamp):
+        return CandleEvent(feed=self.feed.get_name(),
+                           symbol=self.symbol,
+                           timestamp=timestamp,
+                           time_frame=self.time_frame,
+                           close=self.candle.close,
+                           volume=self.candle.vol,
+                           high=self.candle.high,
+                           low=self.candle.low,
+                           opn=self.candle.opn)
+
+    def hold_candles(self, outage_start):
+        """
+        Stop closing the candles of the periods ending after outage_start until they are backfilled
+        """
+        self.emitter.hold_candles(outage_start)
+
+    async def fetch_backfill(self, since: float) -> list:
+        """
+        :return: the candles since the one in progress at since
+        """
+        return await self.emitter.fetch_backfill(self.symbol, self.time_frame, self.time_frame_seconds, since)
+
+    async def handle_backfill(self, candles: list, since: float):
+        """
+        Emit the candles that closed after since, correct the ones already closed with the trades received
+        before since, recover the in progress candle and apply the trades received since the outage
+        :param candles: ccxt OHLCV candles
+        """
+        self.emitter.release_candles()
+        now = time()
+        for timestamp, opn, high, low, close, vol in candles:
+            candle = Candle(opn, timestamp / 1000)
+            candle.set_values(opn, high, low, close, vol)
+            close_timestamp = candle.start_timestamp + self.time_frame_seconds
+            if close_timestamp > now:
+                self.candle = candle
+                self.emitter.set_backfilled()
+            elif close_timestamp > self.last_close_timestamp or \
+                    (close_timestamp == self.last_close_timestamp and close_timestamp > since):
+                # the candle closed at last_close_timestamp is replaced when it was closed after since
+                self.candle = candle
+                await self.close_candles(close_timestamp)
+        # periods without backfilled candle
+        await self.close_candles(now - now % self.time_frame_seconds)
+        trade = self.emitter.pop_pending_trade()
+        while trade is not None:
+            await self._handle_trade(*trade)
+            trade = self.emitter.pop_pending_trade()
 
-        await self.feed.callbacks[Feeds.KLINE](feed=self.feed.get_name(),
-                                               symbol=self.symbol,
-                                               timestamp=self.candle.close_timestamp,
-                                               time_frame=self.time_frame,
-                                               close=self.candle.close,
-                                               volume=self.candle.vol,
-                                               high=self.candle.high,
-                                               low=self.candle.low,
-                                               opn=self.candle.opn)
-
-    async def release_candle(self):
-        await asyncio.sleep(self.time_frame_delta)
-        while not self.should_stop:
-            if self.candle is not None:
-                self.candle.on_close()
-                await self.feed.callbacks[Feeds.CANDLE](feed=self.feed.get_name(),
-                                                        symbol=self.symbol,
-                                                        timestamp=self.candle.close_timestamp,
-                                                        time_frame=self.time_frame,
-                                                        close=self.candle.close,
-                                                        volume=self.candle.vol,
-                                                        high=self.candle.high,
-                                                        low=self.candle.low,
-                                                        opn=self.candle.opn)
-                self.candle = None
-            await asyncio.sleep(self.time_frame_seconds)
+    async def close_candles(self, timestamp: float):
+        """
+        Called by the feed candle scheduler at each time frame boundary
+        """
+        if self.emitter.get_close_timestamp(timestamp) < timestamp:
+            return
+        if self.candle is not None and self.candle.start_timestamp < timestamp:
+            self.emitter.on_candle_close()
+            self.candle.on_close(timestamp)
+            self.last_close_timestamp = timestamp
+            if self.history is not None:
+                self.history.add_candle(self.candle)
+            await self.feed.callbacks[Feeds.CANDLE].handle_event(self._create_event(self.candle.close_timestamp))
+            self.candle = None
@@ -0,0 +1,39 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+from octobot_websockets.constructors.update_throttler cimport UpdateThrottler
+from octobot_websockets.feeds.feed cimport Feed
+
+cdef class CandleEmitter:
+    cdef double last_kline_close
+    cdef double held_since
+    cdef double backfill_request_time
+    cdef double backfilled_until
+    cdef list pending_trades
+
+    cdef Feed feed
+    cdef object push_klines
+    cdef UpdateThrottler kline_throttler
+
+    cpdef stop(self)
+    cpdef on_candle_close(self)
+    cpdef hold_candles(self, double outage_start)
+    cpdef release_candles(self)
+    cpdef bint is_buffering_trades(self)
+    cpdef buffer_trade(self, double price, double vol, double timestamp)
+    cpdef tuple pop_pending_trade(self)
+    cpdef double get_close_timestamp(self, double timestamp)
+    cpdef bint is_backfilled(self, double timestamp)
+    cpdef set_backfilled(self)
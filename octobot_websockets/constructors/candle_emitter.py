@@ -0,0 +1,113 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+from time import time
+
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.constants import KlineEmissionPolicies
+from octobot_websockets.constructors.update_throttler import UpdateThrottler
+from octobot_websockets.feeds.feed import Feed
+
+
+class CandleEmitter:
+    """
+    Emission logic shared by the candle constructors: in progress candle updates are pushed as klines
+    following the feed kline_emission_policy and, during a connection outage, candles closing after
+    the outage start are held until they are backfilled from the exchange. Trades received from the outage
+    to the end of the backfill are buffered to be applied on top of the backfilled candles.
+    """
+
+    def __init__(self, feed: Feed, push_klines):
+        self.feed = feed
+        self.push_klines = push_klines
+        self.last_kline_close = 0
+        self.kline_throttler = UpdateThrottler(self.feed.kline_update_interval / 1000, self.push_klines)
+        # outage start until backfill, 0 when connected
+        self.held_since = 0
+        # trades received while holding candles, None when not holding
+        self.pending_trades = None
+        self.backfill_request_time = 0
+        # trades before this timestamp are included in the backfilled candles
+        self.backfilled_until = 0
+
+    def stop(self):
+        self.kline_throttler.close()
+
+    async def on_candle_update(self, close: float):
+        if self.feed.kline_emission_policy == KlineEmissionPolicies.INTERVAL:
+            await self.kline_throttler.on_update()
+        elif self.feed.kline_emission_policy == KlineEmissionPolicies.PRICE_CHANGE:
+            if close != self.last_kline_close:
+                self.last_kline_close = close
+                await self.push_klines()
+        else:
+            await self.push_klines()
+
+    def on_candle_close(self):
+        self.kline_throttler.cancel()
+        self.last_kline_close = 0
+
+    def hold_candles(self, outage_start):
+        """
+        Stop closing the candles of the periods ending after outage_start until they are backfilled
+        """
+        if not self.held_since or outage_start < self.held_since:
+            self.held_since = outage_start
+        if self.pending_trades is None:
+            self.pending_trades = []
+
+    def release_candles(self):
+        self.held_since = 0
+
+    def is_buffering_trades(self):
+        return self.pending_trades is not None
+
+    def buffer_trade(self, price, vol, timestamp):
+        self.pending_trades.append((price, vol, timestamp))
+
+    def pop_pending_trade(self):
+        """
+        :return: the next buffered trade, None when there is none left and new trades are not buffered anymore
+        """
+        if self.pending_trades:
+            return self.pending_trades.pop(0)
+        self.pending_trades = None
+        return None
+
+    def get_close_timestamp(self, timestamp):
+        """
+        :return: timestamp or the outage start when the candles closing after it are held
+        """
+        if self.held_since and timestamp > self.held_since:
+            return self.held_since
+        return timestamp
+
+    def is_backfilled(self, timestamp):
+        return timestamp < self.backfilled_until
+
+    def set_backfilled(self):
+        """
+        Ignore the trades received before the backfill request, they are included in the backfilled candle
+        """
+        self.backfilled_until = self.backfill_request_time
+
+    async def fetch_backfill(self, symbol: str, time_frame: TimeFrames, time_frame_seconds: int, since: float) -> list:
+        """
+        :return: the time_frame candles since the one in progress at since
+        """
+        self.backfill_request_time = time()
+        return await self.feed.async_ccxt_client.fetch_ohlcv(
+            symbol, time_frame.value, since=int((since - since % time_frame_seconds) * 1000))
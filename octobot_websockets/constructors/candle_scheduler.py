@@ -0,0 +1,86 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+from time import time
+
+from octobot_commons.logging.logging_util import get_logger
+
+
+class CandleCloseScheduler:
+    """
+    Closes the candles of all the registered candle constructors from a single task:
+    it wakes up once per time frame boundary (CLOSE_DELAY seconds after it to let late trades in)
+    and calls close_candles(boundary_timestamp) of every constructor whose time frame ends there,
+    from the smallest time frame to the largest one and in registration order.
+    It waits for a constructor to register when none is registered.
+    """
+    CLOSE_DELAY = 1
+
+    def __init__(self):
+        self.logger = get_logger(self.__class__.__name__)
+        self.constructors = {}
+        self.scheduler_task = None
+        self.should_stop = False
+        self.registered_event = asyncio.Event()
+
+    def register(self, time_frame_seconds, constructor):
+        self.constructors.setdefault(time_frame_seconds, []).append(constructor)
+        self.registered_event.set()
+        if self.scheduler_task is None:
+            self.should_stop = False
+            self.scheduler_task = asyncio.create_task(self._run())
+
+    def unregister(self, time_frame_seconds, constructor):
+        constructors = self.constructors.get(time_frame_seconds, [])
+        if constructor in constructors:
+            constructors.remove(constructor)
+            if not constructors:
+                del self.constructors[time_frame_seconds]
+
+    def stop(self):
+        self.should_stop = True
+        if self.scheduler_task is not None:
+            self.scheduler_task.cancel()
+            self.scheduler_task = None
+
+    async def _run(self):
+        # boundaries before the scheduler start are not closed
+        last_boundary = time()
+        while not self.should_stop:
+            if not self.constructors:
+                self.registered_event.clear()
+                await self.registered_event.wait()
+                # boundaries reached without registered constructors are not closed
+                last_boundary = time()
+            now = time()
+            # boundaries reached during the close delay of the previous one or while the loop was busy
+            # are not skipped
+            reference = max(now - self.CLOSE_DELAY, last_boundary)
+            boundary = min(int(reference // time_frame_seconds + 1) * time_frame_seconds
+                           for time_frame_seconds in self.constructors)
+            await asyncio.sleep(max(0, boundary + self.CLOSE_DELAY - now))
+            await self.close_candles(boundary)
+            last_boundary = boundary
+
+    async def close_candles(self, boundary_timestamp: int):
+        for time_frame_seconds in sorted(self.constructors):
+            if boundary_timestamp % time_frame_seconds == 0:
+                for constructor in list(self.constructors[time_frame_seconds]):
+                    try:
+                        await constructor.close_candles(boundary_timestamp)
+                    except Exception as e:
+                        self.logger.error(f"Failed to close candles ({e})")
@@ -0,0 +1,69 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+from octobot_commons.logging.logging_util import get_logger
+
+
+class UpdateThrottler:
+    """
+    Awaits emit_callback at most once per interval (in seconds): updates received before the end
+    of the interval are conflated into a single deferred emission of the latest state
+    """
+
+    def __init__(self, interval: float, emit_callback):
+        self.logger = get_logger(self.__class__.__name__)
+        self.interval = interval
+        self.emit_callback = emit_callback
+        self.last_emit_time = 0
+        self.flush_handle = None
+        self.emit_task = None
+
+    async def on_update(self, force: bool = False):
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        if force or now - self.last_emit_time >= self.interval:
+            self.cancel()
+            self.last_emit_time = now
+            await self.emit_callback()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.last_emit_time + self.interval - now, self._flush)
+
+    def cancel(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+    def close(self):
+        """
+        Cancels the pending emission and the deferred one in progress
+        """
+        self.cancel()
+        if self.emit_task is not None:
+            self.emit_task.cancel()
+            self.emit_task = None
+
+    def _flush(self):
+        self.flush_handle = None
+        self.last_emit_time = asyncio.get_event_loop().time()
+        self.emit_task = asyncio.create_task(self._emit())
+
+    async def _emit(self):
+        try:
+            await self.emit_callback()
+        except Exception as e:
+            self.logger.error(f"Failed to emit conflated update ({e})")
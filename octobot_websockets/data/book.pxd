@@ -14,10 +14,58 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+from cpython cimport array
+
+cdef class BookSide:
+    cdef public bint is_descending
+    cdef public int length
+    cdef public int capacity
+    cdef public int cumulative_length
+    cdef public double total_size
+    cdef public double total_notional
+    cdef public array.array prices
+    cdef public array.array sizes
+    cdef public array.array cumulative_sizes
+    cdef public array.array cumulative_notionals
+
+    cdef object _prices_view
+    cdef object _sizes_view
+
+    cdef _allocate(self, int capacity)
+    cdef int _find_index(self, double price)
+    cdef int _get_view_length(self, int limit)
+    cdef _on_level_change(self, int index, double price, double size_change)
+    cdef _update_cumulative_values(self, int length)
+
+    cpdef bint set_level(self, double price, double size)
+    cpdef bint remove_level(self, double price)
+    cpdef reset(self, list levels)
+    cpdef double get_best_price(self)
+    cpdef double get_best_size(self)
+    cpdef object get_prices_view(self, int limit=*)
+    cpdef object get_sizes_view(self, int limit=*)
+    cpdef double get_depth(self, int limit=*)
+    cpdef double get_sweep_price(self, double size)
+    cpdef list get_levels(self)
 
 cdef class Book:
     cdef public timestamp
-    cdef public list bids
-    cdef public list asks
+    cdef public long long sequence
+    cdef public BookSide bid_side
+    cdef public BookSide ask_side
+
+    cdef _handle_side_delta(self, BookSide book_side, dict side_delta)
 
-    cpdef handle_book_update(self, list bids, list asks)
+    cpdef handle_book_update(self, list bids, list asks, long long sequence=*)
+    cpdef handle_book_delta(self, dict delta, long long sequence=*)
+    cpdef tuple get_top_bids(self, int limit=*)
+    cpdef tuple get_top_asks(self, int limit=*)
+    cpdef long long get_checksum(self, int depth=*)
+    cpdef double get_mid_price(self)
+    cpdef double get_spread(self)
+    cpdef double get_bid_depth(self, int limit=*)
+    cpdef double get_ask_depth(self, int limit=*)
+    cpdef double get_buy_price(self, double size)
+    cpdef double get_sell_price(self, double size)
+    cpdef double get_best_bid(self)
+    cpdef double get_best_ask(self)
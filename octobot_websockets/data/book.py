@@ -14,17 +14,310 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import array
 import operator
+import zlib
 from time import time
 
+from octobot_websockets.constants import BID, ASK, ADD, DEL, UPD
+
+
+class BookSide:
+    """
+    One side of an L2 book: price levels kept sorted from the best price to the worst one
+    so that deltas are applied with a binary search instead of a full re-sort.
+    Levels are stored in contiguous float64 arrays that are only reallocated when their capacity is reached,
+    top levels can then be exposed as memoryviews without copy.
+    Cumulative values per level are only recomputed from the first changed level and as deep as requested.
+    Total size and notional are maintained on each level change and reset to the cumulative values whenever
+    those are recomputed down to the last level, so that float rounding errors don't accumulate.
+    """
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, is_descending: bool):
+        self.is_descending = is_descending
+        self.length = 0
+        self.capacity = 0
+        self.cumulative_length = 0
+        self.total_size = 0
+        self.total_notional = 0
+        self._allocate(self.INITIAL_CAPACITY)
+
+    def _allocate(self, capacity):
+        prices = array.array('d', [0]) * capacity
+        sizes = array.array('d', [0]) * capacity
+        cumulative_sizes = array.array('d', [0]) * capacity
+        cumulative_notionals = array.array('d', [0]) * capacity
+        if self.length:
+            prices[:self.length] = self.prices[:self.length]
+            sizes[:self.length] = self.sizes[:self.length]
+        if self.cumulative_length:
+            cumulative_sizes[:self.cumulative_length] = self.cumulative_sizes[:self.cumulative_length]
+            cumulative_notionals[:self.cumulative_length] = self.cumulative_notionals[:self.cumulative_length]
+        # previous arrays are left untouched for the views that still reference them
+        self.prices = prices
+        self.sizes = sizes
+        self.cumulative_sizes = cumulative_sizes
+        self.cumulative_notionals = cumulative_notionals
+        self._prices_view = memoryview(self.prices)
+        self._sizes_view = memoryview(self.sizes)
+        self.capacity = capacity
+
+    def _find_index(self, price):
+        low: int = 0
+        high: int = self.length
+        while low < high:
+            middle: int = (low + high) // 2
+            if (self.prices[middle] > price) if self.is_descending else (self.prices[middle] < price):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def set_level(self, price, size):
+        """
+        Set the size of a price level, a 0 size removes the level
+        :return: True when the level is now the best one of the side
+        """
+        if not size:
+            self.remove_level(price)
+            return False
+        index: int = self._find_index(price)
+        if index < self.length and self.prices[index] == price:
+            self._on_level_change(index, price, size - self.sizes[index])
+            self.sizes[index] = size
+        else:
+            self._on_level_change(index, price, size)
+            if self.length == self.capacity:
+                self._allocate(self.capacity * 2)
+            self._prices_view[index + 1:self.length + 1] = self._prices_view[index:self.length]
+            self._sizes_view[index + 1:self.length + 1] = self._sizes_view[index:self.length]
+            self.prices[index] = price
+            self.sizes[index] = size
+            self.length += 1
+        return index == 0
+
+    def remove_level(self, price):
+        """
+        :return: True when the level existed
+        """
+        index: int = self._find_index(price)
+        if index < self.length and self.prices[index] == price:
+            self._on_level_change(index, price, -self.sizes[index])
+            self._prices_view[index:self.length - 1] = self._prices_view[index + 1:self.length]
+            self._sizes_view[index:self.length - 1] = self._sizes_view[index + 1:self.length]
+            self.length -= 1
+            if not self.length:
+                self.total_size = 0
+                self.total_notional = 0
+            return True
+        return False
+
+    def _on_level_change(self, index, price, size_change):
+        self.total_size += size_change
+        self.total_notional += size_change * price
+        if index < self.cumulative_length:
+            self.cumulative_length = index
+
+    def reset(self, levels):
+        self.length = 0
+        self.cumulative_length = 0
+        self.total_size = 0
+        self.total_notional = 0
+        if len(levels) > self.capacity:
+            self._allocate(max(len(levels), self.capacity * 2))
+        for price, size in sorted(levels, key=operator.itemgetter(0), reverse=self.is_descending):
+            if size:
+                self.prices[self.length] = price
+                self.sizes[self.length] = size
+                self.total_size += size
+                self.total_notional += size * price
+                self.length += 1
+
+    def get_best_price(self):
+        return self.prices[0] if self.length else 0
+
+    def get_best_size(self):
+        return self.sizes[0] if self.length else 0
+
+    def get_prices_view(self, limit=-1):
+        """
+        :return: a zero-copy view on the best prices, only valid until the next side update
+        """
+        return self._prices_view[:self._get_view_length(limit)]
+
+    def get_sizes_view(self, limit=-1):
+        """
+        :return: a zero-copy view on the best prices sizes, only valid until the next side update
+        """
+        return self._sizes_view[:self._get_view_length(limit)]
+
+    def _get_view_length(self, limit):
+        return self.length if limit < 0 or limit > self.length else limit
+
+    def _update_cumulative_values(self, length):
+        index: int
+        for index in range(self.cumulative_length, length):
+            if index:
+                self.cumulative_sizes[index] = self.cumulative_sizes[index - 1] + self.sizes[index]
+                self.cumulative_notionals[index] = self.cumulative_notionals[index - 1] + \
+                    self.sizes[index] * self.prices[index]
+            else:
+                self.cumulative_sizes[index] = self.sizes[index]
+                self.cumulative_notionals[index] = self.sizes[index] * self.prices[index]
+        if length > self.cumulative_length:
+            self.cumulative_length = length
+        if length and length == self.length:
+            self.total_size = self.cumulative_sizes[length - 1]
+            self.total_notional = self.cumulative_notionals[length - 1]
+
+    def get_depth(self, limit=-1):
+        """
+        :return: the cumulative size of the best limit levels (of all levels when limit is negative)
+        """
+        length: int = self._get_view_length(limit)
+        if length == 0:
+            return 0
+        self._update_cumulative_values(length)
+        return self.cumulative_sizes[length - 1]
+
+    def get_sweep_price(self, size):
+        """
+        :return: the average price (VWAP) of a market order of size sweeping this side,
+        0 when the side is not deep enough
+        """
+        if size <= 0:
+            return 0
+        if size > self.total_size:
+            # the incrementally maintained total can be slightly off, check with the cumulative size
+            self._update_cumulative_values(self.length)
+            if size > self.total_size:
+                return 0
+        # extend cumulative values until size is reached
+        while self.cumulative_length < self.length and \
+                (not self.cumulative_length or self.cumulative_sizes[self.cumulative_length - 1] < size):
+            self._update_cumulative_values(self.cumulative_length + 1)
+        low: int = 0
+        high: int = self.cumulative_length - 1
+        while low < high:
+            middle: int = (low + high) // 2
+            if self.cumulative_sizes[middle] < size:
+                low = middle + 1
+            else:
+                high = middle
+        if low:
+            return (self.cumulative_notionals[low - 1] +
+                    (size - self.cumulative_sizes[low - 1]) * self.prices[low]) / size
+        return self.prices[0]
+
+    def get_levels(self):
+        return [[self.prices[index], self.sizes[index]] for index in range(self.length)]
+
 
 class Book:
     def __init__(self):
-        self.asks = []
-        self.bids = []
+        self.bid_side = BookSide(True)
+        self.ask_side = BookSide(False)
         self.timestamp = 0
+        self.sequence = 0
+
+    @property
+    def bids(self):
+        return self.bid_side.get_levels()
+
+    @property
+    def asks(self):
+        return self.ask_side.get_levels()
+
+    def handle_book_update(self, bids, asks, sequence=0):
+        """
+        Rebuild the whole book from a snapshot, should only be used on (re)synchronization
+        """
+        self.bid_side.reset(bids)
+        self.ask_side.reset(asks)
+        self.sequence = sequence
+        self.timestamp = time()
 
-    def handle_book_update(self, bids, asks):
-        self.bids = sorted(bids, key=operator.itemgetter(0), reverse=True)
-        self.asks = sorted(asks, key=operator.itemgetter(0))
+    def handle_book_delta(self, delta, sequence=0):
+        """
+        Apply a delta in the UpdatedBookCallback format
+        """
+        self._handle_side_delta(self.bid_side, delta.get(BID))
+        self._handle_side_delta(self.ask_side, delta.get(ASK))
+        if sequence:
+            self.sequence = sequence
         self.timestamp = time()
+
+    def _handle_side_delta(self, book_side, side_delta):
+        if not side_delta:
+            return
+        for price in side_delta.get(DEL, ()):
+            book_side.remove_level(price)
+        for price, size in side_delta.get(ADD, ()):
+            book_side.set_level(price, size)
+        for price, size in side_delta.get(UPD, ()):
+            book_side.set_level(price, size)
+
+    def get_top_bids(self, limit=-1):
+        """
+        :return: (prices, sizes) zero-copy views on the best bids, only valid until the next book update
+        """
+        return self.bid_side.get_prices_view(limit), self.bid_side.get_sizes_view(limit)
+
+    def get_top_asks(self, limit=-1):
+        """
+        :return: (prices, sizes) zero-copy views on the best asks, only valid until the next book update
+        """
+        return self.ask_side.get_prices_view(limit), self.ask_side.get_sizes_view(limit)
+
+    def get_checksum(self, depth=25):
+        """
+        :return: the CRC32 of the "bid_price:bid_size:ask_price:ask_size:..." string of the top depth levels
+        """
+        values = []
+        for index in range(depth):
+            if index < self.bid_side.length:
+                values.append(f"{self.bid_side.prices[index]}:{self.bid_side.sizes[index]}")
+            if index < self.ask_side.length:
+                values.append(f"{self.ask_side.prices[index]}:{self.ask_side.sizes[index]}")
+        return zlib.crc32(":".join(values).encode())
+
+    def get_mid_price(self):
+        """
+        :return: the middle of the best bid and ask prices, 0 when a side is empty
+        """
+        if self.bid_side.length and self.ask_side.length:
+            return (self.bid_side.prices[0] + self.ask_side.prices[0]) / 2
+        return 0
+
+    def get_spread(self):
+        """
+        :return: the best ask price minus the best bid price, 0 when a side is empty
+        """
+        if self.bid_side.length and self.ask_side.length:
+            return self.ask_side.prices[0] - self.bid_side.prices[0]
+        return 0
+
+    def get_bid_depth(self, limit=-1):
+        return self.bid_side.get_depth(limit)
+
+    def get_ask_depth(self, limit=-1):
+        return self.ask_side.get_depth(limit)
+
+    def get_buy_price(self, size):
+        """
+        :return: the average price paid to buy size by sweeping the asks, 0 when asks are not deep enough
+        """
+        return self.ask_side.get_sweep_price(size)
+
+    def get_sell_price(self, size):
+        """
+        :return: the average price received to sell size by sweeping the bids, 0 when bids are not deep enough
+        """
+        return self.bid_side.get_sweep_price(size)
+
+    def get_best_bid(self):
+        return self.bid_side.get_best_price()
+
+    def get_best_ask(self):
+        return self.ask_side.get_best_price()
@@ -27,4 +27,6 @@ cdef class Candle:
     cdef public bint is_closed
 
     cpdef handle_candle_update(self, double price, double vol)
-    cpdef on_close(self)
+    cpdef set_values(self, double opn, double high, double low, double close, double vol)
+    cpdef merge_candle(self, Candle candle)
+    cpdef on_close(self, double close_timestamp=*)
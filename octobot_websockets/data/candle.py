@@ -18,13 +18,13 @@ from time import time
 
 
 class Candle:
-    def __init__(self, price: float):
+    def __init__(self, price: float, start_timestamp: float = 0):
         self.opn = price
         self.high = price
         self.low = price
         self.close = price
         self.vol = 0
-        self.start_timestamp = time()
+        self.start_timestamp = start_timestamp if start_timestamp else time()
         self.close_timestamp = 0
 
     def handle_candle_update(self, price, vol):
@@ -37,5 +37,25 @@ class Candle:
         self.close = price
         self.vol += vol
 
-    def on_close(self):
-        self.close_timestamp = time()
+    def set_values(self, opn, high, low, close, vol):
+        self.opn = opn
+        self.high = high
+        self.low = low
+        self.close = close
+        self.vol = vol
+
+    def merge_candle(self, candle):
+        """
+        Roll up a following candle into this one
+        """
+        if self.high < candle.high:
+            self.high = candle.high
+
+        if self.low > candle.low:
+            self.low = candle.low
+
+        self.close = candle.close
+        self.vol += candle.vol
+
+    def on_close(self, close_timestamp=0):
+        self.close_timestamp = close_timestamp if close_timestamp else time()
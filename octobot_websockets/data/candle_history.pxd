@@ -0,0 +1,39 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+from cpython cimport array
+
+from octobot_websockets.data.candle cimport Candle
+
+cdef class CandleHistory:
+    cdef public int capacity
+    cdef public int size
+    cdef public int index
+    cdef public array.array timestamps
+    cdef public array.array opens
+    cdef public array.array highs
+    cdef public array.array lows
+    cdef public array.array closes
+    cdef public array.array volumes
+
+    cdef _set_values(self, int index, double timestamp, double opn, double high, double low, double close, double vol)
+    cdef object _get_view(self, array.array values, int limit)
+
+    cpdef add_candle(self, Candle candle)
+    cpdef add_values(self, double timestamp, double opn, double high, double low, double close, double vol)
+    cpdef tuple get_last_candles(self, int limit=*)
+    cpdef object get_last_closes(self, int limit=*)
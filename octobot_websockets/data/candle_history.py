@@ -0,0 +1,85 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import array
+
+
+class CandleHistory:
+    """
+    Fixed capacity ring buffer of closed candles stored as OHLCV float64 columns.
+    Each candle is written twice, capacity apart, so that the last candles are always contiguous
+    and can be returned as memoryviews without copy.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self.index = 0
+        self.timestamps = array.array('d', [0]) * (2 * capacity)
+        self.opens = array.array('d', [0]) * (2 * capacity)
+        self.highs = array.array('d', [0]) * (2 * capacity)
+        self.lows = array.array('d', [0]) * (2 * capacity)
+        self.closes = array.array('d', [0]) * (2 * capacity)
+        self.volumes = array.array('d', [0]) * (2 * capacity)
+
+    def add_candle(self, candle):
+        self.add_values(candle.start_timestamp, candle.opn, candle.high, candle.low, candle.close, candle.vol)
+
+    def add_values(self, timestamp, opn, high, low, close, vol):
+        """
+        Add a closed candle or replace the last one when it has the same timestamp (corrected candle)
+        """
+        if self.size:
+            last_index: int = self.index - 1 if self.index else self.capacity - 1
+            if self.timestamps[last_index] == timestamp:
+                self._set_values(last_index, timestamp, opn, high, low, close, vol)
+                self._set_values(last_index + self.capacity, timestamp, opn, high, low, close, vol)
+                return
+        self._set_values(self.index, timestamp, opn, high, low, close, vol)
+        self._set_values(self.index + self.capacity, timestamp, opn, high, low, close, vol)
+        self.index = (self.index + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def _set_values(self, index, timestamp, opn, high, low, close, vol):
+        self.timestamps[index] = timestamp
+        self.opens[index] = opn
+        self.highs[index] = high
+        self.lows[index] = low
+        self.closes[index] = close
+        self.volumes[index] = vol
+
+    def get_last_candles(self, limit=-1):
+        """
+        :return: (timestamps, opens, highs, lows, closes, volumes) memoryviews on the last limit candles
+        from the oldest to the newest one, timestamps being candles start timestamps
+        """
+        return self._get_view(self.timestamps, limit), \
+            self._get_view(self.opens, limit), \
+            self._get_view(self.highs, limit), \
+            self._get_view(self.lows, limit), \
+            self._get_view(self.closes, limit), \
+            self._get_view(self.volumes, limit)
+
+    def get_last_closes(self, limit=-1):
+        """
+        :return: a memoryview on the last limit candles close prices from the oldest to the newest one
+        """
+        return self._get_view(self.closes, limit)
+
+    def _get_view(self, values, limit):
+        length: int = self.size if limit < 0 or limit > self.size else limit
+        return memoryview(values)[self.index + self.capacity - length:self.index + self.capacity]
@@ -0,0 +1,40 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.data.book cimport Book
+
+cdef class L3Level:
+    cdef public double size
+    cdef public dict orders
+
+cdef class L3Book:
+    cdef public timestamp
+    cdef public Book l2_book
+    cdef public dict orders
+    cdef public dict bid_levels
+    cdef public dict ask_levels
+
+    cdef dict _get_levels(self, bint is_bid)
+    cdef double _add_order(self, object order_id, bint is_bid, double price, double size)
+    cdef double _remove_order(self, object order_id, bint is_bid, double price)
+    cdef _update_l2_level(self, bint is_bid, double price, double size)
+
+    cpdef handle_book_update(self, list orders)
+    cpdef handle_order_add(self, object order_id, str side, double price, double size)
+    cpdef bint handle_order_modify(self, object order_id, double size, object price=*)
+    cpdef bint handle_order_cancel(self, object order_id)
+    cpdef object get_order(self, object order_id)
+    cpdef list get_level_orders(self, str side, double price)
@@ -0,0 +1,146 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from time import time
+
+from octobot_websockets.constants import BID, ASK
+from octobot_websockets.data.book import Book
+
+
+class L3Level:
+    """
+    Orders of a price level, dict insertion order is the level FIFO queue
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.orders = {}
+
+
+class L3Book:
+    """
+    Order by order book indexed by order id, levels sizes are aggregated incrementally
+    into an L2 book that can be used without rebuilding it from the orders
+    """
+
+    def __init__(self):
+        self.l2_book = Book()
+        self.orders = {}
+        self.bid_levels = {}
+        self.ask_levels = {}
+        self.timestamp = 0
+
+    def handle_book_update(self, orders):
+        """
+        Rebuild the whole book from a snapshot of (order_id, side, price, size)
+        """
+        self.orders = {}
+        self.bid_levels = {}
+        self.ask_levels = {}
+        for order_id, side, price, size in orders:
+            self._add_order(order_id, side == BID, price, size)
+        self.l2_book.handle_book_update([[price, level.size] for price, level in self.bid_levels.items()],
+                                        [[price, level.size] for price, level in self.ask_levels.items()])
+        self.timestamp = time()
+
+    def handle_order_add(self, order_id, side, price, size):
+        """
+        Add an order at the back of its level queue, an already known order is modified instead
+        """
+        is_bid = side == BID
+        if order_id in self.orders:
+            if self.orders[order_id][0] == is_bid:
+                self.handle_order_modify(order_id, size, price)
+                return
+            self.handle_order_cancel(order_id)
+        self._update_l2_level(is_bid, price, self._add_order(order_id, is_bid, price, size))
+        self.timestamp = time()
+
+    def handle_order_modify(self, order_id, size, price=None):
+        """
+        Update an order size, a price change moves the order to the back of its new level queue
+        :return: False when the order is unknown
+        """
+        try:
+            is_bid, order_price = self.orders[order_id]
+        except KeyError:
+            return False
+        if price is not None and price != order_price:
+            self._update_l2_level(is_bid, order_price, self._remove_order(order_id, is_bid, order_price))
+            self._update_l2_level(is_bid, price, self._add_order(order_id, is_bid, price, size))
+        else:
+            level = self._get_levels(is_bid)[order_price]
+            level.size += size - level.orders[order_id]
+            level.orders[order_id] = size
+            self._update_l2_level(is_bid, order_price, level.size)
+        self.timestamp = time()
+        return True
+
+    def handle_order_cancel(self, order_id):
+        """
+        :return: False when the order is unknown
+        """
+        try:
+            is_bid, price = self.orders[order_id]
+        except KeyError:
+            return False
+        self._update_l2_level(is_bid, price, self._remove_order(order_id, is_bid, price))
+        self.timestamp = time()
+        return True
+
+    def get_order(self, order_id):
+        """
+        :return: (side, price, size) of the order or None when unknown
+        """
+        try:
+            is_bid, price = self.orders[order_id]
+        except KeyError:
+            return None
+        return (BID if is_bid else ASK), price, self._get_levels(is_bid)[price].orders[order_id]
+
+    def get_level_orders(self, side, price):
+        """
+        :return: [[order_id, size], ...] of a level in queue priority order
+        """
+        level = self._get_levels(side == BID).get(price)
+        return [[order_id, size] for order_id, size in level.orders.items()] if level is not None else []
+
+    def _get_levels(self, is_bid):
+        return self.bid_levels if is_bid else self.ask_levels
+
+    def _add_order(self, order_id, is_bid, price, size):
+        levels = self._get_levels(is_bid)
+        level = levels.get(price)
+        if level is None:
+            level = L3Level()
+            levels[price] = level
+        level.orders[order_id] = size
+        level.size += size
+        self.orders[order_id] = (is_bid, price)
+        return level.size
+
+    def _remove_order(self, order_id, is_bid, price):
+        levels = self._get_levels(is_bid)
+        level = levels[price]
+        level.size -= level.orders.pop(order_id)
+        del self.orders[order_id]
+        if not level.orders:
+            del levels[price]
+            return 0
+        return level.size
+
+    def _update_l2_level(self, is_bid, price, size):
+        (self.l2_book.bid_side if is_bid else self.l2_book.ask_side).set_level(price, size)
@@ -0,0 +1,30 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from cpython cimport array
+
+cdef class LatencyHistogram:
+    cdef public tuple bounds
+    cdef public array.array counts
+    cdef public long long count
+    cdef public double total
+    cdef public double max
+
+    cpdef add(self, double latency)
+    cpdef double get_percentile(self, double percentile)
+    cpdef double get_mean(self)
+    cpdef dict get_stats(self)
+    cpdef reset(self)
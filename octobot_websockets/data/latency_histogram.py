@@ -0,0 +1,75 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import array
+from bisect import bisect_left
+
+# buckets upper bounds in milliseconds, the last bucket counts latencies above the last bound
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed buckets latency histogram in milliseconds, percentiles are the upper bound of their bucket
+    """
+
+    def __init__(self):
+        self.bounds = LATENCY_BUCKETS
+        self.counts = array.array('q', [0]) * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, latency):
+        self.counts[bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def get_percentile(self, percentile):
+        """
+        :return: the upper bound of the bucket of the percentile (in [0, 100]), max latency for the last bucket
+        """
+        if not self.count:
+            return 0
+        threshold: float = self.count * percentile / 100
+        cumulative_count: int = 0
+        for index in range(len(self.bounds)):
+            cumulative_count += self.counts[index]
+            if cumulative_count >= threshold:
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    def get_mean(self):
+        return self.total / self.count if self.count else 0
+
+    def get_stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.get_mean(),
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "max": self.max
+        }
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
@@ -0,0 +1,75 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+ORJSON = "orjson"
+UJSON = "ujson"
+JSON = "json"
+
+
+def get_json_decoder(name=None):
+    """
+    :param name: the decoder to use, the fastest installed one when None
+    :return: the loads function of the decoder
+    """
+    decoders = {ORJSON: orjson, UJSON: ujson, JSON: json}
+    if name is None:
+        for module in decoders.values():
+            if module is not None:
+                return module.loads
+    try:
+        module = decoders[name]
+    except KeyError:
+        raise ValueError(f"Unknown json decoder: {name}")
+    if module is None:
+        raise ImportError(f"{name} is not installed")
+    return module.loads
+
+
+def extract_json_string(message, key):
+    """
+    Reads the value of the first key string field of a raw json message without parsing it
+    :param message: the raw message, as str or bytes
+    :return: the value as str, None when the key is not found or its value is not a string
+    """
+    is_bytes = isinstance(message, (bytes, bytearray))
+    token = f'"{key}"'.encode() if is_bytes else f'"{key}"'
+    quote = b'"' if is_bytes else '"'
+    separator = b':' if is_bytes else ':'
+    key_index = message.find(token)
+    if key_index == -1:
+        return None
+    key_end = key_index + len(token)
+    start = message.find(quote, key_end)
+    if start == -1 or message[key_end:start].strip() != separator:
+        return None
+    end = message.find(quote, start + 1)
+    if end == -1:
+        return None
+    value = message[start + 1:end]
+    return value.decode() if is_bytes else value
@@ -0,0 +1,44 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.callback cimport Callback
+
+cdef class DispatchQueue:
+    cdef public str name
+    cdef public int max_size
+    cdef public object overflow_policy
+    cdef public object consumer
+    cdef public object logger
+
+    cdef bint is_conflating
+    cdef object events
+    cdef dict last_entries
+    cdef object not_empty
+    cdef object not_full
+    cdef object consumer_task
+
+    cdef public long long max_depth
+    cdef public long long dropped_events
+    cdef public long long conflated_events
+
+    cpdef int get_depth(self)
+    cpdef dict get_stats(self)
+    cpdef stop(self)
+    cdef object _pop_event(self)
+
+cdef class QueuedCallback(Callback):
+    cdef public DispatchQueue queue
+    cdef public bint is_conflatable
@@ -0,0 +1,130 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import asyncio
+from collections import deque
+
+from octobot_commons.logging.logging_util import get_logger
+
+from octobot_websockets.callback import Callback, BookEvent, dispatch_event
+from octobot_websockets.constants import DispatchOverflowPolicies
+
+
+class DispatchQueue:
+    """
+    Bounded queue of callback events (kwargs dicts or event records) consumed by its own task so that
+    slow callbacks do not stall the websocket reader. When full, BLOCK waits for space, DROP_OLDEST drops
+    the oldest event and CONFLATE replaces the pending event of the same key, waiting for space for a new key
+    and for events without key. Events are never conflated while the queue has space.
+    """
+
+    def __init__(self, name: str, max_size: int, overflow_policy: DispatchOverflowPolicies, consumer):
+        self.name = name
+        self.max_size = max_size
+        self.overflow_policy = DispatchOverflowPolicies(overflow_policy)
+        self.consumer = consumer
+        self.logger = get_logger(f"{self.__class__.__name__}[{name}]")
+
+        self.is_conflating = self.overflow_policy is DispatchOverflowPolicies.CONFLATE
+        # [key, event] entries
+        self.events = deque()
+        # key: last pending entry of key, when conflating
+        self.last_entries = {}
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.consumer_task = None
+
+        self.max_depth = 0
+        self.dropped_events = 0
+        self.conflated_events = 0
+
+    def get_depth(self) -> int:
+        return len(self.events)
+
+    async def put(self, key, event):
+        if self.consumer_task is None:
+            self.consumer_task = asyncio.create_task(self._consume())
+        if len(self.events) >= self.max_size:
+            if self.is_conflating and key is not None and key in self.last_entries:
+                self.last_entries[key][1] = event
+                self.conflated_events += 1
+                return
+            if self.overflow_policy is DispatchOverflowPolicies.DROP_OLDEST:
+                self._pop_event()
+                self.dropped_events += 1
+            else:
+                while len(self.events) >= self.max_size:
+                    self.not_full.clear()
+                    await self.not_full.wait()
+        entry = [key, event]
+        self.events.append(entry)
+        if self.is_conflating and key is not None:
+            self.last_entries[key] = entry
+        self.max_depth = max(self.max_depth, len(self.events))
+        self.not_empty.set()
+
+    def _pop_event(self):
+        entry = self.events.popleft()
+        if self.is_conflating and self.last_entries.get(entry[0]) is entry:
+            del self.last_entries[entry[0]]
+        return entry[1]
+
+    async def _consume(self):
+        while True:
+            if not self.events:
+                self.not_empty.clear()
+                await self.not_empty.wait()
+            event = self._pop_event()
+            self.not_full.set()
+            try:
+                await dispatch_event(self.consumer, event)
+            except Exception as e:
+                self.logger.error(f"Error when dispatching {self.name} event : {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "depth": len(self.events),
+            "max_depth": self.max_depth,
+            "dropped": self.dropped_events,
+            "conflated": self.conflated_events
+        }
+
+    def stop(self):
+        if self.consumer_task is not None:
+            self.consumer_task.cancel()
+            self.consumer_task = None
+
+
+class QueuedCallback(Callback):
+    """
+    Dispatches the events of callback through a DispatchQueue. Only in progress candle updates (klines)
+    are conflatable, by symbol and time frame: closed candles and other events are always dispatched.
+    """
+
+    def __init__(self, callback, queue, is_conflatable: bool = False):
+        super().__init__(callback)
+        self.queue = queue
+        self.is_conflatable = is_conflatable
+
+    async def __call__(self, **kwargs):
+        await self.queue.put((kwargs.get("symbol"), kwargs.get("time_frame")) if self.is_conflatable else None,
+                             kwargs)
+
+    async def handle_event(self, event):
+        if isinstance(event, BookEvent):
+            event.detach()
+        await self.queue.put((event.symbol, event.time_frame) if self.is_conflatable else None, event)
@@ -14,6 +14,11 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+from octobot_websockets.constructors.candle_scheduler cimport CandleCloseScheduler
+from octobot_websockets.data.candle_history cimport CandleHistory
+from octobot_websockets.feeds.dispatch_queue cimport QueuedCallback
+from octobot_websockets.feeds.feed_stats cimport FeedStats
+from octobot_websockets.feeds.frame_recorder cimport FrameRecorder
 
 cdef class Feed:
     cdef str api_key
@@ -22,18 +27,37 @@ cdef class Feed:
     cdef int timeout
     cdef int timeout_interval
     cdef int book_update_interval
+    cdef int kline_update_interval
     cdef int updates
+    cdef public long long skipped_messages
+    cdef int candle_history_size
+    cdef int max_topics_per_connection
+    cdef int dispatch_queue_size
+    cdef int stats_log_interval
+    cdef int markets_cache_ttl
 
     cdef bint create_loop
     cdef bint is_connected
     cdef bint do_deltas
     cdef bint should_stop
+    cdef public bint are_markets_loaded
+    cdef bint book_emit_on_top_change
 
+    cdef public list symbols
     cdef public list pairs
     cdef public list time_frames
     cdef public list channels
+    cdef public list shards
+
+    cdef public set routed_pairs
+    cdef public set routed_channels
 
     cdef public dict callbacks
+    cdef public dict exchange_pairs
+    cdef public dict symbols_by_exchange_pair
+    cdef public dict candle_histories
+    cdef public dict dispatch_queues
+    cdef public dict dispatch_overflow_policies
 
     # objects
     cdef public object loop
@@ -42,18 +66,39 @@ cdef class Feed:
     cdef public object websocket_task
     cdef public object ccxt_client
     cdef public object async_ccxt_client
-    cdef object _watch_task
-    cdef object last_msg
+    cdef public object kline_emission_policy
+    cdef public object json_loads
+    cdef public object dispatch_overflow_policy
+    cdef public object stats_task
+    cdef public object markets_cache_dir
+    cdef public FeedStats stats
+    cdef public FrameRecorder recorder
+    cdef public CandleCloseScheduler candle_scheduler
 
     cdef _initialize(self, list pairs, list channels, dict callbacks)
+    cpdef list _create_shards(self)
+    cdef list _get_shard_symbols(self, object shard)
+    cdef _set_markets(self, dict markets)
+    cdef _index_symbols(self, dict markets)
+    cdef QueuedCallback _create_queued_callback(self, object feed_type, object callback)
     cdef on_close(self)
     cdef list get_auth(self)
     cdef list get_pairs(self)
     cdef double fix_timestamp(self, double ts)
     cdef double timestamp_normalize(self, double ts)
     cdef str feed_to_exchange(self, feed)
+
+    cpdef str get_pair_from_exchange(self, str pair)
+    cpdef str get_exchange_pair(self, str pair)
     cdef double safe_float(self, dict dictionary, key, default_value)
 
     cpdef start(self)
+    cpdef hold_shard_candles(self, object shard, double outage_start)
     cpdef stop(self)
     cpdef close(self)
+    cpdef bint should_handle_message(self, object message)
+    cdef bint _is_route_handled(self, object route)
+    cpdef object decode_message(self, object message)
+    cpdef CandleHistory get_candle_history(self, str symbol, object time_frame)
+    cpdef dict get_dispatch_stats(self)
+    cpdef dict get_stats(self)
@@ -16,25 +16,40 @@
 #  License along with this library.
 
 import asyncio
+import sys
+import time
 from abc import abstractmethod
-from asyncio import CancelledError
-from datetime import datetime, timedelta
 from typing import List
 
 import ccxt
 from ccxt.base.exchange import Exchange as ccxtExchange
-import websockets
 
-from octobot_commons.constants import HOURS_TO_SECONDS
 from octobot_commons.enums import TimeFrames
 from octobot_commons.logging.logging_util import get_logger
 
 from octobot_websockets.callback import Callback
-from octobot_websockets.constants import Feeds
+from octobot_websockets.constants import Feeds, KlineEmissionPolicies, DispatchOverflowPolicies, \
+    MARKETS_CACHE_DIR, MARKETS_CACHE_TTL
+from octobot_websockets.constructors.candle_scheduler import CandleCloseScheduler
+from octobot_websockets.data.candle_history import CandleHistory
+from octobot_websockets.decoder import get_json_decoder
+from octobot_websockets.feeds.dispatch_queue import DispatchQueue, QueuedCallback
+from octobot_websockets.feeds.feed_shard import FeedShard, get_reconnect_delay
+from octobot_websockets.feeds.feed_stats import FeedStats, InstrumentedCallback, get_frame_size
+from octobot_websockets.feeds.frame_recorder import FrameRecorder
+from octobot_websockets.feeds.markets_cache import get_cached_markets, load_markets
 
 
 class Feed:
-    MAX_DELAY = HOURS_TO_SECONDS
+    # reconnection backoff and websocket liveness settings, in seconds
+    MAX_DELAY = 30
+    RECONNECT_BASE_DELAY = 0.5
+    PING_INTERVAL = 10
+    PING_TIMEOUT = 10
+    CLOSE_TIMEOUT = 1
+    BACKFILL_MAX_CONCURRENT_REQUESTS = 5
+    # when True, on_message receives the messages decoded by decode_message
+    DECODE_MESSAGES = False
 
     def __init__(self,
                  pairs: list = None,
@@ -44,6 +59,20 @@ class Feed:
                  api_secret: str = None,
                  time_frames: List[TimeFrames] = None,
                  book_interval: int = 1000,
+                 book_emit_on_top_change: bool = False,
+                 kline_emission_policy: KlineEmissionPolicies = KlineEmissionPolicies.EVERY_TRADE,
+                 kline_interval: int = 1000,
+                 candle_history_size: int = 0,
+                 max_topics_per_connection: int = 0,
+                 json_decoder: str = None,
+                 dispatch_queue_size: int = 0,
+                 dispatch_overflow_policy: DispatchOverflowPolicies = DispatchOverflowPolicies.BLOCK,
+                 dispatch_overflow_policies: dict = None,
+                 enable_stats: bool = False,
+                 stats_log_interval: int = 0,
+                 markets_cache_dir: str = MARKETS_CACHE_DIR,
+                 markets_cache_ttl: int = MARKETS_CACHE_TTL,
+                 record_path: str = None,
                  timeout: int = 120,
                  timeout_interval: int = 5,
                  create_loop: bool = True):
@@ -62,32 +91,63 @@ class Feed:
         self.timeout = timeout
         self.timeout_interval = timeout_interval
         self.book_update_interval = book_interval
+        self.book_emit_on_top_change = book_emit_on_top_change
+        # policies can be given by value from configurations
+        self.kline_emission_policy = KlineEmissionPolicies(kline_emission_policy)
+        self.kline_update_interval = kline_interval
+        self.candle_history_size = candle_history_size
+        self.max_topics_per_connection = max_topics_per_connection
+        self.dispatch_queue_size = dispatch_queue_size
+        self.dispatch_overflow_policy = dispatch_overflow_policy
+        self.dispatch_overflow_policies = dispatch_overflow_policies if dispatch_overflow_policies is not None else {}
+        self.stats_log_interval = stats_log_interval
+        self.stats = FeedStats() if enable_stats or stats_log_interval > 0 else None
+        self.stats_task = None
+        self.markets_cache_dir = markets_cache_dir
+        self.markets_cache_ttl = markets_cache_ttl
+        # records every received frame to be replayed with FrameReplayer
+        self.recorder = FrameRecorder(record_path) if record_path else None
         self.updates = 0
+        self.skipped_messages = 0
+        self.json_loads = get_json_decoder(json_decoder)
 
         self.is_connected = False
+        self.are_markets_loaded = False
         self.do_deltas = False
         self.should_stop = False
 
+        self.symbols = []
         self.pairs = []
+        # unified symbol <-> exchange pair indexes
+        self.exchange_pairs = {}
+        self.symbols_by_exchange_pair = {}
         self.channels = []
+        self.routed_pairs = set()
+        self.routed_channels = set()
         self.callbacks = {}
         self.time_frames = time_frames if time_frames is not None else []
 
         self.websocket = None
         self.ccxt_client = None
-        self._watch_task = None
         self.websocket_task = None
-        self.last_msg = datetime.utcnow()
+        self.shards = []
+        self.candle_scheduler = CandleCloseScheduler()
+        self.candle_histories = {}
+        self.dispatch_queues = {}
 
         self._initialize(pairs, channels, callbacks)
 
     def _initialize(self, pairs, channels, callbacks):
-        self.async_ccxt_client = self.get_ccxt_async_client()()
+        self.async_ccxt_client = self.get_ccxt_async_client()({'enableRateLimit': True})
         self.ccxt_client = getattr(ccxt, self.get_name())()
-        self.ccxt_client.load_markets()
 
-        self.pairs = [self.get_exchange_pair(pair) for pair in pairs] if pairs else []
+        self.symbols = pairs if pairs else []
+        # pairs are set when markets are loaded, right away on warm starts and on connection otherwise
+        markets = get_cached_markets(self.get_name(), self.markets_cache_dir, self.markets_cache_ttl)
+        if markets is not None:
+            self._set_markets(markets)
         self.channels = [self.feed_to_exchange(chan) for chan in channels] if channels else []
+        self.routed_channels = set(self.channels)
 
         self.callbacks = {Feeds.TRADES: Callback(None),
                           Feeds.TICKER: Callback(None),
@@ -101,72 +161,215 @@ class Feed:
 
         if callbacks:
             for cb_type, cb_func in callbacks.items():
-                self.callbacks[cb_type] = cb_func
+                if self.stats is not None:
+                    cb_func = InstrumentedCallback(cb_func, self.stats, cb_type)
+                self.callbacks[cb_type] = self._create_queued_callback(cb_type, cb_func) \
+                    if self.dispatch_queue_size > 0 else cb_func
                 if cb_type == Feeds.BOOK_DELTA:
                     self.do_deltas = True
 
+    async def load_markets(self):
+        """
+        Load markets once per exchange with the async client, from the markets cache when possible
+        """
+        if not self.are_markets_loaded:
+            self._set_markets(await load_markets(self.get_name(), self.async_ccxt_client,
+                                                 self.markets_cache_dir, self.markets_cache_ttl))
+
+    def _set_markets(self, markets):
+        self.ccxt_client.set_markets(markets)
+        self.async_ccxt_client.set_markets(markets)
+        self._index_symbols(markets)
+        self.pairs = [self.get_exchange_pair(pair) for pair in self.symbols]
+        self.routed_pairs = set(self.pairs)
+        self.are_markets_loaded = True
+
+    def _index_symbols(self, markets):
+        self.exchange_pairs = {}
+        self.symbols_by_exchange_pair = {}
+        for symbol, market in markets.items():
+            symbol = sys.intern(symbol)
+            exchange_pair = sys.intern(market["id"])
+            self.exchange_pairs[symbol] = exchange_pair
+            # like ccxt, prefer spot markets when several markets share the same id
+            if exchange_pair not in self.symbols_by_exchange_pair or market.get("spot"):
+                self.symbols_by_exchange_pair[exchange_pair] = symbol
+
+    def _create_queued_callback(self, feed_type, callback):
+        queue = DispatchQueue(feed_type.value,
+                              self.dispatch_queue_size,
+                              self.dispatch_overflow_policies.get(feed_type, self.dispatch_overflow_policy),
+                              callback)
+        self.dispatch_queues[feed_type] = queue
+        # closed candles and other events are never conflated
+        return QueuedCallback(callback, queue, feed_type is Feeds.KLINE)
+
     def start(self):
         if self.create_loop:
             self.websocket_task = self.loop.run_until_complete(self._connect())
         else:
             self.websocket_task = self.loop.create_task(self._connect())
 
-    async def _watch(self):
-        if self.last_msg:
-            if datetime.utcnow() - timedelta(seconds=self.timeout) > self.last_msg:
-                self.logger.warning("No messages received within timeout, restarting connection")
-                print("reconnect")
-                await self._reconnect()
-        await asyncio.sleep(self.timeout_interval)
-
     async def _on_error(self, error):
         self.logger.error(f"Error : {error}")
 
     async def _connect(self):
-        """ Connect to websocket feeds """
-        delay: int = 1
-        self._watch_task = None
-        while not self.should_stop:
-            # manage max delay
-            if delay >= self.MAX_DELAY:
-                delay = self.MAX_DELAY
-
+        """ Connect to websocket feeds, the async ccxt client is closed when the connections end or are cancelled """
+        try:
+            await self._wait_for_markets()
+            if self.should_stop:
+                return
+            self.shards = self._create_shards()
+            if self.stats_log_interval > 0:
+                self.stats_task = asyncio.create_task(self._log_stats())
+            for shard in self.shards:
+                shard.start()
+            await asyncio.gather(*(shard.connection_task for shard in self.shards))
+        finally:
+            await self.async_ccxt_client.close()
+
+    async def _wait_for_markets(self):
+        """
+        Load markets, retrying their request with the shards reconnection backoff since pairs can't be
+        subscribed without them. Pairs are resolved once, an unsupported pair raises a ValueError.
+        """
+        if self.are_markets_loaded:
+            return
+        markets = None
+        attempts = 0
+        while markets is None and not self.should_stop:
             try:
-                async with websockets.connect(self.get_address(),
-                                              subprotocols=self.get_sub_protocol()) as websocket:
-                    self.websocket = websocket
-                    await self.on_open()
-                    self._watch_task = asyncio.create_task(self._watch())
-                    # connection was successful, reset retry count and delay
-                    delay = 1
-                    await self.subscribe()
-                    await self._handler()
-            except (websockets.ConnectionClosed,
-                    ConnectionAbortedError,
-                    ConnectionResetError,
-                    CancelledError) as e:
-                self.logger.warning(f"{self.get_name()} encountered connection issue ({e}) - reconnecting...")
-                await asyncio.sleep(delay)
-                delay *= 2
+                markets = await load_markets(self.get_name(), self.async_ccxt_client,
+                                             self.markets_cache_dir, self.markets_cache_ttl)
             except Exception as e:
-                self.logger.error(f"{self.get_name()} encountered an exception ({e}), reconnecting...")
-                await asyncio.sleep(delay)
-                delay *= 2
-
-    async def _handler(self):
-        async for message in self.websocket:
-            self.last_msg = datetime.utcnow()
-            try:
-                await self.on_message(message)
-            except Exception:
-                self.logger.error(f"{self.get_name()}: error handling message {message}")
-                # exception will be logged with traceback when connection handler
-                # retries the connection
-                raise
-
-    async def _reconnect(self):
-        self.stop()
-        await self._connect()
+                self.logger.error(f"{self.get_name()} failed to load markets ({e}), retrying...")
+                await asyncio.sleep(get_reconnect_delay(attempts, self.RECONNECT_BASE_DELAY, self.MAX_DELAY))
+                attempts += 1
+        if markets is not None:
+            self._set_markets(markets)
+
+    def _create_shards(self):
+        if self.max_topics_per_connection <= 0 or not self.pairs:
+            return [FeedShard(self, 0, self.pairs, self.channels)]
+        if type(self).subscribe_shard is Feed.subscribe_shard:
+            self.logger.warning(f"{self.get_name()} does not support several connections, "
+                                f"using a single connection")
+            return [FeedShard(self, 0, self.pairs, self.channels)]
+        if len(self.channels) > self.max_topics_per_connection:
+            # the channels of a pair don't fit in a connection: they are split across connections
+            channels_groups = [self.channels[index:index + self.max_topics_per_connection]
+                               for index in range(0, len(self.channels), self.max_topics_per_connection)]
+            shards = []
+            for pair in self.pairs:
+                for channels in channels_groups:
+                    shards.append(FeedShard(self, len(shards), [pair], channels))
+            return shards
+        pairs_per_shard = self.max_topics_per_connection // max(1, len(self.channels))
+        return [FeedShard(self, shard_id, self.pairs[index:index + pairs_per_shard], self.channels)
+                for shard_id, index in enumerate(range(0, len(self.pairs), pairs_per_shard))]
+
+    async def subscribe_shard(self, shard):
+        """
+        Subscribe to shard channels for shard pairs on shard websocket.
+        To be overwritten by feeds supporting several connections, the default implementation
+        subscribes through subscribe() and is only used with a single connection.
+        """
+        self.websocket = shard.websocket
+        await self.subscribe()
+
+    def hold_shard_candles(self, shard, outage_start):
+        """
+        Hold the candles of shard symbols closing after outage_start until they are backfilled
+        """
+        symbols = self._get_shard_symbols(shard)
+        for constructors in self.candle_scheduler.constructors.values():
+            for constructor in constructors:
+                if symbols is None or constructor.symbol in symbols:
+                    constructor.hold_candles(outage_start)
+
+    async def backfill_shard_candles(self, shard, outage_start):
+        if not self.candle_scheduler.constructors:
+            return
+        await self._backfill_candles(outage_start, self._get_shard_symbols(shard))
+
+    def _get_shard_symbols(self, shard):
+        """
+        :return: the symbols of shard, None when it is the only shard
+        """
+        if len(self.shards) == 1:
+            return None
+        return [self.get_pair_from_exchange(pair) for pair in shard.pairs]
+
+    async def _backfill_candles(self, outage_start, symbols=None):
+        """
+        Fetch the candles of every candle constructor (of symbols when provided) since outage_start
+        with concurrent requests and emit them in time frame order
+        """
+        constructors = [constructor
+                        for time_frame_seconds in sorted(self.candle_scheduler.constructors)
+                        for constructor in self.candle_scheduler.constructors[time_frame_seconds]
+                        if symbols is None or constructor.symbol in symbols]
+        if not constructors:
+            return
+        semaphore = asyncio.Semaphore(self.BACKFILL_MAX_CONCURRENT_REQUESTS)
+
+        async def fetch_backfill(constructor):
+            async with semaphore:
+                try:
+                    return await constructor.fetch_backfill(outage_start)
+                except Exception as e:
+                    self.logger.error(f"{self.get_name()} failed to fetch candles to backfill ({e})")
+                    return []
+
+        self.logger.info(f"{self.get_name()} backfilling candles since {outage_start}")
+        backfills = await asyncio.gather(*(fetch_backfill(constructor) for constructor in constructors))
+        for constructor, candles in zip(constructors, backfills):
+            await constructor.handle_backfill(candles, outage_start)
+
+    async def handle_message(self, message):
+        if self.recorder is not None:
+            self.recorder.record(message)
+        route = self.get_message_route(message)
+        if not self._is_route_handled(route):
+            self.skipped_messages += 1
+            return
+        if self.stats is None:
+            await self.on_message(self.decode_message(message) if self.DECODE_MESSAGES else message)
+        else:
+            await self._handle_instrumented_message(message, route)
+
+    async def _handle_instrumented_message(self, message, route):
+        channel, pair = route if route is not None else (None, None)
+        start = time.perf_counter()
+        content = message
+        if self.DECODE_MESSAGES:
+            content = self.decode_message(message)
+            self.stats.add_decoding(channel, time.perf_counter() - start)
+        await self.on_message(content)
+        self.stats.add_message(channel, pair, get_frame_size(message), time.perf_counter() - start)
+
+    def should_handle_message(self, message) -> bool:
+        """
+        :return: False when the raw message route is a channel or a pair this feed is not subscribed to
+        """
+        return self._is_route_handled(self.get_message_route(message))
+
+    def _is_route_handled(self, route) -> bool:
+        if route is None:
+            return True
+        channel, pair = route
+        return (channel is None or channel in self.routed_channels) and (pair is None or pair in self.routed_pairs)
+
+    def get_message_route(self, message):
+        """
+        To be overwritten to route messages before decoding them, should be cheap (see extract_json_string)
+        :return: the (exchange channel, exchange pair) tuple of the raw message, any of them can be None
+        when unknown, None to always handle the message
+        """
+        return None
+
+    def decode_message(self, message):
+        return self.json_loads(message)
 
     async def on_open(self):
         self.logger.info("Connected")
@@ -175,12 +378,21 @@ class Feed:
         self.logger.info('Websocket Closed')
 
     def stop(self):
-        self.websocket.close()
+        for shard in self.shards:
+            shard.stop()
 
     def close(self):
-        self.stop()
-        self._watch_task.cancel()
-        self.websocket_task.cancel()
+        self.candle_scheduler.stop()
+        for queue in self.dispatch_queues.values():
+            queue.stop()
+        if self.stats_task is not None:
+            self.stats_task.cancel()
+        if self.recorder is not None:
+            self.recorder.close()
+        for shard in self.shards:
+            shard.close()
+        if self.websocket_task is not None:
+            self.websocket_task.cancel()
 
     def get_auth(self):
         return []  # to be overwritten
@@ -280,16 +492,18 @@ class Feed:
             Feeds.PORTFOLIO: cls.get_portfolio_feed()
         }
 
-    def get_pair_from_exchange(self, pair: str) -> str:
-        return self.ccxt_client.market(pair)["symbol"]
+    def get_pair_from_exchange(self, pair):
+        try:
+            return self.symbols_by_exchange_pair[pair]
+        except KeyError:
+            if pair in self.exchange_pairs:
+                return pair
+            raise ValueError(f'{pair} is not supported on {self.get_name()}')
 
-    def get_exchange_pair(self, pair: str) -> str:
-        if pair in self.ccxt_client.symbols:
-            try:
-                return self.ccxt_client.market(pair)["id"]
-            except KeyError:
-                raise KeyError(f'{pair} is not supported on {self.get_name()}')
-        else:
+    def get_exchange_pair(self, pair):
+        try:
+            return self.exchange_pairs[pair]
+        except KeyError:
             raise ValueError(f'{pair} is not supported on {self.get_name()}')
 
     def feed_to_exchange(self, feed):
@@ -299,5 +513,44 @@ class Feed:
             raise ValueError(f"{feed} is not supported on {self.get_name()}")
         return ret
 
+    def get_candle_history(self, symbol, time_frame):
+        """
+        :return: the closed candles history of symbol on time_frame, None when candle_history_size is 0
+        """
+        if not self.candle_history_size:
+            return None
+        try:
+            return self.candle_histories[symbol][time_frame]
+        except KeyError:
+            history = CandleHistory(self.candle_history_size)
+            self.candle_histories.setdefault(symbol, {})[time_frame] = history
+            return history
+
+    def get_dispatch_stats(self) -> dict:
+        """
+        :return: the depth, max depth, dropped and conflated events counters of each channel dispatch queue
+        """
+        return {feed_type: queue.get_stats() for feed_type, queue in self.dispatch_queues.items()}
+
+    def get_stats(self) -> dict:
+        """
+        :return: the feed throughput and latency stats when enabled, its skipped messages and dispatch queues stats
+        """
+        stats = self.stats.get_stats() if self.stats is not None else {}
+        stats["skipped_messages"] = self.skipped_messages
+        stats["dispatch_queues"] = self.get_dispatch_stats()
+        return stats
+
+    async def _log_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_log_interval)
+            self.logger.info(f"{self.get_name()} stats: {self.stats.get_summary()}")
+
+    def get_book_checksum(self, book) -> int:
+        """
+        To be overwritten when the exchange checksum is not computed from the top 25 levels
+        """
+        return book.get_checksum()
+
     def safe_float(self, dictionary, key, default_value):
         return ccxtExchange.safe_float(dictionary, key, default_value)
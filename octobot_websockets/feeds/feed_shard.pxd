@@ -0,0 +1,42 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.feeds.feed cimport Feed
+
+cpdef double get_reconnect_delay(int attempts, double base_delay, double max_delay)
+
+cdef class FeedShard:
+    cdef public Feed feed
+    cdef public int shard_id
+    cdef public list pairs
+    cdef public list channels
+
+    cdef public object websocket
+    cdef public object connection_task
+    cdef public double last_msg
+    cdef public double connected_at
+    cdef public int reconnect_attempts
+    cdef public object backfill_task
+    cdef double backfill_since
+    cdef object _watch_task
+
+    cpdef start(self)
+    cpdef stop(self)
+    cpdef close(self)
+    cpdef bint is_timed_out(self)
+    cpdef double _get_reconnect_delay(self)
+    cdef _start_backfill(self, double outage_start)
+    cdef double _get_last_msg_timestamp(self)
@@ -0,0 +1,171 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import asyncio
+import random
+import time
+from asyncio import CancelledError
+
+import websockets
+
+
+class FeedShard:
+    """
+    One websocket connection of a feed, subscribed to the feed channels for a subset of its pairs.
+    Each shard reconnects independently, all of them forward their messages to the feed handle_message.
+    """
+
+    def __init__(self, feed, shard_id: int, pairs: list, channels: list):
+        self.feed = feed
+        self.shard_id = shard_id
+        self.pairs = pairs
+        self.channels = channels
+
+        self.websocket = None
+        self.connection_task = None
+        self._watch_task = None
+        self.backfill_task = None
+        # start of the outage being backfilled
+        self.backfill_since = 0
+        self.reconnect_attempts = 0
+        # monotonic time of the last received message
+        self.last_msg = time.monotonic()
+        # monotonic time of the last connection
+        self.connected_at = self.last_msg
+
+    def start(self):
+        self.connection_task = asyncio.create_task(self.connect())
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        """ Close the connection when no message is received within feed timeout to trigger a reconnection """
+        while True:
+            await asyncio.sleep(self.feed.timeout_interval)
+            if self.is_timed_out():
+                self.feed.logger.warning(f"No messages received within timeout on shard {self.shard_id}, "
+                                         f"restarting connection")
+                await self.disconnect()
+
+    def is_timed_out(self) -> bool:
+        """
+        :return: True when connected without receiving any message within feed timeout since the last message
+        or the connection
+        """
+        return self.websocket is not None and \
+            time.monotonic() - max(self.last_msg, self.connected_at) > self.feed.timeout
+
+    async def connect(self):
+        """ Connect to the websocket and handle its messages, reconnect when the connection is lost """
+        has_connected: bool = False
+        while not self.feed.should_stop:
+            try:
+                async with websockets.connect(self.feed.get_address(),
+                                              subprotocols=self.feed.get_sub_protocol(),
+                                              ping_interval=self.feed.PING_INTERVAL,
+                                              ping_timeout=self.feed.PING_TIMEOUT,
+                                              close_timeout=self.feed.CLOSE_TIMEOUT) as websocket:
+                    self.websocket = websocket
+                    outage_start = self._get_last_msg_timestamp()
+                    self.connected_at = time.monotonic()
+                    await self.feed.on_open()
+                    await self.feed.subscribe_shard(self)
+                    if has_connected:
+                        # live trades are buffered by the held candle constructors until their backfill
+                        self._start_backfill(outage_start)
+                    has_connected = True
+                    await self._handler()
+            except CancelledError:
+                raise
+            except (websockets.ConnectionClosed,
+                    ConnectionAbortedError,
+                    ConnectionResetError) as e:
+                self.feed.logger.warning(f"{self.feed.get_name()} encountered connection issue on shard "
+                                         f"{self.shard_id} ({e}) - reconnecting...")
+            except Exception as e:
+                self.feed.logger.error(f"{self.feed.get_name()} encountered an exception on shard "
+                                       f"{self.shard_id} ({e}), reconnecting...")
+            finally:
+                self.websocket = None
+            if has_connected:
+                # candles can't be closed without the trades of the outage
+                self.feed.hold_shard_candles(self, self._get_last_msg_timestamp())
+            if not self.feed.should_stop:
+                await asyncio.sleep(self._get_reconnect_delay())
+
+    def _start_backfill(self, outage_start):
+        if self.backfill_task is not None and not self.backfill_task.done():
+            # the candles of the previous outage are not backfilled yet
+            self.backfill_task.cancel()
+            outage_start = min(outage_start, self.backfill_since)
+        self.backfill_since = outage_start
+        self.backfill_task = asyncio.create_task(self._backfill(outage_start))
+
+    async def _backfill(self, outage_start: float):
+        try:
+            await self.feed.backfill_shard_candles(self, outage_start)
+        except CancelledError:
+            raise
+        except Exception as e:
+            self.feed.logger.error(f"{self.feed.get_name()} failed to backfill candles on shard "
+                                   f"{self.shard_id} ({e})")
+
+    def _get_reconnect_delay(self) -> float:
+        delay = get_reconnect_delay(self.reconnect_attempts, self.feed.RECONNECT_BASE_DELAY, self.feed.MAX_DELAY)
+        self.reconnect_attempts += 1
+        return delay
+
+    def _get_last_msg_timestamp(self) -> float:
+        return time.time() - (time.monotonic() - self.last_msg)
+
+    async def _handler(self):
+        async for message in self.websocket:
+            self.last_msg = time.monotonic()
+            # connection is working, reset retry count
+            self.reconnect_attempts = 0
+            try:
+                await self.feed.handle_message(message)
+            except Exception:
+                self.feed.logger.error(f"{self.feed.get_name()}: error handling message {message}")
+                # exception will be logged with traceback when connection handler
+                # retries the connection
+                raise
+
+    async def disconnect(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    def stop(self):
+        if self.websocket is not None:
+            asyncio.create_task(self.disconnect())
+
+    def close(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        if self.backfill_task is not None:
+            self.backfill_task.cancel()
+        if self.connection_task is not None:
+            self.connection_task.cancel()
+
+
+def get_reconnect_delay(attempts, base_delay, max_delay) -> float:
+    """
+    :return: a random delay up to an exponential backoff from base_delay capped to max_delay,
+    the first retry is immediate
+    """
+    if not attempts:
+        return 0
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempts - 1)))
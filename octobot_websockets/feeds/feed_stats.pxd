@@ -0,0 +1,43 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.callback cimport Callback
+from octobot_websockets.data.latency_histogram cimport LatencyHistogram
+
+cpdef long long get_frame_size(object message)
+
+cdef class FeedStats:
+    cdef public double started_at
+    cdef public dict throughputs
+    cdef public dict handling_latencies
+    cdef public dict decoding_latencies
+    cdef public dict callback_latencies
+    cdef public dict exchange_latencies
+
+    cpdef add_message(self, object channel, object pair, long long size, double handling_seconds)
+    cpdef add_decoding(self, object channel, double decoding_seconds)
+    cpdef add_callback(self, str feed_type, object symbol, double callback_seconds, object exchange_timestamp)
+    cpdef dict get_stats(self)
+    cpdef str get_summary(self)
+    cpdef reset(self)
+    cdef LatencyHistogram _get_histogram(self, dict histograms, object key)
+    cdef dict _get_histograms_stats(self, dict histograms)
+    cdef str _get_histograms_summary(self, dict histograms)
+
+cdef class InstrumentedCallback(Callback):
+    cdef FeedStats stats
+    cdef str feed_type
+    cdef bint has_exchange_timestamp
@@ -0,0 +1,151 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import time
+
+from octobot_websockets.callback import Callback
+from octobot_websockets.constants import Feeds
+from octobot_websockets.data.latency_histogram import LatencyHistogram
+
+
+class FeedStats:
+    """
+    Feed messages throughput per channel and pair and latency histograms (in milliseconds) of:
+    - message handling per channel: from the frame reception to the end of on_message
+    - message decoding per channel, when the feed decodes messages
+    - callbacks per feed type
+    - exchange lag per feed type and symbol: from the event exchange timestamp to the end of its callback,
+    books being timestamped on reception are excluded
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        # (channel, pair) -> [messages, bytes]
+        self.throughputs = {}
+        self.handling_latencies = {}
+        self.decoding_latencies = {}
+        self.callback_latencies = {}
+        self.exchange_latencies = {}
+
+    def add_message(self, channel, pair, size, handling_seconds):
+        try:
+            throughput = self.throughputs[(channel, pair)]
+        except KeyError:
+            throughput = self.throughputs[(channel, pair)] = [0, 0]
+        throughput[0] += 1
+        throughput[1] += size
+        self._get_histogram(self.handling_latencies, channel).add(handling_seconds * 1000)
+
+    def add_decoding(self, channel, decoding_seconds):
+        self._get_histogram(self.decoding_latencies, channel).add(decoding_seconds * 1000)
+
+    def add_callback(self, feed_type, symbol, callback_seconds, exchange_timestamp):
+        self._get_histogram(self.callback_latencies, feed_type).add(callback_seconds * 1000)
+        if exchange_timestamp:
+            # exchange timestamps can be in seconds or milliseconds
+            if exchange_timestamp > 1e11:
+                exchange_timestamp /= 1000
+            self._get_histogram(self.exchange_latencies, (feed_type, symbol)).add(
+                (time.time() - exchange_timestamp) * 1000)
+
+    def _get_histogram(self, histograms, key):
+        try:
+            return histograms[key]
+        except KeyError:
+            histogram = histograms[key] = LatencyHistogram()
+            return histogram
+
+    def get_stats(self) -> dict:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "elapsed": elapsed,
+            "throughputs": {key: {"messages": messages,
+                                  "bytes": size,
+                                  "messages_per_second": messages / elapsed,
+                                  "bytes_per_second": size / elapsed}
+                            for key, (messages, size) in self.throughputs.items()},
+            "handling_latencies": self._get_histograms_stats(self.handling_latencies),
+            "decoding_latencies": self._get_histograms_stats(self.decoding_latencies),
+            "callback_latencies": self._get_histograms_stats(self.callback_latencies),
+            "exchange_latencies": self._get_histograms_stats(self.exchange_latencies)
+        }
+
+    def _get_histograms_stats(self, histograms):
+        return {key: histogram.get_stats() for key, histogram in histograms.items()}
+
+    def get_summary(self) -> str:
+        """
+        :return: a single line summary of the throughput and of the handling and callback latencies
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        messages = 0
+        size = 0
+        for throughput in self.throughputs.values():
+            messages += throughput[0]
+            size += throughput[1]
+        return f"{messages / elapsed:.1f} msg/s {size / elapsed:.0f} B/s - " \
+               f"handling [{self._get_histograms_summary(self.handling_latencies)}] - " \
+               f"callbacks [{self._get_histograms_summary(self.callback_latencies)}]"
+
+    def _get_histograms_summary(self, histograms):
+        return ", ".join([f"{key}: p50={histogram.get_percentile(50):.2f}ms p99={histogram.get_percentile(99):.2f}ms"
+                          for key, histogram in histograms.items()])
+
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.throughputs = {}
+        self.handling_latencies = {}
+        self.decoding_latencies = {}
+        self.callback_latencies = {}
+        self.exchange_latencies = {}
+
+
+def get_frame_size(message) -> int:
+    """
+    :return: the byte length of a websocket frame, text frames being UTF-8 encoded
+    """
+    if isinstance(message, str):
+        return len(message) if message.isascii() else len(message.encode())
+    return len(message)
+
+
+# feeds of events timestamped on reception instead of by the exchange
+LOCAL_TIMESTAMP_FEEDS = (Feeds.L2_BOOK, Feeds.L3_BOOK)
+
+
+class InstrumentedCallback(Callback):
+    """
+    Records callback durations and exchange lags of callback events into stats
+    """
+
+    def __init__(self, callback, stats, feed_type):
+        super().__init__(callback)
+        self.stats = stats
+        self.feed_type = feed_type.value
+        self.has_exchange_timestamp = feed_type not in LOCAL_TIMESTAMP_FEEDS
+
+    async def __call__(self, **kwargs):
+        start = time.perf_counter()
+        await self.callback(**kwargs)
+        self.stats.add_callback(self.feed_type, kwargs.get("symbol"), time.perf_counter() - start,
+                                kwargs.get("timestamp") if self.has_exchange_timestamp else None)
+
+    async def handle_event(self, event):
+        start = time.perf_counter()
+        await self.callback.handle_event(event)
+        self.stats.add_callback(self.feed_type, event.symbol, time.perf_counter() - start,
+                                getattr(event, "timestamp", None) if self.has_exchange_timestamp else None)
@@ -0,0 +1,49 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.callback cimport Callback
+
+cdef class FeedWorker:
+    cdef public object feed_class
+    cdef public dict callbacks
+    cdef public dict feed_kwargs
+    cdef public object logger
+    cdef public int max_pending_batches
+    cdef public bint is_reading
+
+    cdef public object loop
+    cdef public object process
+    cdef object connection
+    cdef object dispatch_task
+    cdef object batches
+    cdef dict callbacks_by_feed
+
+    cpdef start(self)
+    cpdef stop(self)
+    cdef _pause_reading(self)
+    cdef _resume_reading(self)
+    cdef _remove_reader(self)
+
+cdef class WorkerEventSender:
+    cdef object connection
+    cdef list events
+
+    cpdef add_event(self, str feed_type, object event)
+    cpdef flush(self)
+
+cdef class WorkerCallback(Callback):
+    cdef str feed_type
+    cdef WorkerEventSender sender
@@ -0,0 +1,164 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import asyncio
+import multiprocessing
+import pickle
+from collections import deque
+
+from octobot_commons.logging.logging_util import get_logger
+
+from octobot_websockets.callback import Callback, BookEvent, dispatch_event
+
+
+class FeedWorker:
+    """
+    Runs a feed in a worker process to spread message decoding across cores.
+    The worker sends back the events of its feed as pickled batches through a pipe,
+    they are dispatched in order to the callbacks of the main process.
+    The pipe is not read while max_pending_batches batches are waiting to be dispatched, the worker
+    then blocks on its writes until they are dispatched.
+    """
+
+    def __init__(self, feed_class, callbacks: dict, max_pending_batches: int = 1000, **feed_kwargs):
+        self.feed_class = feed_class
+        self.callbacks = callbacks
+        self.max_pending_batches = max_pending_batches
+        self.feed_kwargs = feed_kwargs
+        self.logger = get_logger(f"{self.__class__.__name__}[{feed_class.get_name()}]")
+
+        self.loop = None
+        self.process = None
+        self.connection = None
+        self.dispatch_task = None
+        self.batches = deque()
+        self.is_reading = False
+        self.callbacks_by_feed = {feed_type.value: callback for feed_type, callback in callbacks.items()}
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self.connection, worker_connection = context.Pipe(duplex=False)
+        self.process = context.Process(target=run_feed_worker,
+                                       args=(self.feed_class, list(self.callbacks), self.feed_kwargs,
+                                             worker_connection),
+                                       daemon=True)
+        self.process.start()
+        # the worker process owns the writing end from now on
+        worker_connection.close()
+        self.loop = asyncio.get_event_loop()
+        self._resume_reading()
+
+    def _on_readable(self):
+        try:
+            while len(self.batches) < self.max_pending_batches and self.connection.poll():
+                self.batches.append(self.connection.recv_bytes())
+        except (EOFError, OSError):
+            self.logger.error(f"{self.feed_class.get_name()} worker process stopped")
+            self._remove_reader()
+        if len(self.batches) >= self.max_pending_batches:
+            self._pause_reading()
+        if self.batches and (self.dispatch_task is None or self.dispatch_task.done()):
+            self.dispatch_task = self.loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while self.batches:
+            batch = self.batches.popleft()
+            if not self.is_reading and len(self.batches) <= self.max_pending_batches // 2:
+                self._resume_reading()
+            for feed_type, event in pickle.loads(batch):
+                try:
+                    await dispatch_event(self.callbacks_by_feed[feed_type], event)
+                except Exception as e:
+                    self.logger.error(f"Error when calling {feed_type} callback : {e}")
+
+    def _pause_reading(self):
+        if self.is_reading:
+            self.loop.remove_reader(self.connection.fileno())
+            self.is_reading = False
+
+    def _resume_reading(self):
+        if self.connection is not None and not self.is_reading:
+            self.loop.add_reader(self.connection.fileno(), self._on_readable)
+            self.is_reading = True
+
+    def _remove_reader(self):
+        if self.connection is not None:
+            self._pause_reading()
+            self.connection.close()
+            self.connection = None
+
+    def stop(self):
+        self._remove_reader()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        if self.dispatch_task is not None:
+            self.dispatch_task.cancel()
+
+
+class WorkerEventSender:
+    """
+    Packs the events emitted during a loop iteration of the worker into a single pipe message
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.events = []
+
+    def add_event(self, feed_type, event):
+        if not self.events:
+            asyncio.get_event_loop().call_soon(self.flush)
+        self.events.append((feed_type, event))
+
+    def flush(self):
+        events, self.events = self.events, []
+        self.connection.send_bytes(pickle.dumps(events, pickle.HIGHEST_PROTOCOL))
+
+
+class WorkerCallback(Callback):
+    def __init__(self, feed_type, sender):
+        super().__init__(None)
+        self.feed_type = feed_type.value
+        self.sender = sender
+
+    async def __call__(self, **kwargs):
+        self.sender.add_event(self.feed_type, kwargs)
+
+    async def handle_event(self, event):
+        if isinstance(event, BookEvent):
+            event.detach()
+        self.sender.add_event(self.feed_type, event)
+
+
+def run_feed_worker(feed_class, feed_types, feed_kwargs, connection):
+    sender = WorkerEventSender(connection)
+    feed_kwargs = dict(feed_kwargs)
+    # the worker process runs its own loop
+    feed_kwargs.pop("create_loop", None)
+    feed = feed_class(callbacks={feed_type: WorkerCallback(feed_type, sender) for feed_type in feed_types},
+                      create_loop=True,
+                      **feed_kwargs)
+    feed.start()
+
+
+def create_feed_workers(feed_class, pairs: list, workers_count: int, callbacks: dict, **feed_kwargs) -> list:
+    """
+    :return: workers_count FeedWorker each running feed_class on a share of pairs
+    """
+    workers_count = max(1, min(workers_count, len(pairs)))
+    return [FeedWorker(feed_class, callbacks, pairs=pairs[index::workers_count], **feed_kwargs)
+            for index in range(workers_count)]
@@ -0,0 +1,105 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+
+FRAMES_FILE_MAGIC = b"OBWSFRM1"
+# receive timestamp, payload length, is text frame
+FRAME_HEADER = struct.Struct("<dI?")
+
+
+class FrameRecorder:
+    """
+    Appends raw websocket frames with their receive timestamp to a frames file:
+    a magic followed by records of a FRAME_HEADER and the frame payload (utf-8 encoded for text frames)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames_count = 0
+        is_new_file = not os.path.exists(path) or not os.path.getsize(path)
+        self.file = open(path, "ab")
+        if is_new_file:
+            self.file.write(FRAMES_FILE_MAGIC)
+
+    def record(self, message, timestamp=0):
+        is_text = isinstance(message, str)
+        payload = message.encode() if is_text else message
+        self.file.write(FRAME_HEADER.pack(timestamp or time.time(), len(payload), is_text))
+        self.file.write(payload)
+        self.frames_count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class FrameReplayer:
+    """
+    Reads a frames file written by FrameRecorder through a memory map
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as frames_file:
+            self.map = mmap.mmap(frames_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(FRAMES_FILE_MAGIC)] != FRAMES_FILE_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a frames file")
+
+    def get_frames(self):
+        """
+        :return: a generator of (receive timestamp, message) in recording order
+        """
+        offset = len(FRAMES_FILE_MAGIC)
+        end = len(self.map)
+        while offset + FRAME_HEADER.size <= end:
+            timestamp, length, is_text = FRAME_HEADER.unpack_from(self.map, offset)
+            offset += FRAME_HEADER.size
+            # copied out of the map: no buffer is exported while the generator is suspended
+            payload = self.map[offset:offset + length]
+            offset += length
+            yield timestamp, payload.decode() if is_text else payload
+
+    async def replay(self, feed, speed=0):
+        """
+        Push every frame to feed handle_message, which calls on_message
+        :param speed: 0 to replay as fast as possible, otherwise the pace multiplier relative to the recording
+        :return: the number of replayed frames and the replay duration in seconds
+        """
+        frames_count = 0
+        first_timestamp = None
+        start = time.monotonic()
+        for timestamp, message in self.get_frames():
+            if speed > 0:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                delay = (timestamp - first_timestamp) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await feed.handle_message(message)
+            frames_count += 1
+        return frames_count, time.monotonic() - start
+
+    def close(self):
+        self.map.close()
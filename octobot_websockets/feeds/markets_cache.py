@@ -0,0 +1,109 @@
+# cython: language_level=3
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from octobot_commons.logging.logging_util import get_logger
+
+LOGGER_TAG = "MarketsCache"
+
+# exchange name -> (load time, markets), shared by every feed of the process
+_markets = {}
+# exchange name -> markets loading task
+_loading_tasks = {}
+
+
+def get_cached_markets(exchange_name, cache_dir, ttl):
+    """
+    :return: the markets of exchange_name loaded less than ttl seconds ago in memory or in cache_dir,
+    None when they are not cached or expired
+    """
+    try:
+        load_time, markets = _markets[exchange_name]
+        if time.time() - load_time < ttl:
+            return markets
+    except KeyError:
+        pass
+    if cache_dir is not None:
+        path = _get_cache_path(exchange_name, cache_dir)
+        try:
+            load_time = os.path.getmtime(path)
+            if time.time() - load_time < ttl:
+                with open(path) as cache_file:
+                    markets = json.load(cache_file)
+                _markets[exchange_name] = (load_time, markets)
+                return markets
+        except (OSError, ValueError):
+            pass
+    return None
+
+
+async def load_markets(exchange_name, async_client, cache_dir, ttl):
+    """
+    :return: the cached markets of exchange_name or fetch them with async_client,
+    concurrent calls for the same exchange share the same request
+    """
+    markets = get_cached_markets(exchange_name, cache_dir, ttl)
+    if markets is not None:
+        return markets
+    if exchange_name not in _loading_tasks:
+        _loading_tasks[exchange_name] = asyncio.create_task(_fetch_markets(exchange_name, async_client, cache_dir))
+    try:
+        return await _loading_tasks[exchange_name]
+    finally:
+        _loading_tasks.pop(exchange_name, None)
+
+
+async def _fetch_markets(exchange_name, async_client, cache_dir):
+    markets = await async_client.load_markets()
+    cache_markets(exchange_name, markets, cache_dir)
+    return markets
+
+
+def cache_markets(exchange_name, markets, cache_dir):
+    """
+    Store markets in memory and in cache_dir when not None, can be used to provide markets without network access
+    """
+    _markets[exchange_name] = (time.time(), markets)
+    if cache_dir is not None:
+        try:
+            _save_markets(markets, _get_cache_path(exchange_name, cache_dir))
+        except (OSError, TypeError, ValueError) as e:
+            get_logger(LOGGER_TAG).error(f"Failed to save {exchange_name} markets cache : {e}")
+
+
+def _save_markets(markets, path):
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # a unique temporary file per writer, in the cache directory to be replaced on the same file system
+    file_descriptor, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as cache_file:
+            json.dump(markets, cache_file)
+        # replace the cache at once so that concurrent readers never read a partial file
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _get_cache_path(exchange_name, cache_dir):
+    return os.path.join(cache_dir, f"{exchange_name}.json")
@@ -40,12 +40,28 @@ from octobot_websockets.constants import PROJECT_NAME, VERSION
 PACKAGES = find_packages(exclude=["tests"])
 
 packages_list = ["octobot_websockets.callback",
+                 "octobot_websockets.decoder",
                  "octobot_websockets.data.book",
+                 "octobot_websockets.data.l3_book",
+                 "octobot_websockets.data.latency_histogram",
                  "octobot_websockets.data.candle",
+                 "octobot_websockets.data.candle_history",
                  "octobot_websockets.data.ticker",
+                 "octobot_websockets.constructors.book_constructor",
+                 "octobot_websockets.constructors.candle_aggregator",
+                 "octobot_websockets.constructors.candle_batch_constructor",
                  "octobot_websockets.constructors.candle_constructor",
+                 "octobot_websockets.constructors.candle_emitter",
+                 "octobot_websockets.constructors.candle_scheduler",
                  "octobot_websockets.constructors.ticker_constructor",
+                 "octobot_websockets.constructors.update_throttler",
+                 "octobot_websockets.feeds.dispatch_queue",
                  "octobot_websockets.feeds.feed",
+                 "octobot_websockets.feeds.feed_shard",
+                 "octobot_websockets.feeds.feed_stats",
+                 "octobot_websockets.feeds.feed_worker",
+                 "octobot_websockets.feeds.frame_recorder",
+                 "octobot_websockets.feeds.markets_cache",
                  "octobot_websockets.api.feed_creator"]
 
 ext_modules = [
@@ -0,0 +1,59 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import os
+import sys
+
+import pytest
+import pytest_asyncio
+
+from octobot_websockets.constructors import candle_aggregator, candle_constructor, candle_emitter
+
+# benchmarks modules import each other as top level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_exchange import SyntheticExchangeServer  # noqa: E402
+
+
+@pytest.fixture
+def loop():
+    """
+    :return: a new event loop set as the current one, for synchronous tests creating feeds
+    """
+    event_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(event_loop)
+    yield event_loop
+    asyncio.set_event_loop(None)
+    event_loop.close()
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """
+    :return: a function freezing the time of the candle constructors to the given timestamp
+    """
+    def freeze(timestamp):
+        for module in (candle_aggregator, candle_constructor, candle_emitter):
+            monkeypatch.setattr(module, "time", lambda: timestamp)
+    return freeze
+
+
+@pytest_asyncio.fixture
+async def synthetic_exchange():
+    """
+    :return: a local SyntheticExchangeServer listening on a free port
+    """
+    async with SyntheticExchangeServer(port=0, rate=200, book_depth=10) as server:
+        yield server
@@ -0,0 +1,164 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+
+from octobot_websockets.callback import EventCallback
+from octobot_websockets.constants import Feeds, BID, ASK, ADD, DEL, UPD
+from octobot_websockets.constructors.book_constructor import BookConstructor
+from tests.mocked_feed import create_feed
+
+SYMBOL = "BTC/USDT"
+
+
+class SnapshotsClient:
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.fetches = 0
+
+    async def fetch_order_book(self, symbol):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        return self.snapshots.pop(0)
+
+
+async def create_constructor(*snapshots, **feed_kwargs):
+    events = []
+
+    async def on_book(event):
+        events.append(event)
+
+    feed_kwargs.setdefault("book_interval", 0)
+    feed = create_feed(callbacks={Feeds.L2_BOOK: EventCallback(on_book)}, **feed_kwargs)
+    feed.async_ccxt_client = SnapshotsClient(*snapshots)
+    constructor = BookConstructor(feed, SYMBOL)
+    await constructor.handle_book_snapshot([[100, 1], [99, 2]], [[101, 1], [102, 2]], 10)
+    return feed, constructor, events
+
+
+@pytest.mark.asyncio
+async def test_book_deltas():
+    feed, constructor, events = await create_constructor()
+    await constructor.handle_book_delta({BID: {UPD: [(100, 3)]}, ASK: {DEL: [101]}}, 11)
+    # already included in the book
+    await constructor.handle_book_delta({BID: {UPD: [(100, 4)]}}, 11)
+    await constructor.handle_book_delta({BID: {ADD: [(98, 1)]}}, 13, first_sequence=12)
+    assert not constructor.is_resyncing
+    assert constructor.book.bids == [[100, 3], [99, 2], [98, 1]]
+    assert constructor.book.asks == [[102, 2]]
+    assert constructor.book.sequence == 13
+    assert len(events) == 3
+    assert events[-1].symbol == SYMBOL
+    # emitted without copying the book levels
+    assert events[-1].book is constructor.book
+    assert events[-1].bids == [[100, 3], [99, 2], [98, 1]]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_sequence_gap_resync_replays_buffered_deltas():
+    snapshot = {"bids": [[100, 5]], "asks": [[101, 5]], "nonce": 12}
+    feed, constructor, events = await create_constructor(snapshot)
+    await constructor.handle_book_delta({BID: {UPD: [(100, 3)]}}, 11)
+    # 12 is missing
+    await constructor.handle_book_delta({BID: {UPD: [(100, 4)]}}, 13)
+    assert constructor.is_resyncing
+    # buffered while resyncing
+    await constructor.handle_book_delta({BID: {ADD: [(99, 1)]}}, 12)
+    await constructor.handle_book_delta({ASK: {ADD: [(102, 1)]}}, 14)
+    events_count = len(events)
+    await constructor.resync_task
+    assert not constructor.is_resyncing
+    assert feed.async_ccxt_client.fetches == 1
+    # the delta 12 is included in the snapshot and is not replayed
+    assert constructor.book.bids == [[100, 4]]
+    assert constructor.book.asks == [[101, 5], [102, 1]]
+    assert constructor.book.sequence == 14
+    assert len(events) == events_count + 1
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_resync_retries_snapshots_older_than_buffered_deltas():
+    old_snapshot = {"bids": [[100, 5]], "asks": [[101, 5]], "nonce": 11}
+    snapshot = {"bids": [[100, 6]], "asks": [[101, 6]], "nonce": 13}
+    feed, constructor, events = await create_constructor(old_snapshot, snapshot)
+    await constructor.handle_book_delta({BID: {UPD: [(100, 3)]}}, 13)
+    await constructor.handle_book_delta({BID: {UPD: [(100, 4)]}}, 14)
+    await constructor.resync_task
+    assert feed.async_ccxt_client.fetches == 2
+    assert constructor.book.bids == [[100, 4]]
+    assert constructor.book.asks == [[101, 6]]
+    assert constructor.book.sequence == 14
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_resync_without_nonce_drops_buffered_deltas():
+    snapshot = {"bids": [[100, 5]], "asks": [[101, 5]], "nonce": None}
+    feed, constructor, events = await create_constructor(snapshot)
+    await constructor.handle_book_delta({BID: {ADD: [(99.5, 3)]}}, 12)
+    await constructor.handle_book_delta({BID: {DEL: [100]}}, 13)
+    await constructor.resync_task
+    # stale buffered levels are not applied on top of the snapshot
+    assert constructor.book.bids == [[100, 5]]
+    assert constructor.book.sequence == 13
+    await constructor.handle_book_delta({ASK: {ADD: [(102, 1)]}}, 14)
+    assert not constructor.is_resyncing
+    assert constructor.book.asks == [[101, 5], [102, 1]]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_checksum_mismatch_resync():
+    snapshot = {"bids": [[100, 5]], "asks": [[101, 5]], "nonce": 12}
+    feed, constructor, events = await create_constructor(snapshot)
+    await constructor.handle_book_delta({BID: {UPD: [(100, 2)]}}, 11, checksum=constructor.book.get_checksum())
+    assert constructor.is_resyncing
+    await constructor.resync_task
+    assert constructor.book.bids == [[100, 5]]
+    await constructor.handle_book_delta({BID: {UPD: [(100, 2)]}}, 13, checksum=None)
+    assert not constructor.is_resyncing
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_conflated_book_updates():
+    feed, constructor, events = await create_constructor(book_interval=50)
+    await constructor.handle_book_delta({BID: {UPD: [(99, 3)]}}, 11)
+    await constructor.handle_book_delta({ASK: {UPD: [(102, 3)]}}, 12)
+    assert len(events) == 1
+    await asyncio.sleep(0.1)
+    assert len(events) == 2
+    assert events[-1].bids == [[100, 1], [99, 3]]
+    assert events[-1].asks == [[101, 1], [102, 3]]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_book_emit_on_top_change():
+    feed, constructor, events = await create_constructor(book_interval=1000, book_emit_on_top_change=True)
+    # deeper levels changes are conflated
+    await constructor.handle_book_delta({BID: {UPD: [(99, 3)]}}, 11)
+    assert len(events) == 1
+    # top of book changes are emitted right away
+    await constructor.handle_book_delta({BID: {ADD: [(100.5, 1)]}}, 12)
+    assert len(events) == 2
+    await constructor.handle_book_delta({ASK: {UPD: [(101, 2)]}}, 13)
+    assert len(events) == 3
+    assert events[-1].asks == [[101, 2], [102, 2]]
+    feed.close()
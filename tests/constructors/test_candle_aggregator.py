@@ -0,0 +1,221 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.callback import EventCallback
+from octobot_websockets.constants import Feeds, KlineEmissionPolicies
+from octobot_websockets.constructors.candle_aggregator import CandleAggregator
+from octobot_websockets.feeds.feed_shard import FeedShard
+from tests.mocked_feed import create_feed
+
+SYMBOL = "BTC/USDT"
+START_TIMESTAMP = 1577836800
+# frozen time of the outage tests
+NOW = START_TIMESTAMP + 3 * 3600 + 330
+
+
+def create_aggregator(time_frames, **feed_kwargs):
+    candles = []
+    klines = []
+
+    async def on_candle(event):
+        candles.append(event)
+
+    async def on_kline(event):
+        klines.append(event)
+
+    feed = create_feed(callbacks={Feeds.CANDLE: EventCallback(on_candle), Feeds.KLINE: EventCallback(on_kline)},
+                       **feed_kwargs)
+    aggregator = CandleAggregator(feed, SYMBOL, time_frames)
+    # candles are only closed by trades and explicitly, not at wall clock boundaries
+    feed.candle_scheduler.stop()
+    return feed, aggregator, candles, klines
+
+
+@pytest.mark.asyncio
+async def test_every_trade_klines():
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.ONE_MINUTE])
+    for price in (10, 10, 11):
+        await aggregator.handle_recent_trade(price, 1, START_TIMESTAMP + 1)
+    assert [kline.close for kline in klines] == [10, 10, 11]
+    assert klines[-1].volume == 3
+    assert klines[-1].timestamp == START_TIMESTAMP
+    assert candles == []
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_price_change_klines():
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.ONE_MINUTE],
+                                                          kline_emission_policy="price_change")
+    assert feed.kline_emission_policy is KlineEmissionPolicies.PRICE_CHANGE
+    for price in (10, 10, 11, 11, 10):
+        await aggregator.handle_recent_trade(price, 1, START_TIMESTAMP + 1)
+    assert [kline.close for kline in klines] == [10, 11, 10]
+    # the first trade of the next candle is always emitted
+    await aggregator.handle_recent_trade(10, 1, START_TIMESTAMP + 61)
+    assert [kline.close for kline in klines] == [10, 11, 10, 10]
+    assert klines[-1].timestamp == START_TIMESTAMP + 60
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_interval_klines():
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.ONE_MINUTE],
+                                                          kline_emission_policy=KlineEmissionPolicies.INTERVAL,
+                                                          kline_interval=50)
+    for price in (10, 11, 12):
+        await aggregator.handle_recent_trade(price, 1, START_TIMESTAMP + 1)
+    assert [kline.close for kline in klines] == [10]
+    await asyncio.sleep(0.1)
+    assert [kline.close for kline in klines] == [10, 12]
+    assert klines[-1].volume == 3
+    feed.close()
+
+
+def test_invalid_kline_emission_policy(loop):
+    with pytest.raises(ValueError):
+        create_feed(kline_emission_policy="every_second")
+
+
+@pytest.mark.asyncio
+async def test_rolled_up_klines_and_candles():
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.FIVE_MINUTES, TimeFrames.ONE_MINUTE])
+    await aggregator.handle_recent_trade(10, 1, START_TIMESTAMP + 1)
+    await aggregator.handle_recent_trade(12, 2, START_TIMESTAMP + 61)
+    assert [(kline.time_frame, kline.timestamp, kline.opn, kline.close, kline.volume) for kline in klines[-2:]] \
+        == [(TimeFrames.ONE_MINUTE, START_TIMESTAMP + 60, 12, 12, 2),
+            (TimeFrames.FIVE_MINUTES, START_TIMESTAMP, 10, 12, 3)]
+    await aggregator.close_candles(START_TIMESTAMP + 300)
+    assert [(candle.time_frame, candle.timestamp, candle.opn, candle.high, candle.close, candle.volume)
+            for candle in candles] == [(TimeFrames.ONE_MINUTE, START_TIMESTAMP + 60, 10, 10, 10, 1),
+                                       (TimeFrames.ONE_MINUTE, START_TIMESTAMP + 120, 12, 12, 12, 2),
+                                       (TimeFrames.FIVE_MINUTES, START_TIMESTAMP + 300, 10, 12, 12, 3)]
+    feed.close()
+
+
+class OHLCVClient:
+    def __init__(self, candles):
+        self.candles = candles
+        self.since = []
+
+    async def fetch_ohlcv(self, symbol, time_frame, since=None):
+        self.since.append(since)
+        return [candle for candle in self.candles if candle[0] >= since]
+
+
+def get_outage_timeline(now):
+    """
+    :return: the now minute start, the now hour start, an outage start before the hour start
+    and the exchange 1m candles since the outage start minute
+    """
+    minute_start = now - now % 60
+    hour_start = now - now % 3600
+    outage_start = hour_start - 100
+    exchange_candles = [[(hour_start - 120) * 1000, 11, 13, 10.5, 12.5, 5]]
+    for index, start_timestamp in enumerate(range(int(hour_start - 60), int(minute_start) + 60, 60)):
+        exchange_candles.append([start_timestamp * 1000, 20 + index, 22 + index, 19 + index, 21 + index, 1 + index])
+    return minute_start, hour_start, outage_start, exchange_candles
+
+
+def get_hour_candle(candles):
+    return [candles[0][1], max(candle[2] for candle in candles), min(candle[3] for candle in candles),
+            candles[-1][4], sum(candle[5] for candle in candles)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_after_outage(frozen_time):
+    frozen_time(NOW)
+    minute_start, hour_start, outage_start, exchange_candles = get_outage_timeline(NOW)
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.ONE_MINUTE, TimeFrames.ONE_HOUR],
+                                                          candle_history_size=100)
+    feed.async_ccxt_client = OHLCVClient(exchange_candles)
+    shard = FeedShard(feed, 0, feed.pairs, feed.channels)
+    feed.shards = [shard]
+    await aggregator.handle_recent_trade(10, 1, hour_start - 170)
+    await aggregator.handle_recent_trade(11, 1, hour_start - 110)
+    await aggregator.handle_recent_trade(12, 1, outage_start)
+
+    feed.hold_shard_candles(shard, outage_start)
+    # the feed candle scheduler keeps running during the outage
+    for boundary in range(int(hour_start - 60), int(minute_start) + 1, 60):
+        await feed.candle_scheduler.close_candles(boundary)
+    assert [(candle.time_frame, candle.timestamp) for candle in candles] == \
+        [(TimeFrames.ONE_MINUTE, hour_start - 120)]
+
+    # live trades are buffered until the backfill is handled, the first one is included
+    # in the backfilled in progress candle
+    await aggregator.handle_recent_trade(100, 10, minute_start + (NOW - minute_start) / 2)
+    await aggregator.handle_recent_trade(15, 2, NOW + 1)
+    await feed.backfill_shard_candles(shard, outage_start)
+    assert feed.async_ccxt_client.since == [(hour_start - 120) * 1000]
+    await aggregator.close_candles(minute_start + 60)
+
+    periods = [(candle.time_frame, candle.timestamp) for candle in candles]
+    assert len(periods) == len(set(periods))
+    minute_candles = [[candle.timestamp - 60, candle.opn, candle.high, candle.low, candle.close, candle.volume]
+                      for candle in candles if candle.time_frame is TimeFrames.ONE_MINUTE]
+    last_exchange_candle = exchange_candles[-1]
+    expected_minute_candles = [[hour_start - 180, 10, 10, 10, 10, 1]] + \
+        [[timestamp / 1000, opn, high, low, close, vol]
+         for timestamp, opn, high, low, close, vol in exchange_candles[:-1]] + \
+        [[minute_start, last_exchange_candle[1], max(last_exchange_candle[2], 15),
+          min(last_exchange_candle[3], 15), 15, last_exchange_candle[5] + 2]]
+    assert minute_candles == expected_minute_candles
+    hour_candles = [[candle.timestamp - 3600, candle.opn, candle.high, candle.low, candle.close, candle.volume]
+                    for candle in candles if candle.time_frame is TimeFrames.ONE_HOUR]
+    assert hour_candles == [[hour_start - 3600] + get_hour_candle(expected_minute_candles[:3])]
+    history = feed.get_candle_history(SYMBOL, TimeFrames.ONE_MINUTE)
+    assert history.get_last_candles()[0].tolist() == [candle[0] for candle in expected_minute_candles]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_backfill_corrects_candles_closed_during_outage(frozen_time):
+    frozen_time(NOW)
+    minute_start, hour_start, outage_start, exchange_candles = get_outage_timeline(NOW)
+    feed, aggregator, candles, klines = create_aggregator([TimeFrames.ONE_MINUTE, TimeFrames.ONE_HOUR],
+                                                          candle_history_size=100)
+    feed.async_ccxt_client = OHLCVClient(exchange_candles)
+    await aggregator.handle_recent_trade(10, 1, hour_start - 170)
+    await aggregator.handle_recent_trade(11, 1, hour_start - 110)
+    await aggregator.handle_recent_trade(12, 1, outage_start)
+    # closed before the connection loss is detected
+    await feed.candle_scheduler.close_candles(hour_start - 60)
+    assert candles[-1].volume == 2
+
+    aggregator.hold_candles(outage_start)
+    await feed.candle_scheduler.close_candles(hour_start)
+    candles_count = len(candles)
+    await aggregator.handle_backfill(await aggregator.fetch_backfill(outage_start), outage_start)
+
+    # the partial candle is emitted again with the exchange values
+    corrected_candle = candles[candles_count]
+    assert (corrected_candle.timestamp, corrected_candle.opn, corrected_candle.high, corrected_candle.low,
+            corrected_candle.close, corrected_candle.volume) == (hour_start - 60, 11, 13, 10.5, 12.5, 5)
+    hour_candles = [candle for candle in candles if candle.time_frame is TimeFrames.ONE_HOUR]
+    assert len(hour_candles) == 1
+    assert [hour_candles[0].opn, hour_candles[0].high, hour_candles[0].low, hour_candles[0].close,
+            hour_candles[0].volume] == get_hour_candle([[hour_start - 180, 10, 10, 10, 10, 1]] +
+                                                       exchange_candles[:2])
+    timestamps, opens, highs, lows, closes, volumes = \
+        feed.get_candle_history(SYMBOL, TimeFrames.ONE_MINUTE).get_last_candles()
+    assert timestamps.tolist()[:3] == [hour_start - 180, hour_start - 120, hour_start - 60]
+    assert volumes.tolist()[:3] == [1, 5, 1]
+    feed.close()
@@ -0,0 +1,86 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import array
+import random
+
+import pytest
+from octobot_commons.enums import TimeFrames, TimeFramesMinutes
+
+from octobot_websockets.callback import EventCallback
+from octobot_websockets.constants import Feeds
+from octobot_websockets.constructors.candle_aggregator import CandleAggregator
+from octobot_websockets.constructors.candle_batch_constructor import build_candles
+from tests.mocked_feed import create_feed
+
+SYMBOL = "BTC/USDT"
+TIME_FRAMES = [TimeFrames.ONE_MINUTE, TimeFrames.FIVE_MINUTES, TimeFrames.ONE_HOUR]
+START_TIMESTAMP = 1577836800
+
+
+def create_trades(count):
+    generator = random.Random(1)
+    timestamps = array.array('d', sorted(START_TIMESTAMP + generator.uniform(0, 3 * 3600) for _ in range(count)))
+    prices = array.array('d', [round(generator.uniform(7000, 7500), 2) for _ in range(count)])
+    volumes = array.array('d', [round(generator.uniform(0.001, 2), 3) for _ in range(count)])
+    return timestamps, prices, volumes
+
+
+async def build_streaming_candles(timestamps, prices, volumes):
+    candles = {time_frame: [] for time_frame in TIME_FRAMES}
+
+    async def on_candle(event):
+        time_frame_seconds = TimeFramesMinutes[event.time_frame] * 60
+        candles[event.time_frame].append((event.timestamp - time_frame_seconds, event.opn, event.high,
+                                          event.low, event.close, event.volume))
+
+    async def on_kline(event):
+        pass
+
+    feed = create_feed(callbacks={Feeds.CANDLE: EventCallback(on_candle), Feeds.KLINE: EventCallback(on_kline)})
+    aggregator = CandleAggregator(feed, SYMBOL, TIME_FRAMES)
+    # candles are closed by trades and explicitly, not at wall clock boundaries
+    feed.candle_scheduler.stop()
+    for index in range(len(timestamps)):
+        await aggregator.handle_recent_trade(prices[index], volumes[index], timestamps[index])
+    await aggregator.close_candles(START_TIMESTAMP + 4 * 3600)
+    feed.close()
+    return candles
+
+
+@pytest.mark.asyncio
+async def test_build_candles_matches_streaming_candles():
+    timestamps, prices, volumes = create_trades(5000)
+    streaming_candles = await build_streaming_candles(timestamps, prices, volumes)
+    candles = build_candles(timestamps, prices, volumes, list(reversed(TIME_FRAMES)))
+    assert set(candles) == set(TIME_FRAMES)
+    for time_frame in TIME_FRAMES:
+        assert list(zip(*candles[time_frame])) == streaming_candles[time_frame]
+    assert len(candles[TimeFrames.ONE_HOUR][0]) == 3
+    assert len(candles[TimeFrames.FIVE_MINUTES][0]) == 36
+
+
+def test_build_candles_without_trades():
+    empty = array.array('d')
+    candles = build_candles(empty, empty, empty, [TimeFrames.ONE_MINUTE])
+    assert candles == {TimeFrames.ONE_MINUTE: tuple(array.array('d') for _ in range(6))}
+
+
+def test_build_candles_invalid_time_frames():
+    timestamps, prices, volumes = create_trades(10)
+    with pytest.raises(ValueError):
+        build_candles(timestamps, prices, volumes, [])
+    with pytest.raises(ValueError):
+        build_candles(timestamps, prices, volumes, [TimeFrames.THREE_MINUTES, TimeFrames.FIVE_MINUTES])
@@ -0,0 +1,121 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.callback import EventCallback
+from octobot_websockets.constants import Feeds
+from octobot_websockets.constructors.candle_constructor import CandleConstructor
+from tests.mocked_feed import create_feed
+
+SYMBOL = "BTC/USDT"
+START_TIMESTAMP = 1577836800
+
+
+def create_constructor(**feed_kwargs):
+    candles = []
+    klines = []
+
+    async def on_candle(event):
+        candles.append(event)
+
+    async def on_kline(event):
+        klines.append(event)
+
+    feed = create_feed(callbacks={Feeds.CANDLE: EventCallback(on_candle), Feeds.KLINE: EventCallback(on_kline)},
+                       **feed_kwargs)
+    constructor = CandleConstructor(feed, SYMBOL, TimeFrames.ONE_MINUTE, [START_TIMESTAMP, 10, 10, 10, 10, 0])
+    feed.candle_scheduler.stop()
+    return feed, constructor, candles, klines
+
+
+@pytest.mark.asyncio
+async def test_every_trade_klines():
+    feed, constructor, candles, klines = create_constructor()
+    for price in (10, 10, 11):
+        await constructor.handle_recent_trade(price, 1)
+    assert [kline.close for kline in klines] == [10, 10, 11]
+    # klines are timestamped with their candle start
+    assert all(kline.timestamp == START_TIMESTAMP for kline in klines)
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_price_change_klines():
+    feed, constructor, candles, klines = create_constructor(kline_emission_policy="price_change")
+    for price in (10, 10, 11, 11, 10):
+        await constructor.handle_recent_trade(price, 1)
+    assert [kline.close for kline in klines] == [10, 11, 10]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_interval_klines():
+    feed, constructor, candles, klines = create_constructor(kline_emission_policy="interval", kline_interval=50)
+    for price in (10, 11, 12):
+        await constructor.handle_recent_trade(price, 1)
+    assert [kline.close for kline in klines] == [10]
+    # a closed candle cancels its pending kline
+    await constructor.close_candles(START_TIMESTAMP + 60)
+    await asyncio.sleep(0.1)
+    assert [kline.close for kline in klines] == [10]
+    assert [(candle.timestamp, candle.opn, candle.high, candle.low, candle.close, candle.volume)
+            for candle in candles] == [(START_TIMESTAMP + 60, 10, 12, 10, 12, 3)]
+    feed.close()
+
+
+class OHLCVClient:
+    def __init__(self, candles):
+        self.candles = candles
+
+    async def fetch_ohlcv(self, symbol, time_frame, since=None):
+        return [candle for candle in self.candles if candle[0] >= since]
+
+
+@pytest.mark.asyncio
+async def test_backfill_after_outage(frozen_time):
+    now = START_TIMESTAMP + 3 * 3600 + 330
+    frozen_time(now)
+    minute_start = now - now % 60
+    outage_start = minute_start - 100
+    feed, constructor, candles, klines = create_constructor()
+    constructor.stop()
+    constructor = CandleConstructor(feed, SYMBOL, TimeFrames.ONE_MINUTE,
+                                    [minute_start - 120, 10, 10, 10, 10, 1])
+    feed.async_ccxt_client = OHLCVClient([[(minute_start - 120) * 1000, 10, 12, 9, 11, 4],
+                                          [(minute_start - 60) * 1000, 11, 13, 11, 12, 2],
+                                          [minute_start * 1000, 12, 12, 12, 12, 1]])
+    constructor.hold_candles(outage_start)
+    await feed.candle_scheduler.close_candles(minute_start - 60)
+    await feed.candle_scheduler.close_candles(minute_start)
+    assert candles == []
+
+    backfill = await constructor.fetch_backfill(outage_start)
+    # live trades are buffered until the backfill is handled, the first one is included
+    # in the backfilled in progress candle
+    await constructor.handle_recent_trade(100, 10, minute_start + (now - minute_start) / 2)
+    await constructor.handle_recent_trade(13, 1, now + 1)
+    assert klines == []
+    await constructor.handle_backfill(backfill, outage_start)
+    assert [kline.close for kline in klines] == [13]
+    await constructor.close_candles(minute_start + 60)
+    assert [(candle.timestamp, candle.opn, candle.high, candle.low, candle.close, candle.volume)
+            for candle in candles] == [(minute_start - 60, 10, 12, 9, 11, 4),
+                                       (minute_start, 11, 13, 11, 12, 2),
+                                       (minute_start + 60, 12, 13, 12, 13, 2)]
+    feed.close()
@@ -0,0 +1,57 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import pytest
+
+from octobot_websockets.constructors.candle_emitter import CandleEmitter
+from tests.mocked_feed import create_feed
+
+
+class KlinesRecorder:
+    def __init__(self):
+        self.pushes = 0
+
+    async def push_klines(self):
+        self.pushes += 1
+
+
+@pytest.mark.asyncio
+async def test_price_change_policy():
+    feed = create_feed(kline_emission_policy="price_change")
+    recorder = KlinesRecorder()
+    emitter = CandleEmitter(feed, recorder.push_klines)
+    for close in (10, 10, 11):
+        await emitter.on_candle_update(close)
+    assert recorder.pushes == 2
+    # the first update of the next candle is always pushed
+    emitter.on_candle_close()
+    await emitter.on_candle_update(11)
+    assert recorder.pushes == 3
+    emitter.stop()
+    feed.close()
+
+
+def test_hold_candles(loop):
+    feed = create_feed()
+    emitter = CandleEmitter(feed, KlinesRecorder().push_klines)
+    assert emitter.get_close_timestamp(120) == 120
+    emitter.hold_candles(100)
+    # the earliest outage start is kept
+    emitter.hold_candles(110)
+    assert emitter.get_close_timestamp(120) == 100
+    assert emitter.get_close_timestamp(60) == 60
+    emitter.release_candles()
+    assert emitter.get_close_timestamp(120) == 120
+    feed.close()
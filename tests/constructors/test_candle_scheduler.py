@@ -0,0 +1,115 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+from time import time
+
+import pytest
+
+from octobot_websockets.constructors.candle_scheduler import CandleCloseScheduler
+
+
+class ClosesRecorder:
+    def __init__(self, name, closes):
+        self.name = name
+        self.closes = closes
+
+    async def close_candles(self, timestamp):
+        self.closes.append((self.name, timestamp, time()))
+
+
+class FailingConstructor:
+    async def close_candles(self, timestamp):
+        raise RuntimeError("close error")
+
+
+@pytest.mark.asyncio
+async def test_close_order():
+    closes = []
+    scheduler = CandleCloseScheduler()
+    scheduler.register(300, ClosesRecorder("5m-1", closes))
+    scheduler.register(60, ClosesRecorder("1m-1", closes))
+    scheduler.register(3600, ClosesRecorder("1h", closes))
+    scheduler.register(60, FailingConstructor())
+    scheduler.register(60, ClosesRecorder("1m-2", closes))
+    scheduler.stop()
+
+    await scheduler.close_candles(3600)
+    assert [name for name, _, _ in closes] == ["1m-1", "1m-2", "5m-1", "1h"]
+    assert all(timestamp == 3600 for _, timestamp, _ in closes)
+    closes.clear()
+    await scheduler.close_candles(3660)
+    assert [name for name, _, _ in closes] == ["1m-1", "1m-2"]
+    closes.clear()
+    await scheduler.close_candles(3900)
+    assert [name for name, _, _ in closes] == ["1m-1", "1m-2", "5m-1"]
+
+
+@pytest.mark.asyncio
+async def test_unregister():
+    closes = []
+    scheduler = CandleCloseScheduler()
+    constructor = ClosesRecorder("1m", closes)
+    scheduler.register(60, constructor)
+    scheduler.stop()
+    scheduler.unregister(60, constructor)
+    assert scheduler.constructors == {}
+    await scheduler.close_candles(60)
+    assert closes == []
+
+
+@pytest.mark.asyncio
+async def test_closes_at_time_frame_boundary():
+    closes = []
+    scheduler = CandleCloseScheduler()
+    scheduler.register(1, ClosesRecorder("1s", closes))
+    scheduler.register(2, ClosesRecorder("2s", closes))
+    started_at = time()
+    while len(closes) < 3 and time() - started_at < 5:
+        await asyncio.sleep(0.05)
+    scheduler.stop()
+    assert len(closes) >= 3
+    names = [name for name, _, _ in closes]
+    for name, boundary, closed_at in closes:
+        assert boundary == int(boundary)
+        # closed CLOSE_DELAY after the boundary to let late trades in
+        assert boundary + CandleCloseScheduler.CLOSE_DELAY <= closed_at < boundary + \
+            CandleCloseScheduler.CLOSE_DELAY + 1
+        if name == "2s":
+            assert boundary % 2 == 0
+            # the smallest time frame is closed first
+            assert names[names.index(name) - 1] == "1s"
+
+
+@pytest.mark.asyncio
+async def test_waits_for_registered_constructors():
+    closes = []
+    scheduler = CandleCloseScheduler()
+    constructor = ClosesRecorder("1s", closes)
+    scheduler.register(1, constructor)
+    scheduler.unregister(1, constructor)
+    await asyncio.sleep(0)
+    # idle until a constructor registers
+    assert not scheduler.registered_event.is_set()
+    assert not scheduler.scheduler_task.done()
+    registered_at = time()
+    scheduler.register(1, constructor)
+    while not closes and time() - registered_at < 5:
+        await asyncio.sleep(0.05)
+    scheduler.stop()
+    assert len(closes) == 1
+    _, boundary, _ = closes[0]
+    # boundaries reached before the registration are not closed
+    assert boundary > registered_at
@@ -0,0 +1,103 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+
+from octobot_websockets.constructors.update_throttler import UpdateThrottler
+
+INTERVAL = 0.05
+
+
+class Emitter:
+    def __init__(self):
+        self.state = None
+        self.emitted = []
+
+    async def emit(self):
+        self.emitted.append(self.state)
+
+
+@pytest.mark.asyncio
+async def test_conflated_updates():
+    emitter = Emitter()
+    throttler = UpdateThrottler(INTERVAL, emitter.emit)
+    for state in range(5):
+        emitter.state = state
+        await throttler.on_update()
+    # the first update is emitted right away, the following ones are conflated
+    assert emitter.emitted == [0]
+    await asyncio.sleep(INTERVAL * 2)
+    assert emitter.emitted == [0, 4]
+    await asyncio.sleep(INTERVAL * 2)
+    assert emitter.emitted == [0, 4]
+
+
+@pytest.mark.asyncio
+async def test_emission_after_interval():
+    emitter = Emitter()
+    throttler = UpdateThrottler(INTERVAL, emitter.emit)
+    emitter.state = 0
+    await throttler.on_update()
+    await asyncio.sleep(INTERVAL * 1.5)
+    emitter.state = 1
+    await throttler.on_update()
+    assert emitter.emitted == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_forced_update():
+    emitter = Emitter()
+    throttler = UpdateThrottler(INTERVAL, emitter.emit)
+    emitter.state = 0
+    await throttler.on_update()
+    emitter.state = 1
+    await throttler.on_update()
+    emitter.state = 2
+    await throttler.on_update(force=True)
+    assert emitter.emitted == [0, 2]
+    # the pending conflated emission is cancelled by the forced one
+    await asyncio.sleep(INTERVAL * 2)
+    assert emitter.emitted == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    emitter = Emitter()
+    throttler = UpdateThrottler(INTERVAL, emitter.emit)
+    await throttler.on_update()
+    await throttler.on_update()
+    throttler.cancel()
+    await asyncio.sleep(INTERVAL * 2)
+    assert len(emitter.emitted) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_deferred_emission():
+    emitted = []
+
+    async def slow_emit():
+        await asyncio.sleep(INTERVAL * 4)
+        emitted.append(True)
+
+    throttler = UpdateThrottler(INTERVAL, slow_emit)
+    throttler.last_emit_time = asyncio.get_event_loop().time()
+    await throttler.on_update()
+    # the deferred emission is in progress
+    await asyncio.sleep(INTERVAL * 2)
+    throttler.close()
+    await asyncio.sleep(INTERVAL * 4)
+    assert emitted == []
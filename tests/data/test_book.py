@@ -13,7 +13,10 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-from octobot_websockets.data.book import Book
+import zlib
+
+from octobot_websockets.constants import BID, ASK, ADD, DEL, UPD
+from octobot_websockets.data.book import Book, BookSide
 
 
 def test_create_book():
@@ -30,3 +33,112 @@ def test_update_book():
     assert book.timestamp != 0
     assert book.asks
     assert book.bids
+
+
+def test_update_book_sorts_snapshot():
+    book = Book()
+    book.handle_book_update([[100.3, 0.112504], [100.5, 0.484882], [100.1, 2.0]],
+                            [[101.01, 0.49906], [100.6, 0.126516]])
+    assert book.bids == [[100.5, 0.484882], [100.3, 0.112504], [100.1, 2.0]]
+    assert book.asks == [[100.6, 0.126516], [101.01, 0.49906]]
+    assert book.get_best_bid() == 100.5
+    assert book.get_best_ask() == 100.6
+
+
+def test_book_delta():
+    book = Book()
+    book.handle_book_update([[100.3, 1], [100.1, 2]], [[100.6, 3], [101, 4]])
+    book.handle_book_delta({
+        BID: {ADD: [(100.4, 5)], DEL: [100.1], UPD: [(100.3, 6)]},
+        ASK: {ADD: [(100.5, 7), (100.8, 8)], DEL: [101], UPD: [(100.6, 0)]}
+    })
+    assert book.bids == [[100.4, 5], [100.3, 6]]
+    assert book.asks == [[100.5, 7], [100.8, 8]]
+    assert book.get_best_bid() == 100.4
+    assert book.get_best_ask() == 100.5
+
+    book.handle_book_delta({BID: {DEL: [100.4, 100.3]}})
+    assert not book.bids
+    assert book.get_best_bid() == 0
+    assert book.asks == [[100.5, 7], [100.8, 8]]
+
+
+def test_book_top_views():
+    book = Book()
+    book.handle_book_update([[100.3, 1], [100.1, 2], [100.2, 3]], [[100.6, 4]])
+    prices, sizes = book.get_top_bids(2)
+    assert prices.tolist() == [100.3, 100.2]
+    assert sizes.tolist() == [1, 3]
+    prices, sizes = book.get_top_asks()
+    assert prices.tolist() == [100.6]
+    assert sizes.tolist() == [4]
+    assert len(book.get_top_asks(10)[0]) == 1
+
+
+def test_book_side_growth():
+    book = Book()
+    levels_count = BookSide.INITIAL_CAPACITY * 3
+    for index in range(levels_count):
+        book.handle_book_delta({ASK: {ADD: [(1000 - index, index + 1)]}})
+    assert book.ask_side.length == levels_count
+    assert book.ask_side.capacity >= levels_count
+    assert book.get_best_ask() == 1000 - levels_count + 1
+    assert book.get_top_asks()[0].tolist() == sorted(1000 - index for index in range(levels_count))
+
+
+def test_book_sequence_and_checksum():
+    book = Book()
+    book.handle_book_update([[100.3, 1]], [[100.6, 3]], 10)
+    assert book.sequence == 10
+    checksum = book.get_checksum()
+    book.handle_book_delta({BID: {UPD: [(100.3, 2)]}}, 11)
+    assert book.sequence == 11
+    assert book.get_checksum() != checksum
+    book.handle_book_delta({BID: {UPD: [(100.3, 1)]}})
+    assert book.sequence == 11
+    assert book.get_checksum() == checksum
+
+
+def test_book_checksum():
+    book = Book()
+    assert book.get_checksum() == zlib.crc32(b"")
+    book.handle_book_update([[100.5, 1.5], [100.3, 2.0], [100.1, 3.0]], [[100.6, 4.0], [100.7, 5.0]])
+    assert book.get_checksum() == zlib.crc32(b"100.5:1.5:100.6:4.0:100.3:2.0:100.7:5.0:100.1:3.0")
+    assert book.get_checksum(1) == zlib.crc32(b"100.5:1.5:100.6:4.0")
+
+
+def test_book_analytics():
+    book = Book()
+    assert book.get_mid_price() == 0
+    assert book.get_spread() == 0
+    book.handle_book_update([[99, 1], [98, 2], [97, 3]], [[101, 1], [102, 2], [103, 3]])
+    assert book.get_mid_price() == 100
+    assert book.get_spread() == 2
+    assert book.get_bid_depth() == 6
+    assert book.get_bid_depth(2) == 3
+    assert book.get_ask_depth(1) == 1
+    assert book.get_buy_price(1) == 101
+    assert book.get_buy_price(2) == (101 + 102) / 2
+    assert book.get_sell_price(4) == (99 + 98 * 2 + 97) / 4
+    assert book.get_sell_price(7) == 0
+
+    book.handle_book_delta({ASK: {ADD: [(100.5, 1)], DEL: [102]}, BID: {UPD: [(98, 5)]}})
+    assert book.get_spread() == 1.5
+    assert book.get_ask_depth() == 5
+    assert book.get_ask_depth(2) == 2
+    assert book.get_buy_price(3) == (100.5 + 101 + 103) / 3
+    assert book.get_bid_depth(2) == 6
+    assert book.get_sell_price(6) == (99 + 98 * 5) / 6
+
+
+def test_book_analytics_rounding():
+    book = Book()
+    book.handle_book_update([], [[100, 0.51], [101, 0.78], [102, 0.53]])
+    for size in (0.4, 0.49, 0.04):
+        book.handle_book_delta({ASK: {UPD: [(100, size)]}})
+    total_size = 0.04 + 0.78 + 0.53
+    assert book.get_ask_depth() == total_size
+    assert book.get_buy_price(total_size) == (100 * 0.04 + 101 * 0.78 + 102 * 0.53) / total_size
+    book.handle_book_delta({ASK: {DEL: [100, 101, 102]}})
+    assert book.ask_side.total_size == 0
+    assert book.get_buy_price(0.1) == 0
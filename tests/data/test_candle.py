@@ -13,3 +13,28 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+from octobot_websockets.data.candle import Candle
+
+
+def test_create_candle():
+    candle = Candle(10, 60)
+    assert candle.opn == candle.high == candle.low == candle.close == 10
+    assert candle.vol == 0
+    assert candle.start_timestamp == 60
+    assert candle.close_timestamp == 0
+    assert Candle(10).start_timestamp != 0
+
+
+def test_merge_candle():
+    candle = Candle(10, 60)
+    candle.handle_candle_update(12, 1)
+    following_candle = Candle(11, 120)
+    following_candle.handle_candle_update(9, 2)
+    candle.merge_candle(following_candle)
+    assert candle.opn == 10
+    assert candle.high == 12
+    assert candle.low == 9
+    assert candle.close == 9
+    assert candle.vol == 3
+    candle.on_close(180)
+    assert candle.close_timestamp == 180
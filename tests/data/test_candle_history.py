@@ -0,0 +1,61 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.data.candle import Candle
+from octobot_websockets.data.candle_history import CandleHistory
+
+
+def test_create_candle_history():
+    history = CandleHistory(3)
+    assert history.size == 0
+    assert not history.get_last_closes()
+    assert all(not column for column in history.get_last_candles())
+
+
+def test_add_candles():
+    history = CandleHistory(3)
+    candle = Candle(10, 60)
+    candle.handle_candle_update(12, 1)
+    history.add_candle(candle)
+    timestamps, opens, highs, lows, closes, volumes = history.get_last_candles()
+    assert timestamps.tolist() == [60]
+    assert opens.tolist() == [10]
+    assert highs.tolist() == [12]
+    assert lows.tolist() == [10]
+    assert closes.tolist() == [12]
+    assert volumes.tolist() == [1]
+
+
+def test_candle_history_rotation():
+    history = CandleHistory(3)
+    for index in range(1, 6):
+        history.add_values(index * 60, index, index, index, index, index)
+        assert history.get_last_closes().tolist() == list(range(max(1, index - 2), index + 1))
+    assert history.size == 3
+    assert history.get_last_closes(2).tolist() == [4, 5]
+    assert history.get_last_candles(1)[0].tolist() == [300]
+    assert history.get_last_closes(10).tolist() == [3, 4, 5]
+
+
+def test_replace_last_candle():
+    history = CandleHistory(3)
+    for index in range(1, 5):
+        history.add_values(index * 60, index, index, index, index, index)
+    history.add_values(240, 4, 5, 3, 5, 10)
+    assert history.size == 3
+    timestamps, opens, highs, lows, closes, volumes = history.get_last_candles()
+    assert timestamps.tolist() == [120, 180, 240]
+    assert closes.tolist() == [2, 3, 5]
+    assert volumes.tolist() == [2, 3, 10]
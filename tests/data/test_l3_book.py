@@ -0,0 +1,86 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.constants import BID, ASK
+from octobot_websockets.data.l3_book import L3Book
+
+
+def test_create_l3_book():
+    book = L3Book()
+    assert not book.orders
+    assert not book.l2_book.bids
+    assert not book.l2_book.asks
+    assert book.timestamp == 0
+
+
+def test_l3_book_snapshot():
+    book = L3Book()
+    book.handle_book_update([("a", BID, 100, 1), ("b", BID, 100, 2), ("c", BID, 99, 3), ("d", ASK, 101, 4)])
+    assert book.timestamp != 0
+    assert book.l2_book.bids == [[100, 3], [99, 3]]
+    assert book.l2_book.asks == [[101, 4]]
+    assert book.get_level_orders(BID, 100) == [["a", 1], ["b", 2]]
+
+
+def test_l3_book_orders():
+    book = L3Book()
+    book.handle_order_add(1, BID, 100, 1)
+    book.handle_order_add(2, BID, 100, 2)
+    book.handle_order_add(3, ASK, 101, 5)
+    assert book.l2_book.bids == [[100, 3]]
+    assert book.get_order(2) == (BID, 100, 2)
+
+    assert book.handle_order_modify(1, 4)
+    assert book.get_level_orders(BID, 100) == [[1, 4], [2, 2]]
+    assert book.l2_book.bids == [[100, 6]]
+
+    # price change loses queue priority
+    assert book.handle_order_modify(1, 4, 99)
+    assert book.handle_order_modify(2, 1, 99)
+    assert book.get_level_orders(BID, 99) == [[1, 4], [2, 1]]
+    assert book.get_level_orders(BID, 100) == []
+    assert book.l2_book.bids == [[99, 5]]
+
+    assert book.handle_order_cancel(3)
+    assert not book.handle_order_cancel(3)
+    assert not book.handle_order_modify(3, 1)
+    assert book.get_order(3) is None
+    assert not book.l2_book.asks
+    assert book.l2_book.get_best_bid() == 99
+
+
+def test_l3_book_duplicate_add_same_price():
+    book = L3Book()
+    book.handle_order_add(1, BID, 100, 1)
+    book.handle_order_add(2, BID, 100, 2)
+    book.handle_order_add(1, BID, 100, 3)
+    # modified in place, keeping its queue priority
+    assert book.get_level_orders(BID, 100) == [[1, 3], [2, 2]]
+    assert book.l2_book.bids == [[100, 5]]
+
+
+def test_l3_book_duplicate_add_other_price():
+    book = L3Book()
+    book.handle_order_add(1, BID, 100, 1)
+    book.handle_order_add(1, BID, 99, 2)
+    assert book.get_level_orders(BID, 100) == []
+    assert book.get_level_orders(BID, 99) == [[1, 2]]
+    assert book.l2_book.bids == [[99, 2]]
+
+    # moved to the other side
+    book.handle_order_add(1, ASK, 101, 4)
+    assert book.get_order(1) == (ASK, 101, 4)
+    assert not book.l2_book.bids
+    assert book.l2_book.asks == [[101, 4]]
@@ -0,0 +1,42 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+from octobot_websockets.data.latency_histogram import LatencyHistogram
+
+
+def test_create_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.count == 0
+    assert histogram.get_percentile(50) == 0
+    assert histogram.get_mean() == 0
+
+
+def test_add_latencies():
+    histogram = LatencyHistogram()
+    for latency in (0.3, 0.4, 0.7, 3, 20000):
+        histogram.add(latency)
+    assert histogram.count == 5
+    assert sum(histogram.counts) == 5
+    assert histogram.max == 20000
+    assert histogram.get_percentile(40) == 0.5
+    assert histogram.get_percentile(60) == 1
+    assert histogram.get_percentile(80) == 5
+    assert histogram.get_percentile(100) == 20000
+    stats = histogram.get_stats()
+    assert stats["count"] == 5
+    assert stats["p50"] == 1
+    histogram.reset()
+    assert histogram.count == 0
+    assert sum(histogram.counts) == 0
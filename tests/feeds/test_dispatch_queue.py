@@ -0,0 +1,192 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import pytest
+
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.callback import EventCallback, CandleEvent, TradeEvent
+from octobot_websockets.constants import DispatchOverflowPolicies, Feeds
+from octobot_websockets.feeds.dispatch_queue import DispatchQueue
+from tests.mocked_feed import create_feed
+
+
+class GatedConsumer:
+    """
+    Records events, waiting for its gate to be opened before returning
+    """
+
+    def __init__(self):
+        self.events = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, event):
+        self.events.append(event)
+        await self.gate.wait()
+
+    async def wait_events(self, count):
+        for _ in range(100):
+            if len(self.events) >= count:
+                return
+            await asyncio.sleep(0)
+
+
+def create_queue(max_size, overflow_policy):
+    consumer = GatedConsumer()
+    return DispatchQueue("test", max_size, overflow_policy, EventCallback(consumer)), consumer
+
+
+@pytest.mark.asyncio
+async def test_block():
+    queue, consumer = create_queue(2, DispatchOverflowPolicies.BLOCK)
+    consumer.gate.clear()
+    for event in (1, 2, 3):
+        await queue.put(None, event)
+    assert consumer.events == [1]
+    blocked_put = asyncio.create_task(queue.put(None, 4))
+    await asyncio.sleep(0.01)
+    assert not blocked_put.done()
+    consumer.gate.set()
+    await blocked_put
+    await consumer.wait_events(4)
+    assert consumer.events == [1, 2, 3, 4]
+    assert queue.get_stats() == {"depth": 0, "max_depth": 2, "dropped": 0, "conflated": 0}
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    queue, consumer = create_queue(2, DispatchOverflowPolicies.DROP_OLDEST)
+    for event in (1, 2, 3):
+        await queue.put(None, event)
+    await consumer.wait_events(2)
+    assert consumer.events == [2, 3]
+    assert queue.get_stats() == {"depth": 0, "max_depth": 2, "dropped": 1, "conflated": 0}
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_conflate_on_overflow_only():
+    queue, consumer = create_queue(3, DispatchOverflowPolicies.CONFLATE)
+    for event in (1, 2):
+        await queue.put("a", event)
+    await consumer.wait_events(2)
+    assert consumer.events == [1, 2]
+    assert queue.get_stats()["conflated"] == 0
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_conflate():
+    queue, consumer = create_queue(2, DispatchOverflowPolicies.CONFLATE)
+    # the pending event of the same key is replaced in place
+    for key, event in (("a", 1), ("b", 2), ("a", 3)):
+        await queue.put(key, event)
+    await consumer.wait_events(2)
+    assert consumer.events == [3, 2]
+
+    # the last pending event of the key is replaced
+    for key, event in (("a", 4), ("a", 5), ("a", 6)):
+        await queue.put(key, event)
+    await consumer.wait_events(4)
+    assert consumer.events == [3, 2, 4, 6]
+
+    # a new key waits for space
+    consumer.gate.clear()
+    await queue.put("a", 7)
+    await consumer.wait_events(5)
+    for key, event in (("b", 8), ("c", 9), ("b", 10)):
+        await queue.put(key, event)
+    blocked_put = asyncio.create_task(queue.put("d", 11))
+    await asyncio.sleep(0.01)
+    assert not blocked_put.done()
+    consumer.gate.set()
+    await blocked_put
+    await consumer.wait_events(8)
+    assert consumer.events == [3, 2, 4, 6, 7, 10, 9, 11]
+    assert queue.get_stats() == {"depth": 0, "max_depth": 2, "dropped": 0, "conflated": 3}
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_conflate_without_key():
+    queue, consumer = create_queue(2, DispatchOverflowPolicies.CONFLATE)
+    consumer.gate.clear()
+    for event in (1, 2, 3):
+        await queue.put(None, event)
+    # events without key are never conflated nor dropped
+    blocked_put = asyncio.create_task(queue.put(None, 4))
+    await asyncio.sleep(0.01)
+    assert not blocked_put.done()
+    consumer.gate.set()
+    await blocked_put
+    await consumer.wait_events(4)
+    assert consumer.events == [1, 2, 3, 4]
+    assert queue.get_stats()["conflated"] == 0
+    queue.stop()
+
+
+def test_overflow_policy_value(loop):
+    queue, _ = create_queue(2, "conflate")
+    assert queue.overflow_policy is DispatchOverflowPolicies.CONFLATE
+    queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_get_dispatch_stats():
+    candles = []
+    klines = []
+    trades = []
+
+    async def on_candle(event):
+        candles.append(event)
+
+    async def on_kline(event):
+        klines.append(event)
+
+    async def on_trade(event):
+        trades.append(event)
+
+    feed = create_feed(callbacks={Feeds.CANDLE: EventCallback(on_candle), Feeds.KLINE: EventCallback(on_kline),
+                                  Feeds.TRADES: EventCallback(on_trade)},
+                       dispatch_queue_size=2,
+                       dispatch_overflow_policy=DispatchOverflowPolicies.CONFLATE,
+                       dispatch_overflow_policies={Feeds.TRADES: DispatchOverflowPolicies.DROP_OLDEST})
+    for feed_type in (Feeds.KLINE, Feeds.CANDLE):
+        for time_frame, close in ((TimeFrames.ONE_MINUTE, 1), (TimeFrames.ONE_HOUR, 2), (TimeFrames.ONE_MINUTE, 3)):
+            await feed.callbacks[feed_type].handle_event(
+                CandleEvent(feed.get_name(), "BTC/USDT", 0, time_frame, close, 1, close, close, close))
+    for price in (1, 2, 3):
+        await feed.callbacks[Feeds.TRADES].handle_event(
+            TradeEvent(feed.get_name(), "BTC/USDT", "buy", 1, price, 0))
+    for _ in range(10):
+        await asyncio.sleep(0)
+    # klines are conflated by symbol and time frame
+    assert [(kline.time_frame, kline.close) for kline in klines] == [(TimeFrames.ONE_MINUTE, 3),
+                                                                    (TimeFrames.ONE_HOUR, 2)]
+    # closed candles are never conflated
+    assert [(candle.time_frame, candle.close) for candle in candles] == [(TimeFrames.ONE_MINUTE, 1),
+                                                                        (TimeFrames.ONE_HOUR, 2),
+                                                                        (TimeFrames.ONE_MINUTE, 3)]
+    assert [trade.price for trade in trades] == [2, 3]
+    assert feed.get_dispatch_stats() == {
+        Feeds.CANDLE: {"depth": 0, "max_depth": 2, "dropped": 0, "conflated": 0},
+        Feeds.KLINE: {"depth": 0, "max_depth": 2, "dropped": 0, "conflated": 1},
+        Feeds.TRADES: {"depth": 0, "max_depth": 2, "dropped": 1, "conflated": 0}
+    }
+    feed.close()
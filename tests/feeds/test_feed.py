@@ -0,0 +1,113 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import pytest
+
+from octobot_websockets.constants import Feeds
+from octobot_websockets.feeds.markets_cache import cache_markets
+from tests.mocked_feed import MockedFeed, MARKETS, create_feed
+
+PAIRS = list(MARKETS)
+
+
+class ShardedFeed(MockedFeed):
+    async def subscribe_shard(self, shard):
+        pass
+
+
+class DerivativesFeed(MockedFeed):
+    """
+    Feed of spot and swap markets sharing the same ids
+    """
+
+    @classmethod
+    def get_name(cls):
+        return "bybit"
+
+
+def get_shards_pairs(feed):
+    return [shard.pairs for shard in feed._create_shards()]
+
+
+def test_single_shard_without_topics_limit(loop):
+    feed = create_feed(ShardedFeed, pairs=PAIRS, channels=[Feeds.TRADES, Feeds.TICKER])
+    assert get_shards_pairs(feed) == [feed.pairs]
+    feed.close()
+
+
+def test_create_shards(loop):
+    feed = create_feed(ShardedFeed, pairs=PAIRS, channels=[Feeds.TRADES, Feeds.TICKER],
+                       max_topics_per_connection=5)
+    # 2 channels: 2 pairs per connection
+    assert get_shards_pairs(feed) == [["BTCUSDT", "ETHUSDT"], ["LTCUSDT", "XRPUSDT"], ["ADAUSDT", "DOTUSDT"]]
+    shards = feed._create_shards()
+    assert [shard.shard_id for shard in shards] == [0, 1, 2]
+    assert all(shard.channels == feed.channels for shard in shards)
+    feed.close()
+
+
+def test_create_shards_with_uneven_pairs(loop):
+    feed = create_feed(ShardedFeed, pairs=PAIRS[:5], channels=[Feeds.TRADES],
+                       max_topics_per_connection=2)
+    assert get_shards_pairs(feed) == [["BTCUSDT", "ETHUSDT"], ["LTCUSDT", "XRPUSDT"], ["ADAUSDT"]]
+    feed.close()
+
+
+def test_create_shards_with_more_channels_than_topics(loop):
+    feed = create_feed(ShardedFeed, pairs=PAIRS[:3], channels=[Feeds.TRADES, Feeds.TICKER, Feeds.L2_BOOK],
+                       max_topics_per_connection=2)
+    # the channels of each pair are split across connections
+    assert get_shards_pairs(feed) == [["BTCUSDT"], ["BTCUSDT"], ["ETHUSDT"], ["ETHUSDT"], ["LTCUSDT"], ["LTCUSDT"]]
+    shards = feed._create_shards()
+    assert [shard.shard_id for shard in shards] == list(range(6))
+    assert [shard.channels for shard in shards] == [feed.channels[:2], feed.channels[2:]] * 3
+    feed.close()
+
+
+def test_single_shard_without_subscribe_shard(loop):
+    feed = create_feed(pairs=PAIRS, channels=[Feeds.TRADES], max_topics_per_connection=2)
+    assert get_shards_pairs(feed) == [feed.pairs]
+    feed.close()
+
+
+def test_get_exchange_pair(loop):
+    feed = create_feed()
+    assert feed.pairs == ["BTCUSDT", "ETHUSDT"]
+    assert feed.get_exchange_pair("LTC/USDT") == "LTCUSDT"
+    with pytest.raises(ValueError):
+        feed.get_exchange_pair("LTCUSDT")
+    with pytest.raises(ValueError):
+        feed.get_exchange_pair("BTC/EUR")
+    feed.close()
+
+
+def test_get_pair_from_exchange(loop):
+    feed = create_feed()
+    assert feed.get_pair_from_exchange("LTCUSDT") == "LTC/USDT"
+    # already unified
+    assert feed.get_pair_from_exchange("LTC/USDT") == "LTC/USDT"
+    with pytest.raises(ValueError):
+        feed.get_pair_from_exchange("BTCEUR")
+    feed.close()
+
+
+def test_get_pair_from_exchange_prefers_spot(loop):
+    swap = dict(MARKETS["BTC/USDT"], symbol="BTC/USDT:USDT", settle="USDT", type="swap", spot=False, swap=True)
+    cache_markets(DerivativesFeed.get_name(), {"BTC/USDT:USDT": swap, "BTC/USDT": MARKETS["BTC/USDT"]}, None)
+    feed = DerivativesFeed(pairs=["BTC/USDT:USDT"], markets_cache_dir=None)
+    assert feed.pairs == ["BTCUSDT"]
+    assert feed.get_exchange_pair("BTC/USDT:USDT") == "BTCUSDT"
+    assert feed.get_pair_from_exchange("BTCUSDT") == "BTC/USDT"
+    feed.close()
@@ -0,0 +1,96 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+
+import pytest
+from synthetic_exchange import TRADE_CHANNEL, create_markets
+from synthetic_feed import SyntheticFeed
+
+from octobot_websockets.callback import TradeCallback
+from octobot_websockets.constants import Feeds
+from octobot_websockets.feeds.markets_cache import cache_markets
+from tests.mocked_feed import MARKETS
+
+PAIRS = list(create_markets(2))
+WAIT_TIMEOUT = 10
+
+
+class LocalFeed(SyntheticFeed):
+    RECONNECT_BASE_DELAY = 0.1
+
+
+async def wait_for(condition):
+    timeout = time.monotonic() + WAIT_TIMEOUT
+    while not condition():
+        assert time.monotonic() < timeout, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def create_local_feed(server, monkeypatch, trades, **kwargs):
+    async def on_trade(feed, **trade):
+        trades.append(trade)
+
+    monkeypatch.setattr(LocalFeed, "ADDRESS", server.get_address())
+    # the synthetic markets are cached for the binance name shared with the mocked feed
+    cache_markets(LocalFeed.get_name(), dict(MARKETS, **create_markets(2)), None)
+    return LocalFeed(pairs=PAIRS, channels=[Feeds.TRADES], callbacks={Feeds.TRADES: TradeCallback(on_trade)},
+                     markets_cache_dir=None, create_loop=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_connect(synthetic_exchange, monkeypatch):
+    trades = []
+    feed = create_local_feed(synthetic_exchange, monkeypatch, trades)
+    feed.start()
+    await wait_for(lambda: len(trades) >= 10)
+    assert synthetic_exchange.subscriptions == [{"op": "subscribe", "channels": [TRADE_CHANNEL],
+                                                 "pairs": ["S0USD", "S1USD"]}]
+    assert {trade["pair"] for trade in trades} <= set(PAIRS)
+    assert [shard.websocket is not None for shard in feed.shards] == [True]
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_after_reconnection(synthetic_exchange, monkeypatch):
+    trades = []
+    feed = create_local_feed(synthetic_exchange, monkeypatch, trades)
+    feed.start()
+    await wait_for(lambda: trades)
+    # exchange outage
+    await synthetic_exchange.stop()
+    await wait_for(lambda: feed.shards[0].websocket is None)
+    trades.clear()
+    await synthetic_exchange.start()
+    await wait_for(lambda: len(synthetic_exchange.subscriptions) == 2)
+    assert synthetic_exchange.subscriptions[1] == synthetic_exchange.subscriptions[0]
+    await wait_for(lambda: trades)
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_reconnects_stale_connection(synthetic_exchange, monkeypatch):
+    trades = []
+    feed = create_local_feed(synthetic_exchange, monkeypatch, trades, timeout=1, timeout_interval=1)
+    feed.start()
+    await wait_for(lambda: trades)
+    # the connection stays open without messages
+    synthetic_exchange.is_paused = True
+    await wait_for(lambda: len(synthetic_exchange.subscriptions) == 2)
+    trades.clear()
+    synthetic_exchange.is_paused = False
+    await wait_for(lambda: trades)
+    feed.close()
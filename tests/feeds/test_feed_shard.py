@@ -0,0 +1,159 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import time
+
+import pytest
+
+from octobot_websockets.feeds import feed_shard
+from octobot_websockets.feeds.feed_shard import FeedShard
+from tests.mocked_feed import MockedFeed, create_feed
+
+
+class FakeWebsocket:
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.is_closed = False
+
+    async def close(self):
+        self.is_closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.messages:
+            raise StopAsyncIteration
+        return self.messages.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, websocket):
+        self.websocket = websocket
+
+    async def __aenter__(self):
+        return self.websocket
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class BackfillingFeed(MockedFeed):
+    """
+    Feed recording its messages, its candles backfill lasts until backfilled is set
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.messages = []
+        self.backfills = []
+        self.backfilled = asyncio.Event()
+
+    async def on_message(self, message):
+        self.messages.append(message)
+
+    async def backfill_shard_candles(self, shard, outage_start):
+        self.backfills.append(outage_start)
+        await self.backfilled.wait()
+
+
+def create_shard(**feed_kwargs):
+    feed = create_feed(**feed_kwargs)
+    return feed, FeedShard(feed, 0, feed.pairs, feed.channels)
+
+
+def test_is_timed_out(loop):
+    feed, shard = create_shard(timeout=1)
+    assert not shard.is_timed_out()
+    shard.websocket = FakeWebsocket()
+    assert not shard.is_timed_out()
+    shard.last_msg = shard.connected_at = time.monotonic() - 2
+    assert shard.is_timed_out()
+    # a new connection has until timeout to receive its first message
+    shard.connected_at = time.monotonic()
+    assert not shard.is_timed_out()
+    shard.last_msg = time.monotonic()
+    shard.connected_at = time.monotonic() - 2
+    assert not shard.is_timed_out()
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_closes_stale_connection():
+    feed, shard = create_shard(timeout=1, timeout_interval=0)
+    websocket = FakeWebsocket()
+    shard.websocket = websocket
+    watch_task = asyncio.create_task(shard._watch())
+    await asyncio.sleep(0.01)
+    assert not websocket.is_closed
+    shard.last_msg = shard.connected_at = time.monotonic() - 2
+    await asyncio.sleep(0.01)
+    assert websocket.is_closed
+    watch_task.cancel()
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_last_msg_updated_on_message():
+    feed, shard = create_shard()
+    shard.last_msg = time.monotonic() - 10
+    shard.reconnect_attempts = 3
+    shard.websocket = FakeWebsocket(['{"e": "unknown"}'])
+    await shard._handler()
+    assert time.monotonic() - shard.last_msg < 1
+    assert shard.reconnect_attempts == 0
+    feed.close()
+
+
+def test_reconnect_delay(loop):
+    feed, shard = create_shard()
+    # first retry is immediate
+    assert shard._get_reconnect_delay() == 0
+    for attempt in range(1, 10):
+        delays = set()
+        for _ in range(20):
+            shard.reconnect_attempts = attempt
+            delays.add(shard._get_reconnect_delay())
+        max_delay = min(feed.MAX_DELAY, feed.RECONNECT_BASE_DELAY * 2 ** (attempt - 1))
+        assert all(0 <= delay <= max_delay for delay in delays)
+        # jittered
+        assert len(delays) > 1
+    assert shard.reconnect_attempts == 10
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_messages_handled_during_backfill(monkeypatch):
+    feed = create_feed(BackfillingFeed)
+    shard = FeedShard(feed, 0, feed.pairs, feed.channels)
+    websockets = [FakeWebsocket(["before outage"]), FakeWebsocket(["after outage"])]
+
+    def connect(*args, **kwargs):
+        if not websockets:
+            # stop reconnecting
+            raise asyncio.CancelledError()
+        return FakeConnection(websockets.pop(0))
+
+    monkeypatch.setattr(feed_shard.websockets, "connect", connect)
+    with pytest.raises(asyncio.CancelledError):
+        await shard.connect()
+    # the reconnection handler did not wait for the backfill
+    assert feed.messages == ["before outage", "after outage"]
+    assert len(feed.backfills) == 1
+    assert not shard.backfill_task.done()
+    feed.backfilled.set()
+    await shard.backfill_task
+    feed.close()
@@ -0,0 +1,45 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import time
+
+import pytest
+
+from octobot_websockets.callback import EventCallback, BookEvent, TradeEvent
+from octobot_websockets.constants import Feeds
+from octobot_websockets.feeds.feed_stats import FeedStats, InstrumentedCallback, get_frame_size
+
+
+def test_get_frame_size():
+    assert get_frame_size('{"p": "1"}') == 10
+    assert get_frame_size('{"p": "€"}') == 12
+    assert get_frame_size(b'{"p": "1"}') == 10
+
+
+@pytest.mark.asyncio
+async def test_exchange_latencies():
+    async def on_event(event):
+        pass
+
+    stats = FeedStats()
+    trades = InstrumentedCallback(EventCallback(on_event), stats, Feeds.TRADES)
+    books = InstrumentedCallback(EventCallback(on_event), stats, Feeds.L2_BOOK)
+    await trades.handle_event(TradeEvent("binance", "BTC/USDT", "buy", 1, 10, (time.time() - 1) * 1000))
+    await books.handle_event(BookEvent("binance", "BTC/USDT", [], [], time.time()))
+    exchange_latencies = stats.get_stats()["exchange_latencies"]
+    # books are timestamped on reception
+    assert list(exchange_latencies) == [(Feeds.TRADES.value, "BTC/USDT")]
+    assert exchange_latencies[(Feeds.TRADES.value, "BTC/USDT")]["count"] == 1
+    assert set(stats.get_stats()["callback_latencies"]) == {Feeds.TRADES.value, Feeds.L2_BOOK.value}
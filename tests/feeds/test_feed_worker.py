@@ -0,0 +1,168 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import multiprocessing
+import pickle
+import time
+
+import pytest
+
+from octobot_websockets.callback import TradeEvent, TradeCallback, TickerCallback, dispatch_event
+from octobot_websockets.constants import Feeds
+from octobot_websockets.feeds.feed_worker import create_feed_workers, FeedWorker, WorkerCallback, \
+    WorkerEventSender
+from tests.mocked_feed import MockedFeed, MARKETS
+from tests.test_callback import EVENTS
+
+PAIRS = list(MARKETS)
+
+
+class EmittingFeed(MockedFeed):
+    """
+    Emits a trade and a ticker instead of connecting
+    """
+
+    def start(self):
+        self.loop.run_until_complete(self._emit())
+
+    async def _emit(self):
+        await self.callbacks[Feeds.TRADES].handle_event(TradeEvent(self.get_name(), "BTC/USDT", "buy", 1, 10, 1000))
+        await self.callbacks[Feeds.TICKER](feed=self.get_name(), symbol="BTC/USDT", bid=9, ask=11, last=10,
+                                           timestamp=1000)
+        # let the sender flush its events
+        await asyncio.sleep(0.1)
+
+
+class BurstFeed(MockedFeed):
+    """
+    Emits BURST_SIZE trades, one per worker loop iteration
+    """
+    BURST_SIZE = 10
+
+    def start(self):
+        self.loop.run_until_complete(self._emit())
+
+    async def _emit(self):
+        for index in range(self.BURST_SIZE):
+            await self.callbacks[Feeds.TRADES].handle_event(TradeEvent(self.get_name(), "BTC/USDT", "buy", 1, 10,
+                                                                       index))
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+
+def create_recording_callbacks(calls):
+    async def on_trade(feed, **kwargs):
+        calls.append((Feeds.TRADES, feed, kwargs))
+
+    async def on_ticker(feed, **kwargs):
+        calls.append((Feeds.TICKER, feed, kwargs))
+
+    return {Feeds.TRADES: TradeCallback(on_trade), Feeds.TICKER: TickerCallback(on_ticker)}
+
+
+def test_create_feed_workers():
+    workers = create_feed_workers(MockedFeed, PAIRS[:5], 2, {}, markets_cache_dir=None)
+    assert [worker.feed_kwargs for worker in workers] == [
+        {"pairs": ["BTC/USDT", "LTC/USDT", "ADA/USDT"], "markets_cache_dir": None},
+        {"pairs": ["ETH/USDT", "XRP/USDT"], "markets_cache_dir": None}
+    ]
+    # at least one pair per worker
+    assert len(create_feed_workers(MockedFeed, PAIRS[:2], 4, {})) == 2
+    assert len(create_feed_workers(MockedFeed, PAIRS, 0, {})) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_callback_round_trip():
+    calls = []
+    callbacks = create_recording_callbacks(calls)
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    sender = WorkerEventSender(writer)
+    await WorkerCallback(Feeds.TRADES, sender).handle_event(TradeEvent("binance", "BTC/USDT", "buy", 1, 10, 1000))
+    await WorkerCallback(Feeds.TICKER, sender)(feed="binance", symbol="BTC/USDT", bid=9, ask=11, last=10,
+                                               timestamp=1000)
+    await asyncio.sleep(0)
+    # events of a loop iteration are sent as a single message
+    events = pickle.loads(reader.recv_bytes())
+    assert not reader.poll()
+    assert [feed_type for feed_type, _ in events] == [Feeds.TRADES.value, Feeds.TICKER.value]
+    for feed_type, event in events:
+        await dispatch_event(callbacks[Feeds(feed_type)], event)
+    assert calls == [
+        (Feeds.TRADES, "binance", dict(pair="BTC/USDT", timestamp=1000, side="buy", amount=1, price=10)),
+        (Feeds.TICKER, "binance", dict(pair="BTC/USDT", bid=9, ask=11, last=10, timestamp=1000))
+    ]
+    reader.close()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_pickle_events_through_worker_callbacks():
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    sender = WorkerEventSender(writer)
+    for event in EVENTS.values():
+        await WorkerCallback(Feeds.TRADES, sender).handle_event(event)
+    await asyncio.sleep(0)
+    events = [event for _, event in pickle.loads(reader.recv_bytes())]
+    assert [type(event) for event in events] == [type(event) for event in EVENTS.values()]
+    assert [event.to_kwargs() for event in events] == [event.to_kwargs() for event in EVENTS.values()]
+    reader.close()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_worker_process():
+    calls = []
+    worker = FeedWorker(EmittingFeed, create_recording_callbacks(calls), pairs=[], markets_cache_dir=None)
+    worker.start()
+    try:
+        timeout = time.time() + 60
+        while len(calls) < 2 and time.time() < timeout:
+            await asyncio.sleep(0.05)
+    finally:
+        worker.stop()
+    assert calls == [
+        (Feeds.TRADES, "binance", dict(pair="BTC/USDT", timestamp=1000, side="buy", amount=1, price=10)),
+        (Feeds.TICKER, "binance", dict(pair="BTC/USDT", bid=9, ask=11, last=10, timestamp=1000))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_feed_worker_stops_reading_pending_batches():
+    timestamps = []
+    dispatched = asyncio.Event()
+
+    async def on_trade(feed, timestamp, **kwargs):
+        timestamps.append(timestamp)
+        # slow consumer
+        await dispatched.wait()
+
+    worker = FeedWorker(BurstFeed, {Feeds.TRADES: TradeCallback(on_trade)}, max_pending_batches=2,
+                        pairs=[], markets_cache_dir=None, create_loop=False)
+    worker.start()
+    try:
+        timeout = time.time() + 60
+        while worker.is_reading and time.time() < timeout:
+            await asyncio.sleep(0.05)
+        # the pipe is not read anymore while the first batch is being dispatched
+        assert not worker.is_reading
+        assert timestamps == [0]
+        dispatched.set()
+        while len(timestamps) < BurstFeed.BURST_SIZE and time.time() < timeout:
+            await asyncio.sleep(0.05)
+    finally:
+        worker.stop()
+    # reading resumed once pending batches were dispatched
+    assert timestamps == list(range(BurstFeed.BURST_SIZE))
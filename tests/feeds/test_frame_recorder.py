@@ -0,0 +1,74 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import pytest
+
+from octobot_websockets.feeds.frame_recorder import FrameRecorder, FrameReplayer
+
+
+class MessagesHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_message(self, message):
+        self.messages.append(message)
+
+
+def test_record_and_read_frames(tmp_path):
+    path = str(tmp_path / "frames")
+    recorder = FrameRecorder(path)
+    recorder.record('{"price": 1}', 10)
+    recorder.record(b"\x01\x02", 11)
+    recorder.close()
+    recorder = FrameRecorder(path)
+    recorder.record("é", 12)
+    recorder.close()
+    replayer = FrameReplayer(path)
+    assert list(replayer.get_frames()) == [(10, '{"price": 1}'), (11, b"\x01\x02"), (12, "é")]
+    replayer.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_frames(tmp_path):
+    path = str(tmp_path / "frames")
+    recorder = FrameRecorder(path)
+    for index in range(5):
+        recorder.record(str(index), 10 + index)
+    recorder.close()
+    replayer = FrameReplayer(path)
+    handler = MessagesHandler()
+    frames_count, _ = await replayer.replay(handler)
+    assert frames_count == 5
+    assert handler.messages == ["0", "1", "2", "3", "4"]
+    replayer.close()
+
+
+def test_replay_invalid_file(tmp_path):
+    path = tmp_path / "frames"
+    path.write_bytes(b"invalid file")
+    with pytest.raises(ValueError):
+        FrameReplayer(str(path))
+
+
+def test_close_during_frames_reading(tmp_path):
+    path = str(tmp_path / "frames")
+    recorder = FrameRecorder(path)
+    for index in range(3):
+        recorder.record(f'{{"index": {index}}}', 10 + index)
+    recorder.close()
+    replayer = FrameReplayer(path)
+    frames = replayer.get_frames()
+    assert next(frames) == (10, '{"index": 0}')
+    replayer.close()
@@ -0,0 +1,171 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import os
+import time
+
+import pytest
+
+from octobot_websockets.feeds.markets_cache import cache_markets, get_cached_markets, load_markets
+from tests.mocked_feed import MockedFeed, MARKETS, create_feed
+
+TTL = 3600
+
+
+class FakeClient:
+    def __init__(self, markets=None, failures=0):
+        self.markets = markets if markets is not None else MARKETS
+        self.failures = failures
+        self.calls = 0
+        self.is_closed = False
+
+    async def load_markets(self):
+        self.calls += 1
+        # let concurrent loads start
+        await asyncio.sleep(0.01)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("markets unavailable")
+        return self.markets
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FailingMarketsFeed(MockedFeed):
+    @classmethod
+    def get_name(cls):
+        return "kraken"
+
+    def _create_shards(self):
+        return []
+
+
+class UnsupportedPairFeed(FailingMarketsFeed):
+    @classmethod
+    def get_name(cls):
+        return "bitstamp"
+
+
+def test_memory_cache_hit():
+    cache_markets("memory_hit", MARKETS, None)
+    assert get_cached_markets("memory_hit", None, TTL) is MARKETS
+    assert get_cached_markets("memory_miss", None, TTL) is None
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_hit(tmp_path):
+    cache_markets("disk_hit", MARKETS, str(tmp_path))
+    # without remaining temporary file
+    assert os.listdir(tmp_path) == ["disk_hit.json"]
+
+    client = FakeClient()
+    # from the memory cache
+    assert await load_markets("disk_hit", client, str(tmp_path), TTL) is MARKETS
+    assert client.calls == 0
+
+
+def test_disk_cache_reload(tmp_path):
+    cache_markets("disk_reload", MARKETS, str(tmp_path))
+    # expire the memory cache only
+    assert get_cached_markets("disk_reload", None, 0) is None
+    os.utime(tmp_path / "disk_reload.json")
+    assert get_cached_markets("disk_reload", str(tmp_path), TTL) == MARKETS
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(tmp_path):
+    cache_markets("expired", MARKETS, str(tmp_path))
+    expired_time = time.time() - TTL - 1
+    os.utime(tmp_path / "expired.json", (expired_time, expired_time))
+    assert get_cached_markets("expired", str(tmp_path), TTL) is MARKETS
+    assert get_cached_markets("expired", None, 0) is None
+    assert get_cached_markets("expired", str(tmp_path), 0) is None
+
+    # memory loaded just now and file expired for a 1 second ttl
+    await asyncio.sleep(1.1)
+    client = FakeClient(markets={})
+    assert await load_markets("expired", client, str(tmp_path), 1) == {}
+    assert client.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_corrupt_cache_file(tmp_path):
+    with open(tmp_path / "corrupt.json", "w") as cache_file:
+        cache_file.write('{"BTC/USDT": {"id"')
+    assert get_cached_markets("corrupt", str(tmp_path), TTL) is None
+
+    client = FakeClient()
+    assert await load_markets("corrupt", client, str(tmp_path), TTL) == MARKETS
+    assert client.calls == 1
+
+    # the corrupt file is replaced
+    assert get_cached_markets("corrupt", None, 0) is None
+    assert get_cached_markets("corrupt", str(tmp_path), TTL) == MARKETS
+
+
+@pytest.mark.asyncio
+async def test_shared_loading_task():
+    client = FakeClient()
+    results = await asyncio.gather(*(load_markets("shared", client, None, TTL) for _ in range(3)))
+    assert all(markets is MARKETS for markets in results)
+    assert client.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_loading():
+    client = FakeClient(failures=1)
+    with pytest.raises(ConnectionError):
+        await load_markets("failed", client, None, TTL)
+    # the next load retries
+    assert await load_markets("failed", client, None, TTL) is MARKETS
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_feed_retries_markets_loading():
+    feed = FailingMarketsFeed(pairs=["BTC/USDT"], markets_cache_dir=None)
+    assert not feed.are_markets_loaded
+    client = FakeClient(failures=1)
+    feed.async_ccxt_client = client
+    await feed._connect()
+    assert client.calls == 2
+    assert feed.are_markets_loaded
+    assert feed.pairs == ["BTCUSDT"]
+    # closed when the connections end
+    assert client.is_closed
+    feed.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_unsupported_pair():
+    feed = UnsupportedPairFeed(pairs=["BTC/EUR"], markets_cache_dir=None)
+    client = FakeClient()
+    feed.async_ccxt_client = client
+    # not retried
+    with pytest.raises(ValueError):
+        await feed._connect()
+    assert client.calls == 1
+    assert client.is_closed
+    feed.close()
+
+
+def test_feed_unsupported_pair_with_cached_markets(loop):
+    with pytest.raises(ValueError):
+        create_feed(pairs=["BTC/EUR"])
@@ -0,0 +1,98 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import ccxt.async_support
+
+from octobot_websockets.feeds.feed import Feed
+from octobot_websockets.feeds.markets_cache import cache_markets
+
+MARKETS = {
+    f"{base}/USDT": {"id": f"{base}USDT", "symbol": f"{base}/USDT", "base": base, "quote": "USDT",
+                     "baseId": base, "quoteId": "USDT", "type": "spot", "spot": True, "active": True}
+    for base in ("BTC", "ETH", "LTC", "XRP", "ADA", "DOT")
+}
+
+
+class MockedFeed(Feed):
+    """
+    Feed of the binance markets with a websocket connection that is never opened
+    """
+
+    @classmethod
+    def get_name(cls):
+        return "binance"
+
+    @classmethod
+    def get_address(cls):
+        return "ws://127.0.0.1:1"
+
+    @classmethod
+    def get_ccxt_async_client(cls):
+        return ccxt.async_support.binance
+
+    @classmethod
+    def get_trades_feed(cls):
+        return "trade"
+
+    @classmethod
+    def get_L2_book_feed(cls):
+        return "depth"
+
+    @classmethod
+    def get_L3_book_feed(cls):
+        return "orders_depth"
+
+    @classmethod
+    def get_ticker_feed(cls):
+        return "ticker"
+
+    @classmethod
+    def get_candle_feed(cls):
+        return "candle"
+
+    @classmethod
+    def get_kline_feed(cls):
+        return "kline"
+
+    @classmethod
+    def get_funding_feed(cls):
+        return "funding"
+
+    @classmethod
+    def get_portfolio_feed(cls):
+        return "portfolio"
+
+    @classmethod
+    def get_orders_feed(cls):
+        return "orders"
+
+    @classmethod
+    def get_position_feed(cls):
+        return "position"
+
+    async def subscribe(self):
+        pass
+
+    async def on_message(self, message):
+        pass
+
+
+def create_feed(feed_class=MockedFeed, **kwargs):
+    """
+    :return: a feed_class feed created in the current event loop with MARKETS as markets
+    """
+    cache_markets(feed_class.get_name(), MARKETS, None)
+    kwargs.setdefault("pairs", ["BTC/USDT", "ETH/USDT"])
+    return feed_class(markets_cache_dir=None, **kwargs)
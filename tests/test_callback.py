@@ -0,0 +1,215 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import pickle
+
+import pytest
+from octobot_commons.enums import TimeFrames
+
+from octobot_websockets.callback import BatchCallback, TradeEvent, TickerEvent, CandleEvent, BookEvent, \
+    OrderEvent, PositionEvent, Callback, EventCallback, TradeCallback, TickerCallback, CandleCallback, \
+    KlineCallback, BookCallback, OrdersCallback, PositionCallback, dispatch_event
+from octobot_websockets.data.book import Book
+
+
+class BatchesRecorder:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.batches = []
+
+    async def __call__(self, feed, batch):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.batches.append((feed, batch))
+
+    def get_prices(self):
+        return [[event["price"] if isinstance(event, dict) else event.price for event in batch]
+                for _, batch in self.batches]
+
+
+# exchange values are kept as is: int timestamps and missing values
+EVENTS = {
+    TradeCallback: TradeEvent("binance", "BTC/USDT", "buy", 1, 10.5, 1577836800000),
+    TickerCallback: TickerEvent("binance", "BTC/USDT", None, 11, 10.5, 1577836800000),
+    CandleCallback: CandleEvent("binance", "BTC/USDT", 1577836800, TimeFrames.ONE_MINUTE, 10.5, 3, 11, 10, 10),
+    KlineCallback: CandleEvent("binance", "BTC/USDT", 1577836800, TimeFrames.ONE_HOUR, 10.5, 3, 11, 10, 10),
+    BookCallback: BookEvent("binance", "BTC/USDT", [[11, 1]], [[10, 2]], None),
+    OrdersCallback: OrderEvent("binance", "BTC/USDT", 10.5, 1, "123", False, None),
+    PositionCallback: PositionEvent("binance", "BTC/USDT", 10, 100, 10, None, 10.5, 1, 1577836800000),
+}
+
+
+def create_trade(price):
+    return TradeEvent("binance", "BTC/USDT", "buy", 1, price, 1000)
+
+
+async def wait_loop_iterations(count=10):
+    for _ in range(count):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_loop_iteration_flush():
+    recorder = BatchesRecorder()
+    callback = BatchCallback(recorder)
+    for price in (1, 2, 3):
+        await callback.handle_event(create_trade(price))
+    await callback(feed="binance", symbol="BTC/USDT", side="buy", amount=1, price=4, timestamp=1000)
+    assert recorder.batches == []
+    await wait_loop_iterations()
+    assert recorder.get_prices() == [[1, 2, 3, 4]]
+    assert recorder.batches[0][0] == "binance"
+    await callback.handle_event(create_trade(5))
+    await wait_loop_iterations()
+    assert recorder.get_prices() == [[1, 2, 3, 4], [5]]
+
+
+@pytest.mark.asyncio
+async def test_batch_interval():
+    recorder = BatchesRecorder()
+    callback = BatchCallback(recorder, batch_interval=100)
+    await callback.handle_event(create_trade(1))
+    await asyncio.sleep(0.02)
+    await callback.handle_event(create_trade(2))
+    await asyncio.sleep(0.02)
+    assert recorder.batches == []
+    await asyncio.sleep(0.15)
+    assert recorder.get_prices() == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_batch_size():
+    recorder = BatchesRecorder()
+    callback = BatchCallback(recorder, batch_size=2)
+    for price in range(5):
+        await callback.handle_event(create_trade(price))
+    await wait_loop_iterations()
+    assert recorder.get_prices() == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_columnar():
+    recorder = BatchesRecorder()
+    callback = BatchCallback(recorder, columnar=True)
+    await callback.handle_event(create_trade(1))
+    await callback(feed="binance", symbol="ETH/USDT", side="sell", amount=2, price=3, timestamp=1001)
+    # events with different keys
+    await callback(feed="binance", symbol="ETH/USDT", price=4)
+    await wait_loop_iterations()
+    assert recorder.batches == [("binance", {"feed": ["binance"] * 3,
+                                             "symbol": ["BTC/USDT", "ETH/USDT", "ETH/USDT"],
+                                             "side": ["buy", "sell", None],
+                                             "amount": [1, 2, None],
+                                             "price": [1, 3, 4],
+                                             "timestamp": [1000, 1001, None]})]
+
+
+@pytest.mark.asyncio
+async def test_delivery_order():
+    recorder = BatchesRecorder(delay=0.01)
+    callback = BatchCallback(recorder, batch_size=1)
+    for price in range(5):
+        await callback.handle_event(create_trade(price))
+    await asyncio.sleep(0.2)
+    assert recorder.get_prices() == [[0], [1], [2], [3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_max_pending_batches():
+    recorder = BatchesRecorder(delay=0.05)
+    callback = BatchCallback(recorder, batch_size=1, max_pending_batches=2)
+    await callback.handle_event(create_trade(0))
+    await wait_loop_iterations()
+    # 0 is being delivered, 1 is pending
+    await callback.handle_event(create_trade(1))
+    # 2 reaches max_pending_batches: the caller waits for the pending batches delivery
+    await callback.handle_event(create_trade(2))
+    assert recorder.get_prices() == [[0], [1], [2]]
+
+
+def test_event_values():
+    assert type(EVENTS[TradeCallback].timestamp) is int
+    assert EVENTS[TradeCallback].timestamp == 1577836800000
+    assert EVENTS[TickerCallback].bid is None
+    assert EVENTS[BookCallback].timestamp is None
+    assert EVENTS[OrdersCallback].is_filled is None
+    assert EVENTS[PositionCallback].pnl_percent is None
+    assert type(EVENTS[CandleCallback].volume) is int
+
+
+@pytest.mark.asyncio
+async def test_typed_callbacks_handle_event():
+    for callback_class, event in EVENTS.items():
+        calls = []
+
+        async def user_callback(feed, **kwargs):
+            calls.append((feed, kwargs))
+
+        callback = callback_class(user_callback)
+        await callback.handle_event(event)
+        await callback(**event.to_kwargs())
+        expected_kwargs = event.to_kwargs()
+        expected_kwargs["pair"] = expected_kwargs.pop("symbol")
+        assert calls == [("binance", {key: value for key, value in expected_kwargs.items() if key != "feed"})] * 2
+
+
+@pytest.mark.asyncio
+async def test_event_callback():
+    events = []
+
+    async def user_callback(event):
+        events.append(event)
+
+    callback = EventCallback(user_callback)
+    for event in EVENTS.values():
+        await dispatch_event(callback, event)
+    assert events == list(EVENTS.values())
+    with pytest.raises(TypeError):
+        await dispatch_event(callback, EVENTS[TradeCallback].to_kwargs())
+
+
+@pytest.mark.asyncio
+async def test_callback_handle_event():
+    class KwargsCallback(Callback):
+        def __init__(self):
+            super().__init__(None)
+            self.calls = []
+
+        async def __call__(self, **kwargs):
+            self.calls.append(kwargs)
+
+    callback = KwargsCallback()
+    # events are packed as kwargs for the callbacks without handle_event
+    await callback.handle_event(EVENTS[TradeCallback])
+    assert callback.calls == [EVENTS[TradeCallback].to_kwargs()]
+
+
+def test_book_event_from_book():
+    book = Book()
+    book.handle_book_update([[10, 1], [9, 2]], [[11, 3]])
+    event = BookEvent("binance", "BTC/USDT", None, None, book.timestamp, book=book)
+    prices, sizes = event.book.get_top_bids(1)
+    assert list(prices) == [10] and list(sizes) == [1]
+    assert event.to_kwargs()["bids"] == [[10, 1], [9, 2]]
+    # levels are sent instead of the book
+    assert pickle.loads(pickle.dumps(event)).asks == [[11, 3]]
+
+    event = BookEvent("binance", "BTC/USDT", None, None, book.timestamp, book=book)
+    event.detach()
+    book.handle_book_update([[8, 1]], [[12, 1]])
+    assert event.book is None
+    assert event.bids == [[10, 1], [9, 2]]
+    assert event.asks == [[11, 3]]
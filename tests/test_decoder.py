@@ -0,0 +1,36 @@
+#  Drakkar-Software OctoBot-Websockets
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import json
+
+import pytest
+
+from octobot_websockets.decoder import get_json_decoder, extract_json_string, JSON
+
+
+def test_get_json_decoder():
+    assert get_json_decoder(JSON) is json.loads
+    assert get_json_decoder()('{"a": [1, 2]}') == {"a": [1, 2]}
+    with pytest.raises(ValueError):
+        get_json_decoder("unknown")
+
+
+def test_extract_json_string():
+    message = '{"e": "trade", "E": 123, "s":"BTCUSDT", "p": "0.1"}'
+    assert extract_json_string(message, "e") == "trade"
+    assert extract_json_string(message, "s") == "BTCUSDT"
+    assert extract_json_string(message.encode(), "s") == "BTCUSDT"
+    assert extract_json_string(message, "E") is None
+    assert extract_json_string(message, "x") is None